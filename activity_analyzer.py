@@ -0,0 +1,236 @@
+"""
+Background activity analysis based on frame differencing.
+
+Each segment is decoded at a low sample rate into small grayscale frames in
+a single low-priority worker process. The mean absolute difference between
+consecutive samples gives a per-second activity score, which is folded into
+a compact per-day array (one byte per bin) and stored on disk.
+"""
+import multiprocessing
+import os
+import threading
+import time as monotonic_time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from models import (Camera, RecordingDay, ScanDiff, VideoSegment,
+                    ACTIVITY_BIN_SECONDS, ACTIVITY_BINS, NOT_ANALYZED, MAX_SCORE)
+
+SAMPLE_INTERVAL_SECONDS = 2
+FRAME_SIZE = (64, 36)
+SCORE_SCALE = 10.0  # Mean absolute pixel difference -> score
+
+
+def _init_analysis_worker():
+    """Lower the worker's priority, then start Qt for decoding."""
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+    from frame_grabber import init_worker
+    init_worker()
+
+
+def analyze_segment(path: str, duration: int) -> Optional[List[int]]:
+    """Score activity for each second of a segment (runs in the worker process)."""
+    import numpy as np
+    from frame_grabber import grab_gray_frames
+
+    positions = list(range(0, duration * 1000, SAMPLE_INTERVAL_SECONDS * 1000))
+    frames = grab_gray_frames(path, positions, FRAME_SIZE)
+    valid = [(pos, frame) for pos, frame in zip(positions, frames) if frame is not None]
+    if len(valid) < 2:
+        return None
+
+    width, height = FRAME_SIZE
+    stack = np.frombuffer(b''.join(frame for _, frame in valid), dtype=np.uint8)
+    stack = stack.reshape(len(valid), height, width).astype(np.int16)
+    diffs = np.abs(np.diff(stack, axis=0)).mean(axis=(1, 2))
+    scores = np.minimum(diffs * SCORE_SCALE, MAX_SCORE).astype(np.uint8)
+
+    # Each difference covers the seconds between its two samples
+    per_second = np.zeros(duration, dtype=np.uint8)
+    for i, score in enumerate(scores):
+        start = valid[i][0] // 1000
+        end = valid[i + 1][0] // 1000
+        per_second[start:end] = score
+    per_second[valid[-1][0] // 1000:] = scores[-1]
+    return per_second.tolist()
+
+
+class ActivityStore:
+    """Per-day activity arrays stored as small binary files (one byte per bin)."""
+
+    def __init__(self, base_dir: str = "activity_index"):
+        self.base_dir = base_dir
+
+    def _path(self, camera_id: str, day: date) -> str:
+        return os.path.join(self.base_dir, camera_id, day.strftime("%Y%m%d") + ".bin")
+
+    def load(self, camera_id: str, day: date) -> Optional[bytearray]:
+        """Load a day's activity array, or None if it has not been analyzed."""
+        try:
+            with open(self._path(camera_id, day), 'rb') as f:
+                data = bytearray(f.read())
+            return data if len(data) == ACTIVITY_BINS else None
+        except OSError:
+            return None
+
+    def save(self, camera_id: str, day: date, activity: bytearray) -> None:
+        """Atomically write a day's activity array."""
+        path = self._path(camera_id, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(activity)
+        os.replace(temp_path, path)
+
+    def clear(self) -> None:
+        import shutil
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+
+def fold_into_bins(activity: bytearray, start_seconds: int, per_second: List[int]) -> None:
+    """Store the maximum score of each bin covered by a segment."""
+    for offset in range(0, len(per_second), ACTIVITY_BIN_SECONDS):
+        index = (start_seconds + offset) // ACTIVITY_BIN_SECONDS
+        if index >= ACTIVITY_BINS:
+            break
+        score = max(per_second[offset:offset + ACTIVITY_BIN_SECONDS])
+        current = activity[index]
+        activity[index] = score if current == NOT_ANALYZED else max(current, score)
+
+
+def is_segment_analyzed(activity: bytearray, segment: VideoSegment) -> bool:
+    return _is_analyzed(activity, segment.start_seconds, segment.duration)
+
+
+def _is_analyzed(activity: bytearray, start_seconds: int, duration: int) -> bool:
+    # Check the middle of the segment; its edges may share bins with neighbours
+    middle = start_seconds + duration // 2
+    return activity[min(middle // ACTIVITY_BIN_SECONDS, ACTIVITY_BINS - 1)] != NOT_ANALYZED
+
+
+def pending_segments(activity: bytearray, day: RecordingDay) -> List[int]:
+    """Indices of the day's segments not analyzed yet, from its start and duration columns."""
+    return [i for i, (start, duration) in enumerate(zip(day.segment_starts(), day.segment_durations()))
+            if not _is_analyzed(activity, start, duration)]
+
+
+class ActivityAnalyzer(QObject):
+    """Analyzes recordings in the background, newest days first.
+
+    Analysis runs in one low-priority process with a duty cycle cap, so it
+    uses at most a fraction of one core. Progress is saved as it goes, so
+    stopping and restarting only repeats the segment that was in flight.
+    Days found fully analyzed are remembered with their segment count and
+    skipped on later passes; a refresh wakes the analysis only when its
+    diff changed some days, and only those days are checked again.
+    """
+
+    # Signals (emitted from the analysis thread)
+    day_updated = pyqtSignal(str, object)  # camera_id, date
+
+    DUTY_CYCLE = 0.5
+    SAVE_EVERY_SEGMENTS = 20
+
+    def __init__(self, store: Optional[ActivityStore] = None):
+        super().__init__()
+        self.store = store or ActivityStore()
+        self._cameras: List[Camera] = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._complete: Dict[Tuple[str, date], int] = {}  # (camera ID, day) -> segments, all analyzed
+
+    def set_cameras(self, cameras: List[Camera], diff: Optional[ScanDiff] = None):
+        """Set the cameras to analyze and make sure the analysis is running.
+
+        With the `diff` of a refresh, only the days it changed are checked
+        again, and an empty diff does not wake the analysis at all.
+        """
+        with self._lock:
+            self._cameras = list(cameras)
+            if diff is None:
+                self._complete.clear()
+            else:
+                for camera_id, day_date in list(self._complete):
+                    if camera_id in diff.removed_cameras or diff.day_changed(camera_id, day_date):
+                        del self._complete[(camera_id, day_date)]
+        running = self._thread is not None and self._thread.is_alive()
+        if diff is not None and diff.is_empty and running:
+            return
+        self._wake.set()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _work_items(self) -> List[Tuple[Camera, RecordingDay]]:
+        items = []
+        with self._lock:
+            for camera in self._cameras:
+                for day in camera.recording_days:
+                    if self._complete.get((camera.camera_id, day.date)) != len(day.video_segments):
+                        items.append((camera, day))
+        items.sort(key=lambda item: item[1].date, reverse=True)
+        return items
+
+    def _run(self):
+        # Spawn rather than fork, so the worker starts its own Qt instead of inheriting the GUI's
+        with ProcessPoolExecutor(max_workers=1, initializer=_init_analysis_worker,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            while not self._stop.is_set():
+                self._wake.clear()
+                for camera, day in self._work_items():
+                    if self._stop.is_set() or self._wake.is_set():
+                        break
+                    self._analyze_day(pool, camera, day)
+                else:
+                    # Everything is analyzed; wait for new cameras or days
+                    self._wake.wait()
+
+    def _analyze_day(self, pool: ProcessPoolExecutor, camera: Camera, day: RecordingDay):
+        activity = self.store.load(camera.camera_id, day.date) or bytearray([NOT_ANALYZED] * ACTIVITY_BINS)
+        count = len(day.video_segments)
+        pending = pending_segments(activity, day)
+
+        unsaved = 0
+        for i in pending:
+            if self._stop.is_set() or self._wake.is_set():
+                break
+            segment = day.segment(i)  # Built one at a time; the day's columns stay unmaterialized
+            started = monotonic_time.monotonic()
+            try:
+                per_second = pool.submit(analyze_segment, segment.path, segment.duration).result()
+            except Exception as e:
+                print(f"Error analyzing segment {segment.path}: {e}")
+                per_second = None
+            # Mark undecodable segments as analyzed with no activity so they are not retried
+            fold_into_bins(activity, segment.start_seconds, per_second or [0] * segment.duration)
+
+            unsaved += 1
+            if unsaved >= self.SAVE_EVERY_SEGMENTS:
+                self.store.save(camera.camera_id, day.date, activity)
+                self.day_updated.emit(camera.camera_id, day.date)
+                unsaved = 0
+
+            # Cap CPU use by idling in proportion to the work just done
+            elapsed = monotonic_time.monotonic() - started
+            self._stop.wait(elapsed * (1.0 / self.DUTY_CYCLE - 1.0))
+        else:
+            # Every segment is covered; later passes skip the day until its segment count changes
+            with self._lock:
+                self._complete[(camera.camera_id, day.date)] = count
+        if unsaved:
+            self.store.save(camera.camera_id, day.date, activity)
+            self.day_updated.emit(camera.camera_id, day.date)
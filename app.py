@@ -1,19 +1,28 @@
 """
 Main entry point for the NAS Camera Viewer application.
 """
+from startup_timer import startup_timer  # Starts the startup clock, so keep it the first import
+
 import sys
 import os
+import multiprocessing
 
 # Suppress verbose FFmpeg logging from Qt Multimedia, which can show non-fatal warnings.
 os.environ['QT_LOGGING_RULES'] = 'qt.multimedia.ffmpeg=false'
 
-from PyQt6.QtWidgets import QApplication, QMessageBox, QStyleFactory
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QIcon
+with startup_timer.measure("import PyQt6"):
+    from PyQt6.QtWidgets import QApplication, QMessageBox, QStyleFactory
+    from PyQt6.QtCore import Qt, QTimer
+    from PyQt6.QtGui import QIcon
 
 from theme import generate_stylesheet, THEMES
+from tracing import tracer
+
+with startup_timer.measure("import main_window"):
+    from main_window import MainWindow
 
-from main_window import MainWindow
+PROFILE_STARTUP_FLAG = "--profile-startup"
+TRACE_FLAG = "--trace"
 
 
 class NASCameraViewerApp(QApplication):
@@ -40,10 +49,12 @@ class NASCameraViewerApp(QApplication):
             self.setAttribute(Qt.ApplicationAttribute.AA_UseHighDpiPixmaps, True)
         
         # Create and show main window
-        self.main_window = MainWindow()
+        with startup_timer.measure("construct MainWindow"):
+            self.main_window = MainWindow()
 
         # Apply theme
-        self.apply_theme()
+        with startup_timer.measure("apply theme"):
+            self.apply_theme()
 
         self.main_window.show()
     
@@ -60,8 +71,16 @@ class NASCameraViewerApp(QApplication):
 
 def main():
     """Main entry point."""
+    argv = list(sys.argv)
+    if PROFILE_STARTUP_FLAG in argv:
+        argv.remove(PROFILE_STARTUP_FLAG)
+        startup_timer.profiling = True
+    if TRACE_FLAG in argv:
+        argv.remove(TRACE_FLAG)
+        tracer.enable()
+    
     try:
-        app = NASCameraViewerApp(sys.argv)
+        app = NASCameraViewerApp(argv)
         return app.exec()
     except Exception as e:
         print(f"Critical error during application startup: {e}")
@@ -73,4 +92,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Needed for process pools (timelapse frame decoding) in frozen Windows builds
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Memory footprint of the recording index, with budgets per segment.
+
+For archives of increasing size (cameras x days x segments per day) this
+builds the Camera / RecordingDay / VideoSegment graph the scanner produces
+and measures with tracemalloc:
+
+    model        peak and retained bytes while building the scanned graph
+    cache        bytes on disk of the cache written from it, and save time
+    cache_load   load time and retained bytes of CacheService.load_cache
+                 (the columns are memory-mapped, so only Python objects count)
+    materialized retained bytes once every loaded day has built its segments
+
+Every figure is also given per segment. The run fails (exit code 1) when a
+per-segment figure is over its budget, so a model change cannot quietly
+double the footprint.
+
+    python benchmarks/memory_suite.py [--sizes 1x30x1440 10x730x1440] [--output memory_suite.json]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Camera, RecordingDay, VideoSegment
+from services import CacheService
+
+
+DEFAULT_SIZES = ("1x7x1440", "1x30x1440", "2x90x1440")
+
+# Bytes per segment, about twice what the models use today (~280 in memory, 45 on disk)
+BUDGETS = {
+    'model_retained': 560,
+    'model_peak': 600,
+    'cache_disk': 90,
+    'cache_load_retained': 16,
+    'materialized_retained': 560,
+}
+
+
+def build_cameras(cameras: int, days: int, per_day: int) -> list:
+    """The graph a full scan of such an archive produces."""
+    result = []
+    step = 86400 // per_day
+    last_day = date.today() - timedelta(days=1)
+    for c in range(cameras):
+        camera_path = os.path.join("nas", f"camera{c:02d}")
+        recording_days = []
+        for d in range(days):
+            day = last_day - timedelta(days=d)
+            midnight = datetime.combine(day, datetime.min.time())
+            segments = []
+            for i in range(per_day):
+                start = midnight + timedelta(seconds=i * step)
+                name = f"{start.minute:02d}M{start.second:02d}S_{int(start.timestamp())}.mp4"
+                segments.append(VideoSegment(
+                    path=os.path.join(camera_path, start.strftime("%Y%m%d%H"), name),
+                    start_time=start,
+                    duration=60,
+                    size=2_000_000 + i
+                ))
+            recording_days.append(RecordingDay(date=day, video_segments=segments, scanned_at=datetime.now()))
+        result.append(Camera(camera_id=f"camera{c:02d}", name=f"camera{c:02d}", nas_path=camera_path,
+                             recording_days=recording_days, scanned_at=datetime.now()))
+    return result
+
+
+def traced(func):
+    """Run `func` under tracemalloc; returns its result, retained bytes, peak bytes and seconds."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current - baseline, peak - baseline, seconds
+
+
+def directory_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def measure(cameras: int, days: int, per_day: int) -> dict:
+    segments = cameras * days * per_day
+    cache = CacheService()
+    shutil.rmtree(cache.cache_dir, ignore_errors=True)
+
+    built, model_retained, model_peak, build_seconds = traced(lambda: build_cameras(cameras, days, per_day))
+
+    started = time.perf_counter()
+    cache.save_cache(built)
+    save_seconds = time.perf_counter() - started
+    cache_disk = directory_size(cache.cache_dir)
+    del built
+
+    loaded, load_retained, load_peak, load_seconds = traced(cache.load_cache)
+
+    def materialize():
+        for camera in loaded:
+            for day in camera.recording_days:
+                len(day.video_segments[:1])
+    _, materialized_retained, _, materialize_seconds = traced(materialize)
+    del loaded
+    gc.collect()
+
+    result = {
+        'cameras': cameras,
+        'days': days,
+        'segments_per_day': per_day,
+        'segments': segments,
+        'model_retained_bytes': model_retained,
+        'model_peak_bytes': model_peak,
+        'build_seconds': round(build_seconds, 3),
+        'cache_disk_bytes': cache_disk,
+        'cache_save_seconds': round(save_seconds, 3),
+        'cache_load_retained_bytes': load_retained,
+        'cache_load_peak_bytes': load_peak,
+        'cache_load_seconds': round(load_seconds, 4),
+        'materialized_retained_bytes': materialized_retained + load_retained,
+        'materialize_seconds': round(materialize_seconds, 3),
+    }
+    result['per_segment'] = {
+        'model_retained': round(model_retained / segments, 1),
+        'model_peak': round(model_peak / segments, 1),
+        'cache_disk': round(cache_disk / segments, 1),
+        'cache_load_retained': round(load_retained / segments, 1),
+        'materialized_retained': round(result['materialized_retained_bytes'] / segments, 1),
+    }
+    return result
+
+
+def parse_size(text: str):
+    cameras, days, per_day = (int(part) for part in text.lower().split('x'))
+    return cameras, days, per_day
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help="Archives as CAMERASxDAYSxSEGMENTS_PER_DAY")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    work_dir = tempfile.mkdtemp(prefix="memory_suite_")
+    previous_dir = os.getcwd()
+    results = []
+    try:
+        os.chdir(work_dir)
+        for size in args.sizes:
+            results.append(measure(*parse_size(size)))
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    columns = list(BUDGETS)
+    print(f"{'archive':<14} {'segments':>9}  " + "  ".join(f"{name:>21}" for name in columns))
+    print(f"{'budget':<14} {'':>9}  " + "  ".join(f"{BUDGETS[name]:>21}" for name in columns))
+    failures = []
+    for r in results:
+        label = f"{r['cameras']}x{r['days']}x{r['segments_per_day']}"
+        cells = []
+        for name in columns:
+            value = r['per_segment'][name]
+            over = value > BUDGETS[name]
+            if over:
+                failures.append(f"{label} {name}: {value} B/segment (budget {BUDGETS[name]})")
+            cells.append(f"{value:>19.1f}{' !' if over else '  '}")
+        print(f"{label:<14} {r['segments']:>9}  " + "  ".join(cells))
+        print(f"{'':<14} {'':>9}  load {r['cache_load_seconds'] * 1000:.1f} ms, "
+              f"save {r['cache_save_seconds'] * 1000:.0f} ms, cache {r['cache_disk_bytes'] / 1e6:.1f} MB")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'budgets_bytes_per_segment': BUDGETS,
+                },
+                'results': results,
+            }, f, indent=2)
+
+    if failures:
+        print("Over budget:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("All figures within budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Synthetic camera folder trees shaped like a Xiaomi camera's NAS share.
+
+    <root>/<camera>/<YYYYMMDDHH>/<MM>M<SS>S_<epoch>.mp4
+
+The generator leaves the same irregularities real shares have: minutes and
+whole hours missing (motion-only recording, outages), extra copies of hour
+folders under names the scanner must skip (`2024010112 (1)` from a manual
+copy), and stray files (thumbnails, partial uploads, desktop.ini).
+Segment files are sparse, so their sizes look realistic without using disk.
+
+    python benchmarks/nas_tree.py <root> [--cameras 10] [--days 365] [--seed 1]
+"""
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+
+@dataclass
+class TreeSpec:
+    """How large and how irregular a generated tree is."""
+    cameras: int = 4
+    days: int = 30
+    files_per_hour: int = 60
+    missing_minute_rate: float = 0.05  # Share of minutes without a file
+    missing_hour_rate: float = 0.02  # Share of hours without a folder
+    duplicate_folder_rate: float = 0.01  # Share of hour folders with a skipped copy
+    stray_file_rate: float = 0.02  # Stray files per segment file
+    segment_size: int = 2_000_000  # Typical bytes per segment; busy minutes are larger
+    sparse_sizes: bool = True  # Give files their size (sparse); False leaves them empty
+    end_date: Optional[date] = None  # Last day (up to the current hour when today); defaults to today
+    seed: int = 1
+
+
+@dataclass
+class TreeStats:
+    cameras: int = 0
+    hour_folders: int = 0
+    segments: int = 0
+    stray_files: int = 0
+    duplicate_folders: int = 0
+
+
+STRAY_NAMES = ("thumb_{n}.jpg", "{mm}M{ss}S_{epoch}.mp4.tmp", "desktop.ini", ".DS_Store")
+
+
+def _touch(path: str, size: int) -> None:
+    with open(path, 'wb') as f:
+        if size:
+            f.truncate(size)
+
+
+def generate_tree(root: str, spec: Optional[TreeSpec] = None) -> TreeStats:
+    """Create a camera folder tree under `root` (which must not exist yet)."""
+    spec = spec or TreeSpec()
+    rng = random.Random(spec.seed)
+    stats = TreeStats()
+    now = datetime.now()
+    end_date = spec.end_date or now.date()
+    first = end_date - timedelta(days=spec.days - 1)
+    spacing = 3600 // spec.files_per_hour
+    os.makedirs(root)
+
+    for c in range(spec.cameras):
+        camera_path = os.path.join(root, f"camera{c:02d}")
+        os.makedirs(camera_path)
+        _touch(os.path.join(camera_path, "desktop.ini"), 0)
+        stats.cameras += 1
+        stats.stray_files += 1
+
+        for d in range(spec.days):
+            day = first + timedelta(days=d)
+            last_hour = now.hour if day == now.date() else 23
+            for hour in range(last_hour + 1):
+                if rng.random() < spec.missing_hour_rate:
+                    continue
+                folder = f"{day.strftime('%Y%m%d')}{hour:02d}"
+                folder_path = os.path.join(camera_path, folder)
+                os.makedirs(folder_path)
+                stats.hour_folders += 1
+                hour_start = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+
+                names = []
+                for i in range(spec.files_per_hour):
+                    if rng.random() < spec.missing_minute_rate:
+                        continue
+                    second = i * spacing + (rng.randint(0, 2) if spacing > 2 else 0)
+                    mm, ss = divmod(min(second, 3599), 60)
+                    epoch = int((hour_start + timedelta(seconds=second)).timestamp())
+                    name = f"{mm:02d}M{ss:02d}S_{epoch}.mp4"
+                    busy = rng.random() < 0.1
+                    size = int(spec.segment_size * (rng.uniform(1.5, 3.0) if busy else rng.uniform(0.9, 1.1)))
+                    _touch(os.path.join(folder_path, name), size if spec.sparse_sizes else 0)
+                    names.append((mm, ss, epoch))
+                    stats.segments += 1
+
+                    if rng.random() < spec.stray_file_rate:
+                        stray = rng.choice(STRAY_NAMES).format(n=i, mm=f"{mm:02d}", ss=f"{ss:02d}", epoch=epoch)
+                        _touch(os.path.join(folder_path, stray), 0)
+                        stats.stray_files += 1
+
+                if names and rng.random() < spec.duplicate_folder_rate:
+                    copy_path = os.path.join(camera_path, f"{folder} (1)")
+                    os.makedirs(copy_path)
+                    for mm, ss, epoch in names[:5]:
+                        _touch(os.path.join(copy_path, f"{mm:02d}M{ss:02d}S_{epoch}.mp4"), 0)
+                    stats.duplicate_folders += 1
+    return stats
+
+
+def add_recent_segments(root: str, count: int = 5) -> int:
+    """Add `count` one-minute segments after the newest one of every camera, as if recording went on."""
+    added = 0
+    for camera in sorted(os.listdir(root)):
+        camera_path = os.path.join(root, camera)
+        folders = sorted(f for f in os.listdir(camera_path) if len(f) == 10 and f.isdigit())
+        if not folders:
+            continue
+        existing = [n for n in os.listdir(os.path.join(camera_path, folders[-1])) if n.endswith('.mp4')]
+        latest = max((int(n[:2]) * 60 + int(n[3:5]) for n in existing), default=-60)
+        start = datetime.strptime(folders[-1], "%Y%m%d%H") + timedelta(seconds=latest)
+        for i in range(1, count + 1):
+            when = start + timedelta(minutes=i)
+            folder_path = os.path.join(camera_path, when.strftime("%Y%m%d%H"))
+            os.makedirs(folder_path, exist_ok=True)
+            _touch(os.path.join(folder_path, f"{when.minute:02d}M{when.second:02d}S_{int(when.timestamp())}.mp4"), 0)
+            added += 1
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic camera folder tree.")
+    parser.add_argument('root')
+    parser.add_argument('--cameras', type=int, default=TreeSpec.cameras)
+    parser.add_argument('--days', type=int, default=TreeSpec.days)
+    parser.add_argument('--files-per-hour', type=int, default=TreeSpec.files_per_hour)
+    parser.add_argument('--seed', type=int, default=TreeSpec.seed)
+    parser.add_argument('--empty-files', action='store_true', help="Do not give files a (sparse) size")
+    args = parser.parse_args()
+
+    spec = TreeSpec(cameras=args.cameras, days=args.days, files_per_hour=args.files_per_hour,
+                    seed=args.seed, sparse_sizes=not args.empty_files)
+    stats = generate_tree(args.root, spec)
+    print(f"{stats.cameras} cameras, {stats.hour_folders} hour folders, {stats.segments} segments, "
+          f"{stats.stray_files} stray files, {stats.duplicate_folders} duplicate folders")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Offscreen paint benchmarks for the timeline and the calendar, with a frame time budget.
+
+Runs under QT_QPA_PLATFORM=offscreen, so it needs no display. Every frame is
+the input event (if any) followed by rendering the widget into an image with
+QWidget.render, which runs its paintEvent as a screen update would.
+
+    timeline/<segments>/<zoom>/static   repaint at a fixed view
+    timeline/<segments>/<zoom>/hover    a mouse move across the timeline, then a repaint
+    timeline/<segments>/24h/drag        dragging the playhead across the day
+    timeline/<segments>/24h/wheel       zooming in and back out under the cursor
+    calendar/month_change               showing each month of the last two years
+    calendar/update_display             update_calendar_display on the shown month
+
+The run fails (exit code 1) when any benchmark's p95 frame time is over
+the budget.
+
+    python benchmarks/paint_suite.py [--budget-ms 16] [--frames 120] [--output paint_suite.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime, timedelta
+from statistics import median
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QEvent, QPoint, QPointF, Qt
+from PyQt6.QtGui import QImage, QMouseEvent, QWheelEvent
+from PyQt6.QtWidgets import QApplication
+
+from models import Camera, RecordingDay, VideoSegment
+from theme import THEMES
+
+
+SEGMENT_COUNTS = (0, 100, 1440)
+ZOOM_LEVELS = {'24h': 24 * 3600, '6h': 6 * 3600, '1h': 3600, '10m': 600}
+TIMELINE_SIZE = (1200, 110)
+
+
+def make_day(day: date, count: int) -> RecordingDay:
+    """`count` one-minute segments spread evenly over the day."""
+    midnight = datetime.combine(day, datetime.min.time())
+    step = 86400 // count if count else 0
+    segments = [VideoSegment(path=f"/nas/camera/{i}.mp4", start_time=midnight + timedelta(seconds=i * step),
+                             duration=60, size=2_000_000)
+                for i in range(count)]
+    return RecordingDay(date=day, video_segments=segments)
+
+
+def make_camera(days: int) -> Camera:
+    """A camera with a year or so of days, some of them partial."""
+    today = date.today()
+    return Camera(camera_id="bench", name="Bench", nas_path="/nas/camera",
+                  recording_days=[make_day(today - timedelta(days=d), 1440 if d % 7 else 600)
+                                  for d in range(days)])
+
+
+class FrameTimer:
+    """Collects per-frame durations for one benchmark."""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.target = QImage(widget.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        self.frames = []
+
+    def frame(self, action=None):
+        started = time.perf_counter()
+        if action:
+            action()
+        self.widget.render(self.target)
+        self.frames.append((time.perf_counter() - started) * 1000)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.frames)
+        return {
+            'frames': len(ordered),
+            'p50_ms': round(median(ordered), 3),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            'max_ms': round(ordered[-1], 3),
+        }
+
+
+def mouse_event(kind: QEvent.Type, x: float, y: float, buttons=Qt.MouseButton.NoButton) -> QMouseEvent:
+    """A press, release or move; `buttons` are the buttons held (or pressed/released)."""
+    button = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseMove else buttons
+    return QMouseEvent(kind, QPointF(x, y), QPointF(x, y), button, buttons, Qt.KeyboardModifier.NoModifier)
+
+
+def wheel_event(x: float, y: float, delta: int) -> QWheelEvent:
+    return QWheelEvent(QPointF(x, y), QPointF(x, y), QPoint(0, 0), QPoint(0, delta),
+                       Qt.MouseButton.NoButton, Qt.KeyboardModifier.NoModifier,
+                       Qt.ScrollPhase.NoScrollPhase, False)
+
+
+def timeline_benchmarks(frames: int, theme: dict) -> dict:
+    from timeline_widget import TimelineWidget
+
+    results = {}
+    for count in SEGMENT_COUNTS:
+        widget = TimelineWidget()
+        widget.apply_theme(theme)
+        widget.resize(*TIMELINE_SIZE)
+        widget.show()
+        widget.set_recording_day(make_day(date.today(), count))
+        widget.set_playhead_position(12 * 3600)
+        left, right = 10, widget.width() - 10
+        y = widget.hour_label_height + widget.timeline_height / 2
+
+        for zoom, duration in ZOOM_LEVELS.items():
+            widget.visible_duration_seconds = duration
+            widget.view_start_seconds = max(0, 12 * 3600 - duration / 2)
+
+            timer = FrameTimer(widget)
+            for _ in range(frames):
+                timer.frame()
+            results[f"timeline/{count}/{zoom}/static"] = timer.summary()
+
+            timer = FrameTimer(widget)
+            for i in range(frames):
+                x = left + (right - left) * i / max(1, frames - 1)
+                timer.frame(lambda: QApplication.sendEvent(widget, mouse_event(QEvent.Type.MouseMove, x, y)))
+            results[f"timeline/{count}/{zoom}/hover"] = timer.summary()
+
+        widget.visible_duration_seconds = ZOOM_LEVELS['24h']
+        widget.view_start_seconds = 0
+
+        widget.set_playhead_position(0)
+        QApplication.sendEvent(widget, mouse_event(QEvent.Type.MouseButtonPress, left, y, Qt.MouseButton.LeftButton))
+        timer = FrameTimer(widget)
+        for i in range(frames):
+            x = left + (right - left) * i / max(1, frames - 1)
+            timer.frame(lambda: QApplication.sendEvent(
+                widget, mouse_event(QEvent.Type.MouseMove, x, y, Qt.MouseButton.LeftButton)))
+        QApplication.sendEvent(widget, mouse_event(QEvent.Type.MouseButtonRelease, right, y, Qt.MouseButton.LeftButton))
+        results[f"timeline/{count}/24h/drag"] = timer.summary()
+
+        timer = FrameTimer(widget)
+        middle = (left + right) / 2
+        for i in range(frames):
+            delta = 120 if (i // 10) % 2 == 0 else -120  # Ten steps in, ten steps out
+            timer.frame(lambda: QApplication.sendEvent(widget, wheel_event(middle, y, delta)))
+        results[f"timeline/{count}/24h/wheel"] = timer.summary()
+
+        widget.deleteLater()
+    return results
+
+
+def calendar_benchmarks(frames: int, theme: dict) -> dict:
+    from calendar_widget import RecordingCalendarWidget
+
+    widget = RecordingCalendarWidget()
+    widget.apply_theme(theme)
+    widget.resize(320, 380)
+    widget.show()
+    widget.set_camera(make_camera(365))
+
+    today = date.today()
+    months = [((today.year * 12 + today.month - 1 - m) // 12, (today.year * 12 + today.month - 1 - m) % 12 + 1)
+              for m in range(24)]
+    timer = FrameTimer(widget)
+    for i in range(frames):
+        year, month = months[i % len(months)]
+        timer.frame(lambda: widget.calendar.setCurrentPage(year, month))
+    results = {"calendar/month_change": timer.summary()}
+
+    timer = FrameTimer(widget)
+    for _ in range(frames):
+        timer.frame(widget.update_calendar_display)
+    results["calendar/update_display"] = timer.summary()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=16.0, help="p95 frame time budget")
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--theme', choices=sorted(THEMES), default='light')
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    theme = THEMES[args.theme]
+    results = {}
+    results.update(timeline_benchmarks(args.frames, theme))
+    results.update(calendar_benchmarks(args.frames, theme))
+
+    over_budget = [name for name, result in results.items() if result['p95_ms'] > args.budget_ms]
+    print(f"{'benchmark':<32} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, result in results.items():
+        flag = "  OVER BUDGET" if name in over_budget else ""
+        print(f"{name:<32} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['max_ms']:>8.2f}{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'qt_platform': app.platformName(),
+                    'budget_ms': args.budget_ms,
+                    'frames': args.frames,
+                },
+                'results': results,
+            }, f, indent=2)
+
+    if over_budget:
+        print(f"{len(over_budget)} of {len(results)} benchmarks over the {args.budget_ms:g} ms p95 budget")
+        sys.exit(1)
+    print(f"All {len(results)} benchmarks within the {args.budget_ms:g} ms p95 budget")
+
+
+if __name__ == '__main__':
+    main()
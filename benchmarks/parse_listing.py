@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of segment file name parsing: per-name matching against the bulk parser.
+
+The per-name variant is what the scanner did before `filename_parser`: a
+`re.match`, two `int()` calls and a `datetime.combine` for every name.
+
+    python benchmarks/parse_listing.py [--sizes 1440 100000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import date, datetime, time as day_time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filename_parser import parse_listing
+
+
+def make_names(count: int):
+    """`count` segment names, one per second from midnight, plus a few other files."""
+    names = []
+    for i in range(count):
+        second = i % 3600
+        names.append(f"{second // 60:02d}M{second % 60:02d}S_{1756195200 + i}.mp4")
+        if i % 500 == 0:
+            names.append(f"thumb_{i}.jpg")
+    return names
+
+
+def parse_per_name(names, target_date: date, hour: int):
+    results = []
+    for name in names:
+        if not name.lower().endswith('.mp4'):
+            continue
+        match = re.match(r'(\d{2})M(\d{2})S_.*', name)
+        if not match:
+            continue
+        minute = int(match.group(1))
+        second = int(match.group(2))
+        results.append(datetime.combine(target_date, day_time(hour=hour, minute=minute, second=second)))
+    return results
+
+
+def best_of(repeat: int, func, *args) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1440, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    today = date.today()
+    print(f"{'names':>8} {'per-name ms':>12} {'bulk ms':>10} {'speedup':>8} {'bulk names/s':>14}")
+    for size in args.sizes:
+        names = make_names(size)
+        assert len(parse_listing(names, 0)) == len(parse_per_name(names, today, 0))
+        per_name = best_of(args.repeat, parse_per_name, names, today, 0)
+        bulk = best_of(args.repeat, parse_listing, names, 0)
+        print(f"{size:>8} {per_name * 1000:>12.2f} {bulk * 1000:>10.2f} {per_name / bulk:>7.1f}x "
+              f"{size / bulk:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
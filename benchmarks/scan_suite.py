@@ -0,0 +1,175 @@
+"""
+Scan, cache and model benchmarks against a synthetic NAS tree, with results written as JSON.
+
+Generates a tree (see nas_tree) in a temporary directory, points the
+application's settings at it and times:
+
+    full_scan            NASScannerService.scan_cameras with no previous scan
+    incremental_scan     the same with the previous scan and nothing changed
+    incremental_append   the same after new segments were added
+    cache_save           CacheService.save_cache into an empty cache
+    cache_save_unchanged CacheService.save_cache with every shard up to date
+    cache_load           CacheService.load_cache
+    cache_load_summary   CacheService.load_summary
+    query_*              RecordingDay / Camera queries over the loaded cameras
+
+With `--latency-ms` the scans run under the SMB latency shim. Compare runs
+by their JSON files; only the same machine and arguments are comparable.
+
+    python benchmarks/scan_suite.py [--cameras 4] [--days 30] [--latency-ms 0] [--output scan_suite.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from statistics import median
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from nas_tree import TreeSpec, add_recent_segments, generate_tree
+from smb_shim import smb_latency
+
+
+def timed(repeat: int, func, setup=None) -> dict:
+    """Run `func` `repeat` times (after `setup` each time) and summarize the durations."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - started)
+    return {
+        'min_s': round(min(runs), 6),
+        'median_s': round(median(runs), 6),
+        'max_s': round(max(runs), 6),
+        'runs': [round(r, 6) for r in runs],
+        '_result': result,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_suite(args) -> dict:
+    from models import ScanDiff, Settings
+    from services import CacheService, NASScannerService
+
+    spec = TreeSpec(cameras=args.cameras, days=args.days, files_per_hour=args.files_per_hour, seed=args.seed)
+    nas_root = os.path.join(os.getcwd(), "nas")
+    tree = generate_tree(nas_root, spec)
+    print(f"Generated {tree.segments} segments in {tree.hour_folders} hour folders")
+
+    # The scanner's ConfigService reads settings.json from the working directory
+    settings = Settings(nas_path=os.getcwd(), shared_folder="", camera_default_folder="nas")
+    with open("settings.json", 'w') as f:
+        json.dump(settings.to_dict(), f)
+
+    scanner = NASScannerService()
+    cache = CacheService()
+    latency = (lambda: smb_latency(args.latency_ms)) if args.latency_ms else nullcontext
+    results = {}
+
+    def scan(previous=None):
+        with latency():
+            return scanner.scan_cameras(previous)
+
+    results['full_scan'] = timed(args.repeat, scan)
+    cameras = results['full_scan']['_result']
+    results['incremental_scan'] = timed(args.repeat, lambda: scan(cameras))
+
+    appended = add_recent_segments(nas_root)
+
+    def scan_and_diff():
+        rescanned = scan(cameras)
+        return ScanDiff.between(cameras, rescanned)
+    results['incremental_append'] = timed(1, scan_and_diff)
+    results['incremental_append']['segments_added'] = appended
+    results['incremental_append']['changed_days'] = results['incremental_append']['_result'].changed_day_count
+    cameras = scan(cameras)
+
+    results['cache_save'] = timed(args.repeat, lambda: cache.save_cache(cameras), setup=cache.clear_cache)
+    results['cache_save_unchanged'] = timed(args.repeat, lambda: cache.save_cache(cameras))
+    results['cache_load'] = timed(args.repeat, cache.load_cache)
+    results['cache_load_summary'] = timed(args.repeat, cache.load_summary)
+
+    loaded = results['cache_load']['_result']
+    days = [day for camera in loaded for day in camera.recording_days]
+    results['query_total_duration'] = timed(args.repeat, lambda: sum(day.total_duration for day in days))
+    results['query_recording_hours'] = timed(args.repeat, lambda: [day.recording_hours for day in days])
+    results['query_segment_index_at'] = timed(
+        args.repeat, lambda: [day.segment_index_at(s) for day in days for s in range(0, 86400, 300)])
+
+    def segments_in_last_week():
+        end = datetime.now()
+        return sum(len(camera.get_segments_between(end - timedelta(days=7), end)) for camera in loaded)
+    results['query_segments_between'] = timed(args.repeat, segments_in_last_week)
+
+    def materialize_all():
+        fresh = cache.load_cache()
+        return sum(len(list(day.video_segments)) for camera in fresh for day in camera.recording_days)
+    results['query_materialize_segments'] = timed(args.repeat, materialize_all)
+
+    for result in results.values():
+        result.pop('_result')
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency_ms': args.latency_ms,
+            'repeat': args.repeat,
+            'tree': dict(asdict(spec), end_date=spec.end_date.isoformat() if spec.end_date else None),
+            'generated': asdict(tree),
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cameras', type=int, default=4)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--files-per-hour', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated SMB round trip")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default="scan_suite.json")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    work_dir = tempfile.mkdtemp(prefix="scan_suite_")
+    previous_dir = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        report = run_suite(args)
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, result in report['results'].items():
+        print(f"{name:<28} {result['median_s'] * 1000:>10.1f} ms")
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
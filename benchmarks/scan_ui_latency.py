@@ -0,0 +1,114 @@
+"""
+UI latency while the NAS is scanned, with the scanner in-process and out-of-process.
+
+Generates a camera folder tree in a temporary directory, then runs a full scan
+of it through ScanWorker while a 60 Hz timer ticks in the Qt event loop. How
+late each tick fires is the delay a paint or a player signal would see.
+
+    python benchmarks/scan_ui_latency.py [--cameras 4] [--days 30] [--files-per-hour 60]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nas_tree import TreeSpec, generate_tree
+
+FRAME_MS = 16
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(app, out_of_process: bool) -> dict:
+    """Run one full scan and record how late each timer tick fired."""
+    from PyQt6.QtCore import QTimer
+    from scan_worker import ScanWorker
+    from services import NASScannerService
+
+    shutil.rmtree("nas_cache", ignore_errors=True)
+    worker = ScanWorker(NASScannerService())
+    lateness = []
+    result = {}
+    last = time.perf_counter()
+
+    def tick():
+        nonlocal last
+        now = time.perf_counter()
+        lateness.append(max(0.0, (now - last) * 1000 - FRAME_MS))
+        last = now
+
+    def finished(cameras, diff, error):
+        result['error'] = error
+        result['cameras'] = len(cameras or [])
+        app.quit()
+
+    timer = QTimer()
+    timer.setInterval(FRAME_MS)
+    timer.timeout.connect(tick)
+    worker.finished.connect(finished)
+
+    started = time.perf_counter()
+    timer.start()
+    worker.start(None, out_of_process=out_of_process)
+    app.exec()
+    timer.stop()
+    worker.scanner.cache_service.flush()
+
+    if result.get('error'):
+        raise SystemExit(f"Scan failed: {result['error']}")
+    return {
+        'mode': 'out-of-process' if out_of_process else 'in-process',
+        'scan_seconds': round(time.perf_counter() - started, 3),
+        'cameras': result['cameras'],
+        'ticks': len(lateness),
+        'late_p50_ms': round(median(lateness), 2) if lateness else 0.0,
+        'late_p95_ms': round(percentile(lateness, 0.95), 2) if lateness else 0.0,
+        'late_max_ms': round(max(lateness), 2) if lateness else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cameras', type=int, default=4)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--files-per-hour', type=int, default=60)
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    work_dir = tempfile.mkdtemp(prefix="scan_ui_latency_")
+    try:
+        os.chdir(work_dir)
+        spec = TreeSpec(cameras=args.cameras, days=args.days, files_per_hour=args.files_per_hour)
+        tree = generate_tree(os.path.join(work_dir, "nas"), spec)
+        print(f"Generated {tree.segments} segments")
+
+        # Both the app's ConfigService and the scanner process read settings.json from here
+        from models import Settings
+        settings = Settings(nas_path=work_dir, shared_folder="", camera_default_folder="nas")
+        with open("settings.json", 'w') as f:
+            json.dump(settings.to_dict(), f)
+
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication(sys.argv)
+        results = [measure(app, out_of_process=False), measure(app, out_of_process=True)]
+
+        print(f"{'mode':<16} {'scan s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for r in results:
+            print(f"{r['mode']:<16} {r['scan_seconds']:>8.2f} {r['late_p50_ms']:>8.2f} "
+                  f"{r['late_p95_ms']:>8.2f} {r['late_max_ms']:>8.2f}")
+    finally:
+        os.chdir(os.path.dirname(work_dir))
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Check the built-in SMB backend against a Samba server, and time it against the local filesystem.
+
+Generates a camera tree (see nas_tree) in a folder the Samba server shares,
+scans it through the local backend and through the SMB backend, and checks
+that both find the same segments. It then reads one segment through the
+player's HTTP proxy, whole and by range, and compares the bytes.
+
+A throwaway Samba server in Docker sharing /tmp/nas_share as "cameras":
+
+    docker run -d --name nas-samba -p 1445:445 -v /tmp/nas_share:/share dperson/samba \\
+        -u "camera;camera" -s "cameras;/share;yes;no;no;camera"
+    python benchmarks/smb_backend_check.py --share-dir /tmp/nas_share --server 127.0.0.1:1445 \\
+        --share cameras --username camera --password camera
+
+Needs the smbprotocol package (pip install smbprotocol).
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nas_tree import TreeSpec, generate_tree
+
+
+def scan(settings) -> tuple:
+    """Scan with `settings`; returns the seconds taken, {(camera, start): size} and the cameras."""
+    from services import ConfigService, NASScannerService
+    ConfigService().update_settings(**settings.to_dict())
+    scanner = NASScannerService()
+    started = time.perf_counter()
+    cameras = scanner.scan_cameras()
+    seconds = time.perf_counter() - started
+    found = {}
+    for camera in cameras:
+        for day in camera.recording_days:
+            for segment in day.video_segments:
+                found[(camera.camera_id, segment.start_time)] = segment.size
+    return seconds, found, cameras
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--share-dir', required=True, help="Host folder the Samba server shares")
+    parser.add_argument('--server', default="127.0.0.1:445", help="host[:port] of the Samba server")
+    parser.add_argument('--share', required=True, help="Share name")
+    parser.add_argument('--username', default="")
+    parser.add_argument('--password', default="")
+    parser.add_argument('--cameras', type=int, default=2)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--files-per-hour', type=int, default=60)
+    args = parser.parse_args()
+
+    from models import Settings
+    from storage import get_backend
+
+    tree_dir = os.path.join(args.share_dir, "smb_backend_check")
+    shutil.rmtree(tree_dir, ignore_errors=True)
+    tree = generate_tree(os.path.join(tree_dir, "cameras"),
+                         TreeSpec(cameras=args.cameras, days=args.days, files_per_hour=args.files_per_hour))
+    print(f"Generated {tree.segments} segments in {tree_dir}")
+
+    work_dir = tempfile.mkdtemp(prefix="smb_backend_check_")
+    previous_dir = os.getcwd()
+    failures = []
+    try:
+        os.chdir(work_dir)
+        local = Settings(nas_path=tree_dir, shared_folder="", camera_default_folder="cameras")
+        local_seconds, local_found, _ = scan(local)
+        smb = Settings(nas_path=f"\\\\{args.server}", shared_folder=args.share,
+                       camera_default_folder="smb_backend_check\\cameras",
+                       username=args.username, password=args.password, storage_backend='smb')
+        smb_seconds, smb_found, cameras = scan(smb)
+        backend = get_backend(smb)
+        if backend.name != 'smb':
+            raise SystemExit("The SMB backend could not be started (is smbprotocol installed?)")
+
+        print(f"local scan {local_seconds:.2f} s, SMB scan {smb_seconds:.2f} s, {len(smb_found)} segments")
+        if smb_found != local_found:
+            failures.append(f"SMB scan found {len(smb_found)} segments, local {len(local_found)}; "
+                            f"{len(set(smb_found) ^ set(local_found))} differ or have other sizes")
+
+        segment = next(segment for camera in cameras for day in camera.recording_days
+                       for segment in day.video_segments if segment.size)
+        relative = segment.path.split("smb_backend_check\\", 1)[1].replace("\\", os.sep)
+        with open(os.path.join(tree_dir, relative), 'rb') as f:
+            expected = f.read()
+        url = backend.playback_source(segment.path)
+        whole = urllib.request.urlopen(url).read()
+        part = urllib.request.urlopen(urllib.request.Request(url, headers={'Range': 'bytes=100-199'})).read()
+        if whole != expected:
+            failures.append(f"proxy returned {len(whole)} bytes of {segment.path}, expected {len(expected)}")
+        if part != expected[100:200]:
+            failures.append("proxy range request returned the wrong bytes")
+        backend.close()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        shutil.rmtree(tree_dir, ignore_errors=True)
+
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("SMB backend matches the local filesystem")
+
+
+if __name__ == '__main__':
+    main()
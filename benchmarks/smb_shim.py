@@ -0,0 +1,87 @@
+"""
+A filesystem shim that adds SMB-like round-trip latency to local file access.
+
+Against a share, every stat or directory open is a network round trip, and
+a listing comes back in batches of entries. `smb_latency` patches `os.stat`,
+`os.listdir` and `os.scandir` for the duration of a `with` block so a local
+tree costs what a remote one would (`os.path.isdir` and `os.path.exists`
+go through `os.stat`). It only affects the current process.
+
+    with smb_latency(round_trip_ms=2.0):
+        scanner.scan_cameras()
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+ENTRIES_PER_RESPONSE = 100  # Entries returned by one directory query
+
+
+class _ScandirIterator:
+    """Wraps an os.scandir iterator, paying a round trip per batch of entries."""
+
+    def __init__(self, iterator, delay: float):
+        self._iterator = iterator
+        self._delay = delay
+        self._count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._count % ENTRIES_PER_RESPONSE == 0:
+            time.sleep(self._delay)
+        self._count += 1
+        return next(self._iterator)
+
+    def close(self):
+        self._iterator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LatencyStats:
+    """Round trips simulated while the shim was active."""
+
+    def __init__(self):
+        self.stats = 0
+        self.listings = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.stats + self.listings
+
+
+@contextmanager
+def smb_latency(round_trip_ms: float = 1.0):
+    """Add `round_trip_ms` to every stat and to every batch of a directory listing."""
+    delay = round_trip_ms / 1000.0
+    counters = LatencyStats()
+    real_stat, real_listdir, real_scandir = os.stat, os.listdir, os.scandir
+
+    def stat(*args, **kwargs):
+        counters.stats += 1
+        time.sleep(delay)
+        return real_stat(*args, **kwargs)
+
+    def listdir(*args, **kwargs):
+        names = real_listdir(*args, **kwargs)
+        batches = max(1, -(-len(names) // ENTRIES_PER_RESPONSE))
+        counters.listings += batches
+        time.sleep(delay * batches)
+        return names
+
+    def scandir(*args, **kwargs):
+        counters.listings += 1
+        return _ScandirIterator(real_scandir(*args, **kwargs), delay)
+
+    os.stat, os.listdir, os.scandir = stat, listdir, scandir
+    try:
+        yield counters
+    finally:
+        os.stat, os.listdir, os.scandir = real_stat, real_listdir, real_scandir
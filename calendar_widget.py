@@ -90,6 +90,12 @@ class RecordingCalendarWidget(QFrame):
         self.calendar.setSelectedDate(QDate.currentDate())
         self.update_calendar_display()
     
+    def refresh_available_dates(self):
+        """Re-read the camera's dates after its recordings changed, keeping the selection."""
+        if self.camera:
+            self.available_dates = set(self.camera.get_available_dates())
+            self.update_calendar_display()
+    
     def update_calendar_display(self):
         """Update the calendar display with available dates."""
         if not self.camera or not self.theme_dict:
@@ -10,10 +10,14 @@ from PyQt6.QtGui import QFont, QAction
 from typing import List, Optional
 from datetime import datetime, date, time, timedelta
 
-from models import Camera, RecordingDay, VideoSegment
+from models import Camera, RecordingDay, ScanDiff, VideoSegment
 from video_player import VideoPlayerWidget
 from calendar_widget import RecordingCalendarWidget
 from timeline_widget import TimelineWidget
+from export_dialog import ClipExportDialog, TimelapseDialog
+from activity_analyzer import ActivityStore
+from size_activity import SizeActivityIndex
+from performance_hud import PerformanceHud
 
 
 class CameraPlayerView(QWidget):
@@ -22,6 +26,7 @@ class CameraPlayerView(QWidget):
     # Signals
     back_to_dashboard = pyqtSignal()
     camera_switched = pyqtSignal(Camera)
+    grid_requested = pyqtSignal(object)  # Wall-clock datetime to start the grid at
     
     def __init__(self):
         super().__init__()
@@ -31,6 +36,8 @@ class CameraPlayerView(QWidget):
         self.current_camera: Optional[Camera] = None
         self.current_date: Optional[date] = None
         self.current_recording_day: Optional[RecordingDay] = None
+        self.activity_store = ActivityStore()
+        self.size_activity = SizeActivityIndex()
         
         # UI Components
         self.video_player: Optional[VideoPlayerWidget] = None
@@ -38,6 +45,7 @@ class CameraPlayerView(QWidget):
         self.timeline_widget: Optional[TimelineWidget] = None
         
         self.setup_ui()
+        self.performance_hud = PerformanceHud(self)
     
     def setup_ui(self):
         """Setup the camera player UI."""
@@ -79,6 +87,13 @@ class CameraPlayerView(QWidget):
         back_button.clicked.connect(self.back_to_dashboard.emit)
         layout.addWidget(back_button)
         
+        # Grid view button
+        grid_button = QPushButton(" Camera Grid")
+        grid_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogListView))
+        grid_button.setObjectName("backButton")
+        grid_button.clicked.connect(self.request_grid)
+        layout.addWidget(grid_button)
+        
         # Current camera info
         self.camera_info_label = QLabel("No camera selected")
         camera_font = QFont()
@@ -167,8 +182,32 @@ class CameraPlayerView(QWidget):
         self.play_button.clicked.connect(self.video_player.toggle_play_pause)
         controls_layout.addWidget(self.play_button)
 
+        self.next_activity_button = QPushButton()
+        self.next_activity_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaSeekForward))
+        self.next_activity_button.setFixedSize(40, 40)
+        self.next_activity_button.setToolTip("Jump to next activity")
+        self.next_activity_button.clicked.connect(self.jump_to_next_activity)
+        controls_layout.addWidget(self.next_activity_button)
+
+        self.busiest_button = QPushButton("Busiest")
+        self.busiest_button.setToolTip("Minutes with the most activity, estimated from file sizes")
+        self.busiest_menu = QMenu(self)
+        self.busiest_button.setMenu(self.busiest_menu)
+        controls_layout.addWidget(self.busiest_button)
+
         controls_layout.addStretch(1)
 
+        # Clip export
+        self.export_button = QPushButton("Export Clip")
+        self.export_button.setToolTip("Export a time range as a single video file")
+        self.export_button.clicked.connect(self.show_export_dialog)
+        controls_layout.addWidget(self.export_button)
+
+        self.timelapse_button = QPushButton("Timelapse")
+        self.timelapse_button.setToolTip("Build a timelapse from sampled frames")
+        self.timelapse_button.clicked.connect(self.show_timelapse_dialog)
+        controls_layout.addWidget(self.timelapse_button)
+
         # Speed control
         self.speed_button = QPushButton("1.0x")
         self.speed_button.setFixedWidth(70)
@@ -202,6 +241,7 @@ class CameraPlayerView(QWidget):
     def set_cameras(self, cameras: List[Camera]):
         """Set the list of available cameras."""
         self.cameras = cameras
+        self.size_activity.clear()
         self.update_camera_buttons()
     
     def update_camera_buttons(self):
@@ -222,6 +262,49 @@ class CameraPlayerView(QWidget):
         
         self.camera_buttons_layout.addStretch()
     
+    def update_camera_button_states(self):
+        """Check the switcher button of the current camera."""
+        for i in range(self.camera_buttons_layout.count()):
+            item = self.camera_buttons_layout.itemAt(i)
+            if item and item.widget():
+                btn = item.widget()
+                if isinstance(btn, QPushButton):
+                    btn.setChecked(self.current_camera is not None and btn.text() == self.current_camera.name)
+    
+    def apply_diff(self, diff: ScanDiff):
+        """Apply an incremental refresh in place; the open day keeps playing."""
+        if diff.added_cameras or diff.removed_cameras:
+            self.update_camera_buttons()
+            self.update_camera_button_states()
+        for camera_id in diff.changed_cameras:
+            self.size_activity.invalidate(camera_id)
+        
+        camera = self.current_camera
+        if camera is None or camera.camera_id not in diff.changed_cameras:
+            return
+        self.calendar_widget.refresh_available_dates()
+        if self.current_date is None or not diff.day_changed(camera.camera_id, self.current_date):
+            return
+        
+        day = camera.get_recording_day(self.current_date)
+        if day is None:
+            # The open day was removed from the NAS; keep playing what is loaded
+            return
+        if self.current_recording_day is None:
+            # Recordings appeared for a day that had none
+            self.load_recording_day(self.current_date)
+            return
+        
+        appended = diff.appended_segments.get(camera.camera_id, {}).get(self.current_date)
+        if day is self.current_recording_day and appended is not None:
+            self.video_player.append_to_playlist(appended)
+        else:
+            self.video_player.update_playlist(day.video_segments)
+        self.current_recording_day = day
+        self.timeline_widget.refresh_recording_day(day)
+        self.timeline_widget.set_size_activity(self.size_activity.strip(camera, day))
+        self.update_busiest_menu()
+    
     def set_current_camera(self, camera: Camera):
         """Set the current camera and load its data."""
         self.current_camera = camera
@@ -231,12 +314,7 @@ class CameraPlayerView(QWidget):
         self.calendar_widget.set_camera(camera)
         
         # Update camera button states
-        for i in range(self.camera_buttons_layout.count()):
-            item = self.camera_buttons_layout.itemAt(i)
-            if item and item.widget():
-                btn = item.widget()
-                if isinstance(btn, QPushButton):
-                    btn.setChecked(btn.text() == camera.name)
+        self.update_camera_button_states()
         
         # Load latest recording day if available
         if camera.latest_recording_date:
@@ -263,6 +341,11 @@ class CameraPlayerView(QWidget):
         if self.current_recording_day:
             # Update timeline
             self.timeline_widget.set_recording_day(self.current_recording_day)
+            self.timeline_widget.set_activity(
+                self.activity_store.load(self.current_camera.camera_id, target_date))
+            self.timeline_widget.set_size_activity(
+                self.size_activity.strip(self.current_camera, self.current_recording_day))
+            self.update_busiest_menu()
             
             # Load videos into player
             self.video_player.load_playlist(self.current_recording_day.video_segments)
@@ -277,6 +360,32 @@ class CameraPlayerView(QWidget):
             # No recordings for this date
             self.timeline_widget.clear_timeline()
             self.video_player.load_playlist([])
+            self.update_busiest_menu()
+    
+    def on_activity_updated(self, camera_id: str, updated_date: date):
+        """Refresh the heat strip when the day being shown has been analyzed further."""
+        if (self.current_camera and self.current_camera.camera_id == camera_id
+                and self.current_date == updated_date):
+            self.timeline_widget.set_activity(self.activity_store.load(camera_id, updated_date))
+    
+    def update_busiest_menu(self):
+        """List the busiest minutes of the current day, ranked by file size."""
+        self.busiest_menu.clear()
+        busiest = []
+        if self.current_camera and self.current_recording_day:
+            busiest = self.size_activity.busiest_minutes(self.current_camera, self.current_recording_day)
+        for start_time, ratio in busiest:
+            action = QAction(f"{start_time.strftime('%H:%M')}  ({ratio:.1f}× typical size)", self)
+            seconds = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+            action.triggered.connect(lambda checked, s=seconds: self.on_timeline_clicked(s))
+            self.busiest_menu.addAction(action)
+        self.busiest_button.setEnabled(bool(busiest))
+    
+    def jump_to_next_activity(self):
+        """Seek to the start of the next activity burst."""
+        target = self.timeline_widget.next_activity_time(self.timeline_widget.playhead_position)
+        if target is not None:
+            self.on_timeline_clicked(target)
     
     def on_timeline_clicked(self, seconds: float):
         """Handle timeline click to seek video."""
@@ -292,6 +401,38 @@ class CameraPlayerView(QWidget):
         if self.timeline_widget and not self.timeline_widget.dragging_playhead:
             self.timeline_widget.set_playhead_position(seconds)
     
+    def current_wall_time(self) -> Optional[datetime]:
+        """Get the wall-clock time currently shown in the player."""
+        if not self.current_date:
+            return None
+        seconds = self.video_player.get_current_time_seconds()
+        return datetime.combine(self.current_date, time()) + timedelta(seconds=seconds)
+    
+    def request_grid(self):
+        """Ask to open the grid view at the time currently shown."""
+        self.video_player.pause()
+        self.grid_requested.emit(self.current_wall_time())
+    
+    def show_export_dialog(self):
+        """Open the clip export dialog at the time currently shown."""
+        if not self.current_camera:
+            return
+        start = self.current_wall_time()
+        if start is None:
+            return
+        self.video_player.pause()
+        dialog = ClipExportDialog(self.current_camera, start.replace(microsecond=0), self)
+        dialog.exec()
+    
+    def show_timelapse_dialog(self):
+        """Open the timelapse dialog for the selected day."""
+        if not self.current_camera or not self.current_date:
+            return
+        self.video_player.pause()
+        start = datetime.combine(self.current_date, time())
+        dialog = TimelapseDialog(self.current_camera, start, start + timedelta(days=1), self)
+        dialog.exec()
+    
     def set_playback_speed(self):
         """Set the playback speed from the speed menu."""
         action = self.sender()
@@ -329,6 +470,7 @@ class CameraPlayerView(QWidget):
     
     def cleanup(self):
         """Clean up resources."""
+        self.performance_hud.set_active(False)
         if self.video_player:
             self.video_player.cleanup()
     
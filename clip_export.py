@@ -0,0 +1,612 @@
+"""
+Clip export by remuxing MP4 segments at the box level, without re-encoding.
+
+The exporter reads only the `moov` box of each source segment, concatenates
+the sample tables of matching tracks and then streams the sample bytes into
+a single output file. Video is trimmed to start on the keyframe at or before
+the requested start time so that the clip decodes from its first frame.
+"""
+import os
+import struct
+import threading
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from models import Camera, VideoSegment
+
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ClipExportError(Exception):
+    """Raised when a clip cannot be exported."""
+
+
+@dataclass
+class Box:
+    """An MP4 box with its payload (the bytes after the header)."""
+    type: bytes
+    payload: bytes
+
+    def children(self) -> List['Box']:
+        return list(iter_boxes(self.payload))
+
+    def find(self, box_type: bytes) -> Optional['Box']:
+        for child in iter_boxes(self.payload):
+            if child.type == box_type:
+                return child
+        return None
+
+    def to_bytes(self) -> bytes:
+        return make_box(self.type, self.payload)
+
+
+def iter_boxes(data: bytes):
+    """Iterate over the boxes packed in a byte string."""
+    offset = 0
+    end = len(data)
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            raise ClipExportError(f"Corrupt box '{box_type.decode('latin-1')}'")
+        yield Box(box_type, data[offset + header:offset + size])
+        offset += size
+
+
+def make_box(box_type: bytes, payload: bytes) -> bytes:
+    """Serialize a box, using a 64-bit size only when needed."""
+    size = len(payload) + 8
+    if size > 0xFFFFFFFF:
+        return struct.pack('>I4sQ', 1, box_type, size + 8) + payload
+    return struct.pack('>I4s', size, box_type) + payload
+
+
+def make_full_box(box_type: bytes, version: int, flags: int, payload: bytes) -> bytes:
+    return make_box(box_type, struct.pack('>I', (version << 24) | flags) + payload)
+
+
+def read_top_level_boxes(f: BinaryIO) -> Dict[bytes, Tuple[int, int]]:
+    """Map top-level box types to (payload offset, payload size) without reading payloads."""
+    boxes = {}
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        size, box_type = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header:
+            raise ClipExportError("Corrupt top-level box")
+        boxes.setdefault(box_type, (offset + header, size - header))
+        offset += size
+    return boxes
+
+
+@dataclass
+class TrackSamples:
+    """Sample table of one track in one source file."""
+    handler: bytes
+    timescale: int
+    tkhd: Box
+    mdhd: Box
+    hdlr: Box
+    minf: Box
+    stsd: bytes
+    offsets: array = field(default_factory=lambda: array('q'))
+    sizes: array = field(default_factory=lambda: array('L'))
+    durations: array = field(default_factory=lambda: array('L'))
+    composition_offsets: Optional[array] = None
+    ctts_version: int = 0
+    sync_samples: Optional[set] = None  # 0-based indices; None means every sample is a sync sample
+
+    @property
+    def count(self) -> int:
+        return len(self.sizes)
+
+    def decode_times(self) -> array:
+        times = array('q')
+        t = 0
+        for d in self.durations:
+            times.append(t)
+            t += d
+        return times
+
+    def is_sync(self, index: int) -> bool:
+        return self.sync_samples is None or index in self.sync_samples
+
+
+def _full_box_body(box: Box) -> Tuple[int, bytes]:
+    version = box.payload[0]
+    return version, box.payload[4:]
+
+
+def _require(parent: Box, box_type: bytes) -> Box:
+    box = parent.find(box_type)
+    if box is None:
+        raise ClipExportError(f"Missing '{box_type.decode('latin-1')}' box")
+    return box
+
+
+def _run_length_expand(body: bytes, signed: bool = False) -> List[int]:
+    count = struct.unpack_from('>I', body, 0)[0]
+    fmt = '>Ii' if signed else '>II'
+    values = []
+    for i in range(count):
+        run, value = struct.unpack_from(fmt, body, 4 + i * 8)
+        values.extend([value] * run)
+    return values
+
+
+def parse_track(trak: Box) -> TrackSamples:
+    """Expand a track's sample tables into per-sample arrays."""
+    tkhd = trak.find(b'tkhd')
+    mdia = trak.find(b'mdia')
+    mdhd = mdia.find(b'mdhd') if mdia else None
+    hdlr = mdia.find(b'hdlr') if mdia else None
+    minf = mdia.find(b'minf') if mdia else None
+    stbl = minf.find(b'stbl') if minf else None
+    if not (tkhd and mdhd and hdlr and stbl):
+        raise ClipExportError("Incomplete track header")
+
+    version, body = _full_box_body(mdhd)
+    timescale = struct.unpack_from('>I', body, 16 if version == 1 else 8)[0]
+    handler = hdlr.payload[8:12]
+
+    stsd = stbl.find(b'stsd')
+    if stsd is None:
+        raise ClipExportError("Track has no sample description")
+    track = TrackSamples(handler=handler, timescale=timescale, tkhd=tkhd, mdhd=mdhd,
+                         hdlr=hdlr, minf=minf, stsd=stsd.payload)
+
+    # Sample sizes
+    stsz = stbl.find(b'stsz')
+    if stsz is None:
+        raise ClipExportError("Unsupported sample size table (stz2)")
+    _, body = _full_box_body(stsz)
+    sample_size, sample_count = struct.unpack_from('>II', body, 0)
+    if sample_size:
+        track.sizes = array('L', [sample_size] * sample_count)
+    else:
+        track.sizes = array('L', struct.unpack_from(f'>{sample_count}I', body, 8))
+
+    # Durations
+    _, body = _full_box_body(_require(stbl, b'stts'))
+    track.durations = array('L', _run_length_expand(body))
+    if len(track.durations) != sample_count:
+        raise ClipExportError("Sample count mismatch between stts and stsz")
+
+    # Composition offsets
+    ctts = stbl.find(b'ctts')
+    if ctts is not None:
+        track.ctts_version, body = _full_box_body(ctts)
+        track.composition_offsets = array('q', _run_length_expand(body, signed=track.ctts_version == 1))
+
+    # Sync samples
+    stss = stbl.find(b'stss')
+    if stss is not None:
+        _, body = _full_box_body(stss)
+        count = struct.unpack_from('>I', body, 0)[0]
+        track.sync_samples = {n - 1 for n in struct.unpack_from(f'>{count}I', body, 4)}
+
+    # Chunk offsets
+    stco = stbl.find(b'stco')
+    if stco is not None:
+        _, body = _full_box_body(stco)
+        count = struct.unpack_from('>I', body, 0)[0]
+        chunk_offsets = struct.unpack_from(f'>{count}I', body, 4)
+    else:
+        co64 = stbl.find(b'co64')
+        if co64 is None:
+            raise ClipExportError("Track has no chunk offsets")
+        _, body = _full_box_body(co64)
+        count = struct.unpack_from('>I', body, 0)[0]
+        chunk_offsets = struct.unpack_from(f'>{count}Q', body, 4)
+
+    # Sample to chunk mapping
+    _, body = _full_box_body(_require(stbl, b'stsc'))
+    count = struct.unpack_from('>I', body, 0)[0]
+    runs = [struct.unpack_from('>III', body, 4 + i * 12) for i in range(count)]
+    for first_chunk, _, description_index in runs:
+        if description_index != 1:
+            raise ClipExportError("Tracks with multiple sample descriptions are not supported")
+
+    sample = 0
+    for i, (first_chunk, samples_per_chunk, _) in enumerate(runs):
+        last_chunk = runs[i + 1][0] - 1 if i + 1 < len(runs) else len(chunk_offsets)
+        for chunk in range(first_chunk, last_chunk + 1):
+            offset = chunk_offsets[chunk - 1]
+            for _ in range(samples_per_chunk):
+                if sample >= sample_count:
+                    break
+                track.offsets.append(offset)
+                offset += track.sizes[sample]
+                sample += 1
+    if sample != sample_count:
+        raise ClipExportError("Chunk table does not cover every sample")
+
+    return track
+
+
+@dataclass
+class SourceFile:
+    """Parsed structure of one source segment."""
+    path: str
+    ftyp: Optional[bytes]
+    mvhd: Box
+    tracks: Dict[bytes, TrackSamples]
+
+
+def parse_source(path: str) -> SourceFile:
+    """Read the `moov` of a segment and parse its tracks (media data is not read)."""
+    with open(path, 'rb') as f:
+        boxes = read_top_level_boxes(f)
+        if b'moov' not in boxes:
+            raise ClipExportError(f"{os.path.basename(path)} has no movie header (incomplete recording?)")
+        offset, size = boxes[b'moov']
+        f.seek(offset)
+        moov = Box(b'moov', f.read(size))
+        ftyp = None
+        if b'ftyp' in boxes:
+            offset, size = boxes[b'ftyp']
+            f.seek(offset)
+            ftyp = f.read(size)
+
+    mvhd = moov.find(b'mvhd')
+    if mvhd is None:
+        raise ClipExportError(f"{os.path.basename(path)} has no mvhd box")
+
+    tracks = {}
+    for child in moov.children():
+        if child.type == b'trak':
+            track = parse_track(child)
+            # Keep the first track of each kind (video, sound)
+            tracks.setdefault(track.handler, track)
+    return SourceFile(path=path, ftyp=ftyp, mvhd=mvhd, tracks=tracks)
+
+
+@dataclass
+class SampleRun:
+    """A contiguous byte range copied from a source file into the output."""
+    source: str
+    offset: int
+    size: int
+
+
+@dataclass
+class OutputTrack:
+    """Sample table being assembled for one output track."""
+    template: TrackSamples
+    sizes: array = field(default_factory=lambda: array('L'))
+    durations: array = field(default_factory=lambda: array('L'))
+    composition_offsets: array = field(default_factory=lambda: array('q'))
+    sync_samples: array = field(default_factory=lambda: array('L'))  # 1-based
+    chunk_offsets: array = field(default_factory=lambda: array('q'))
+    chunk_sample_counts: array = field(default_factory=lambda: array('L'))
+
+    @property
+    def duration(self) -> int:
+        return sum(self.durations)
+
+
+class ClipExporter:
+    """Exports a time range of a camera's recordings as one MP4 file."""
+
+    def __init__(self, segments: List[VideoSegment], start: datetime, end: datetime):
+        if end <= start:
+            raise ClipExportError("Clip end must be after its start")
+        if not segments:
+            raise ClipExportError("No recordings in the selected range")
+        self.segments = segments
+        self.start = start
+        self.end = end
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Request cancellation of a running export."""
+        self._cancel.set()
+
+    def export(self, output_path: str,
+               progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        """Write the clip to `output_path` and return its size in bytes."""
+        sources = [parse_source(segment.path) for segment in self.segments]
+        self._check_compatible(sources)
+
+        runs, out_tracks = self._plan(sources)
+        total_bytes = sum(run.size for _, run in runs)
+        if not total_bytes:
+            raise ClipExportError("The selected range contains no samples")
+
+        temp_path = output_path + ".part"
+        try:
+            with open(temp_path, 'wb') as out:
+                ftyp = sources[0].ftyp or (b'isom' + struct.pack('>I', 512) + b'isomiso2avc1mp41')
+                out.write(make_box(b'ftyp', ftyp))
+
+                # mdat header: size is known up front, so samples can be streamed
+                mdat_size = total_bytes + 16
+                out.write(struct.pack('>I4sQ', 1, b'mdat', mdat_size))
+                data_start = out.tell()
+
+                self._assign_chunk_offsets(runs, out_tracks, data_start)
+                self._copy_samples(runs, out, total_bytes, progress_callback)
+
+                out.write(self._build_moov(sources[0], out_tracks))
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return os.path.getsize(output_path)
+
+    def _check_compatible(self, sources: List[SourceFile]):
+        first = sources[0]
+        if b'vide' not in first.tracks:
+            raise ClipExportError(f"{os.path.basename(first.path)} has no video track")
+        for source in sources[1:]:
+            for handler, track in first.tracks.items():
+                other = source.tracks.get(handler)
+                if other is None or other.stsd != track.stsd or other.timescale != track.timescale:
+                    raise ClipExportError(
+                        f"{os.path.basename(source.path)} was encoded with different settings "
+                        "and cannot be joined without re-encoding")
+
+    def _plan(self, sources: List[SourceFile]) -> Tuple[List[Tuple[bytes, SampleRun]], Dict[bytes, OutputTrack]]:
+        """Select the samples of every source and lay them out in source file order."""
+        out_tracks = {handler: OutputTrack(template=track) for handler, track in sources[0].tracks.items()}
+        runs = []
+
+        for i, (segment, source) in enumerate(zip(self.segments, sources)):
+            local_start = (self.start - segment.start_time).total_seconds() if i == 0 else 0.0
+            local_end = (self.end - segment.start_time).total_seconds()
+
+            video = source.tracks[b'vide']
+            video_times = video.decode_times()
+            first, last = self._video_range(video, video_times, local_start, local_end)
+            if first >= last:
+                continue
+            cut_seconds = video_times[first] / video.timescale
+            end_seconds = (video_times[last - 1] + video.durations[last - 1]) / video.timescale
+
+            selected = []  # (source offset, handler, sample index)
+            for handler, track in source.tracks.items():
+                if handler == b'vide':
+                    indices = range(first, last)
+                else:
+                    times = track.decode_times()
+                    indices = [j for j in range(track.count)
+                                if cut_seconds <= times[j] / track.timescale < end_seconds]
+                for j in indices:
+                    selected.append((track.offsets[j], handler, j))
+            selected.sort()
+
+            for offset, handler, j in selected:
+                track = source.tracks[handler]
+                out = out_tracks[handler]
+                number = len(out.sizes) + 1
+                out.sizes.append(track.sizes[j])
+                out.durations.append(track.durations[j])
+                if track.composition_offsets is not None:
+                    out.composition_offsets.append(track.composition_offsets[j])
+                if handler == b'vide' and track.is_sync(j):
+                    out.sync_samples.append(number)
+                runs.append((handler, SampleRun(source.path, offset, track.sizes[j])))
+
+        return runs, out_tracks
+
+    @staticmethod
+    def _video_range(video: TrackSamples, times: array, local_start: float, local_end: float) -> Tuple[int, int]:
+        """Sample range starting on the keyframe at or before `local_start`."""
+        start_ticks = local_start * video.timescale
+        end_ticks = local_end * video.timescale
+        first = 0
+        for j in range(video.count):
+            if times[j] > start_ticks:
+                break
+            if video.is_sync(j):
+                first = j
+        last = first
+        while last < video.count and times[last] < end_ticks:
+            last += 1
+        return first, last
+
+    @staticmethod
+    def _assign_chunk_offsets(runs, out_tracks: Dict[bytes, OutputTrack], data_start: int):
+        """Group consecutive samples of the same track into chunks and record their offsets."""
+        position = data_start
+        previous_handler = None
+        for handler, run in runs:
+            out = out_tracks[handler]
+            if handler != previous_handler:
+                out.chunk_offsets.append(position)
+                out.chunk_sample_counts.append(0)
+                previous_handler = handler
+            out.chunk_sample_counts[-1] += 1
+            position += run.size
+
+    def _copy_samples(self, runs, out: BinaryIO, total_bytes: int,
+                      progress_callback: Optional[Callable[[int, int], None]]):
+        """Stream sample bytes, merging adjacent ranges into larger reads."""
+        copied = 0
+        merged: List[SampleRun] = []
+        for _, run in runs:
+            last = merged[-1] if merged else None
+            if last and last.source == run.source and last.offset + last.size == run.offset:
+                last.size += run.size
+            else:
+                merged.append(SampleRun(run.source, run.offset, run.size))
+
+        current_path = None
+        source = None
+        try:
+            for run in merged:
+                if run.source != current_path:
+                    if source:
+                        source.close()
+                    source = open(run.source, 'rb')
+                    current_path = run.source
+                source.seek(run.offset)
+                remaining = run.size
+                while remaining:
+                    if self._cancel.is_set():
+                        raise ClipExportError("Export cancelled")
+                    data = source.read(min(COPY_BUFFER_SIZE, remaining))
+                    if not data:
+                        raise ClipExportError(f"{os.path.basename(run.source)} is truncated")
+                    out.write(data)
+                    remaining -= len(data)
+                    copied += len(data)
+                    if progress_callback:
+                        progress_callback(copied, total_bytes)
+        finally:
+            if source:
+                source.close()
+
+    def _build_moov(self, first: SourceFile, out_tracks: Dict[bytes, OutputTrack]) -> bytes:
+        version, body = _full_box_body(first.mvhd)
+        movie_timescale = struct.unpack_from('>I', body, 16 if version == 1 else 8)[0]
+
+        traks = []
+        movie_duration = 0
+        for track_id, out in enumerate(out_tracks.values(), start=1):
+            if not out.sizes:
+                continue
+            media_duration = out.duration
+            duration = media_duration * movie_timescale // out.template.timescale
+            movie_duration = max(movie_duration, duration)
+            traks.append(self._build_trak(out, track_id, duration, media_duration))
+
+        mvhd = self._with_duration(first.mvhd, movie_duration, next_track_id=len(traks) + 1)
+        return make_box(b'moov', mvhd + b''.join(traks))
+
+    @staticmethod
+    def _with_duration(box: Box, duration: int, track_id: Optional[int] = None,
+                       next_track_id: Optional[int] = None) -> bytes:
+        """Copy an mvhd/tkhd/mdhd box with a new duration (always written as version 1)."""
+        version, body = _full_box_body(box)
+        flags = struct.unpack('>I', box.payload[:4])[0] & 0xFFFFFF
+        if version == 1:
+            created, modified = struct.unpack_from('>QQ', body, 0)
+            rest = body[28:] if box.type != b'tkhd' else body[32:]
+            scale_or_id = body[16:20]
+        else:
+            created, modified = struct.unpack_from('>II', body, 0)
+            rest = body[16:] if box.type != b'tkhd' else body[20:]
+            scale_or_id = body[8:12]
+
+        if box.type == b'tkhd':
+            if track_id is not None:
+                scale_or_id = struct.pack('>I', track_id)
+            payload = struct.pack('>QQ', created, modified) + scale_or_id + b'\0\0\0\0' + struct.pack('>Q', duration) + rest
+        else:
+            payload = struct.pack('>QQ', created, modified) + scale_or_id + struct.pack('>Q', duration) + rest
+            if box.type == b'mvhd' and next_track_id is not None:
+                payload = payload[:-4] + struct.pack('>I', next_track_id)
+        return make_full_box(box.type, 1, flags, payload)
+
+    def _build_trak(self, out: OutputTrack, track_id: int, duration: int, media_duration: int) -> bytes:
+        template = out.template
+        tkhd = self._with_duration(template.tkhd, duration, track_id=track_id)
+        mdhd = self._with_duration(template.mdhd, media_duration)
+
+        minf_children = [child.to_bytes() for child in template.minf.children() if child.type != b'stbl']
+        minf = make_box(b'minf', b''.join(minf_children) + self._build_stbl(out))
+
+        mdia = make_box(b'mdia', mdhd + template.hdlr.to_bytes() + minf)
+        return make_box(b'trak', tkhd + mdia)
+
+    @staticmethod
+    def _run_length(values: array) -> List[Tuple[int, int]]:
+        entries = []
+        for value in values:
+            if entries and entries[-1][1] == value:
+                entries[-1][0] += 1
+            else:
+                entries.append([1, value])
+        return entries
+
+    def _build_stbl(self, out: OutputTrack) -> bytes:
+        template = out.template
+        parts = [make_box(b'stsd', template.stsd)]
+
+        stts = self._run_length(out.durations)
+        parts.append(make_full_box(b'stts', 0, 0, struct.pack('>I', len(stts)) +
+                                   b''.join(struct.pack('>II', n, d) for n, d in stts)))
+
+        if template.composition_offsets is not None:
+            ctts = self._run_length(out.composition_offsets)
+            fmt = '>Ii' if template.ctts_version == 1 else '>II'
+            parts.append(make_full_box(b'ctts', template.ctts_version, 0, struct.pack('>I', len(ctts)) +
+                                       b''.join(struct.pack(fmt, n, o) for n, o in ctts)))
+
+        if template.sync_samples is not None:
+            parts.append(make_full_box(b'stss', 0, 0, struct.pack(f'>I{len(out.sync_samples)}I',
+                                                                    len(out.sync_samples), *out.sync_samples)))
+
+        stsc = []
+        for chunk, count in enumerate(out.chunk_sample_counts, start=1):
+            if not stsc or stsc[-1][1] != count:
+                stsc.append((chunk, count))
+        parts.append(make_full_box(b'stsc', 0, 0, struct.pack('>I', len(stsc)) +
+                                   b''.join(struct.pack('>III', c, n, 1) for c, n in stsc)))
+
+        parts.append(make_full_box(b'stsz', 0, 0, struct.pack(f'>II{len(out.sizes)}I', 0, len(out.sizes), *out.sizes)))
+
+        if out.chunk_offsets and max(out.chunk_offsets) > 0xFFFFFFFF:
+            parts.append(make_full_box(b'co64', 0, 0, struct.pack(f'>I{len(out.chunk_offsets)}Q',
+                                                                    len(out.chunk_offsets), *out.chunk_offsets)))
+        else:
+            parts.append(make_full_box(b'stco', 0, 0, struct.pack(f'>I{len(out.chunk_offsets)}I',
+                                                                    len(out.chunk_offsets), *out.chunk_offsets)))
+
+        return make_box(b'stbl', b''.join(parts))
+
+
+class ClipExportService:
+    """Runs clip exports on a background thread."""
+
+    def __init__(self):
+        self._exporter: Optional[ClipExporter] = None
+        self._thread = None
+
+    @property
+    def is_exporting(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def export_async(self, camera: Camera, start: datetime, end: datetime, output_path: str,
+                     progress_callback=None, complete_callback=None) -> None:
+        """Start exporting [start, end) of a camera's recordings to `output_path`."""
+        if self.is_exporting:
+            return
+
+        def worker():
+            try:
+                self._exporter = ClipExporter(camera.get_segments_between(start, end), start, end)
+                size = self._exporter.export(output_path, progress_callback)
+                if complete_callback:
+                    complete_callback(size, None)
+            except Exception as e:
+                if complete_callback:
+                    complete_callback(None, str(e))
+
+        self._thread = threading.Thread(target=worker)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def cancel(self):
+        """Cancel the running export, if any."""
+        if self._exporter:
+            self._exporter.cancel()
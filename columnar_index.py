@@ -0,0 +1,281 @@
+"""
+Memory-mapped columnar index of a camera's recordings.
+
+Each camera is stored as one file of fixed-width columns (one value per day
+or per segment) followed by a string table of file names. Opening a file
+maps it and wraps each column in a `memoryview`, so loading costs the same
+whatever the number of segments; `VideoSegment` objects are only built for
+days that are actually looked at.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header       magic, version, day count, segment count, string table size
+    days         date ordinal (i), first segment (I, day count + 1 entries),
+                 scanned_at as a POSIX timestamp, 0 if unknown (d),
+                 listed hour folders as a bit mask (I, version 2 on)
+    segments     start in seconds from midnight (I), duration (I),
+                 size (Q), flags (I), name offset (I, segment count + 1)
+    strings      UTF-8 names, indexed by the name offsets
+
+A segment's name is its file name when its path is the usual
+`<camera>/<YYYYMMDDHH>/<file>`, and its full path otherwise (FLAG_FULL_PATH).
+"""
+import io
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from models import Camera, RecordingDay, SegmentArrays, VideoSegment
+
+
+MAGIC = b'NASCIDX1'
+VERSION = 2
+HEADER = struct.Struct('<8sIIII4x')
+
+FLAG_FULL_PATH = 0x1
+
+
+class IndexFormatError(Exception):
+    """Raised when an index file is truncated or inconsistent."""
+
+
+def _pad(length: int) -> int:
+    return -length % 8
+
+
+def _column(buffer, offset: int, typecode: str, count: int):
+    """A typed view of `count` values at `offset`, and the offset after it (padded)."""
+    size = array(typecode).itemsize * count
+    end = offset + size
+    if end > len(buffer):
+        raise IndexFormatError("index file is truncated")
+    if sys.byteorder == 'little':
+        view = buffer[offset:end].cast(typecode)
+    else:
+        # The file is little-endian; copy and swap on big-endian machines
+        view = array(typecode, buffer[offset:end])
+        view.byteswap()
+    return view, end + _pad(size)
+
+
+def _folder_name(day: date, start_seconds: int) -> str:
+    return f"{day.strftime('%Y%m%d')}{start_seconds // 3600:02d}"
+
+
+class SegmentColumns(Sequence):
+    """A day's segments backed by the index columns.
+
+    `starts`, `durations` and `sizes` read straight from the mapped file;
+    indexing or iterating builds the day's `VideoSegment` objects once.
+    """
+
+    def __init__(self, index: 'CameraIndex', day: date, first: int, last: int):
+        self._index = index
+        self._day = day
+        self._first = first
+        self._last = last
+        self._segments: Optional[List[VideoSegment]] = None
+
+    @property
+    def starts(self):
+        return self._index.starts[self._first:self._last]
+
+    @property
+    def durations(self):
+        return self._index.durations[self._first:self._last]
+
+    @property
+    def sizes(self):
+        return self._index.sizes[self._first:self._last]
+
+    def __len__(self) -> int:
+        return self._last - self._first
+
+    def _materialize(self) -> List[VideoSegment]:
+        if self._segments is None:
+            midnight = datetime.combine(self._day, datetime.min.time())
+            self._segments = [self._index.segment(self._day, midnight, i) for i in range(self._first, self._last)]
+        return self._segments
+
+    def __getitem__(self, item):
+        return self._materialize()[item]
+
+    def segment(self, i: int) -> VideoSegment:
+        """The `i`th segment, built on its own unless the day is already materialized."""
+        if self._segments is not None:
+            return self._segments[i]
+        midnight = datetime.combine(self._day, datetime.min.time())
+        return self._index.segment(self._day, midnight, self._first + i)
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+
+class CameraIndex:
+    """An open index; keeps the mapping (or bytes) alive for the segment columns."""
+
+    def __init__(self, data, nas_path: str, path: str = "<memory>"):
+        self.path = path
+        self.nas_path = nas_path
+        self._data = data
+        buffer = memoryview(data)
+        if len(buffer) < HEADER.size:
+            raise IndexFormatError(f"{path} is truncated")
+
+        magic, version, day_count, segment_count, strings_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise IndexFormatError(f"{path} is not an index file")
+        if version not in (1, VERSION):
+            raise IndexFormatError(f"{path} has unsupported version {version}")
+
+        offset = HEADER.size
+        self.day_ordinals, offset = _column(buffer, offset, 'i', day_count)
+        self.day_first, offset = _column(buffer, offset, 'I', day_count + 1)
+        self.day_scanned, offset = _column(buffer, offset, 'd', day_count)
+        if version >= 2:
+            self.day_hours, offset = _column(buffer, offset, 'I', day_count)
+        else:
+            self.day_hours = [0] * day_count
+        self.starts, offset = _column(buffer, offset, 'I', segment_count)
+        self.durations, offset = _column(buffer, offset, 'I', segment_count)
+        self.sizes, offset = _column(buffer, offset, 'Q', segment_count)
+        self.flags, offset = _column(buffer, offset, 'I', segment_count)
+        self.name_offsets, offset = _column(buffer, offset, 'I', segment_count + 1)
+        if offset + strings_size > len(buffer):
+            raise IndexFormatError(f"{path} is truncated")
+        self.strings = buffer[offset:offset + strings_size]
+        if self.day_first[day_count] != segment_count or self.name_offsets[segment_count] != strings_size:
+            raise IndexFormatError(f"{path} is inconsistent")
+
+    @classmethod
+    def open(cls, path: str, nas_path: str) -> 'CameraIndex':
+        """Map an index file."""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise IndexFormatError(f"{path} is truncated")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, nas_path, path)
+
+    def segment(self, day: date, midnight: datetime, i: int) -> VideoSegment:
+        """Build the VideoSegment for row `i`."""
+        start = self.starts[i]
+        name = bytes(self.strings[self.name_offsets[i]:self.name_offsets[i + 1]]).decode('utf-8')
+        if self.flags[i] & FLAG_FULL_PATH:
+            path = name
+        else:
+            path = os.path.join(self.nas_path, _folder_name(day, start), name)
+        return VideoSegment(
+            path=path,
+            start_time=midnight + timedelta(seconds=start),
+            duration=self.durations[i],
+            size=self.sizes[i]
+        )
+
+    def recording_days(self) -> List[RecordingDay]:
+        days = []
+        for i, ordinal in enumerate(self.day_ordinals):
+            day = date.fromordinal(ordinal)
+            scanned = self.day_scanned[i]
+            days.append(RecordingDay(
+                date=day,
+                video_segments=SegmentColumns(self, day, self.day_first[i], self.day_first[i + 1]),
+                scanned_at=datetime.fromtimestamp(scanned) if scanned else None,
+                listed_hours=self.day_hours[i]
+            ))
+        return days
+
+
+def read_camera_index(path: str, camera_id: str, name: str, nas_path: str,
+                      scanned_at: Optional[datetime] = None) -> Camera:
+    """Open a camera's index file; the camera's days read from the mapped columns."""
+    return _camera(CameraIndex.open(path, nas_path), camera_id, name, scanned_at)
+
+
+def decode_camera_index(data: bytes, camera_id: str, name: str, nas_path: str,
+                        scanned_at: Optional[datetime] = None) -> Camera:
+    """Read a camera from index bytes (see `encode_camera_index`)."""
+    return _camera(CameraIndex(data, nas_path), camera_id, name, scanned_at)
+
+
+def _camera(index: CameraIndex, camera_id: str, name: str, scanned_at: Optional[datetime]) -> Camera:
+    return Camera(
+        camera_id=camera_id,
+        name=name,
+        nas_path=index.nas_path,
+        recording_days=index.recording_days(),
+        scanned_at=scanned_at
+    )
+
+
+def write_camera_index(f, camera: Camera) -> None:
+    """Write a camera's recordings to an open binary file in the index format."""
+    day_ordinals = array('i')
+    day_first = array('I')
+    day_scanned = array('d')
+    day_hours = array('I')
+    starts = array('I')
+    durations = array('I')
+    sizes = array('Q')
+    flags = array('I')
+    name_offsets = array('I')
+    strings = bytearray()
+
+    for day in sorted(camera.recording_days, key=lambda d: d.date):
+        day_ordinals.append(day.date.toordinal())
+        day_first.append(len(starts))
+        day_scanned.append(day.scanned_at.timestamp() if day.scanned_at else 0.0)
+        day_hours.append(day.listed_hours)
+        columns = day.video_segments
+        if isinstance(columns, SegmentColumns) and columns._index.nas_path == camera.nas_path:
+            # Unchanged since the last save: copy its rows without building segments
+            index, first, last = columns._index, columns._first, columns._last
+            starts.extend(index.starts[first:last])
+            durations.extend(index.durations[first:last])
+            sizes.extend(index.sizes[first:last])
+            flags.extend(index.flags[first:last])
+            base, end = index.name_offsets[first], index.name_offsets[last]
+            shift = len(strings) - base
+            name_offsets.extend(offset + shift for offset in index.name_offsets[first:last])
+            strings += index.strings[base:end]
+            continue
+        if isinstance(columns, SegmentArrays):
+            # As the scan listed it: the rows come from its columns, no segments are built
+            rows = zip(columns.paths, columns.starts, columns.durations, columns.sizes)
+        else:
+            rows = ((segment.path, segment.start_seconds, segment.duration, segment.size)
+                    for segment in columns)
+        for path, start, duration, size in rows:
+            folder = os.path.join(camera.nas_path, _folder_name(day.date, start))
+            if os.path.dirname(path) == folder:
+                name, flag = os.path.basename(path), 0
+            else:
+                name, flag = path, FLAG_FULL_PATH
+            starts.append(start)
+            durations.append(duration)
+            sizes.append(size)
+            flags.append(flag)
+            name_offsets.append(len(strings))
+            strings += name.encode('utf-8')
+    day_first.append(len(starts))
+    name_offsets.append(len(strings))
+
+    f.write(HEADER.pack(MAGIC, VERSION, len(day_ordinals), len(starts), len(strings)))
+    for column in (day_ordinals, day_first, day_scanned, day_hours, starts, durations, sizes, flags, name_offsets):
+        if sys.byteorder != 'little':
+            column.byteswap()
+        data = column.tobytes()
+        f.write(data)
+        f.write(b'\0' * _pad(len(data)))
+    f.write(strings)
+
+
+def encode_camera_index(camera: Camera) -> bytes:
+    """A camera's recordings in the index format, for sending to another process."""
+    f = io.BytesIO()
+    write_camera_index(f, camera)
+    return f.getvalue()
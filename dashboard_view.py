@@ -6,21 +6,23 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                              QProgressBar, QSizePolicy, QStyle)
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QFont, QPalette
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import date
 
-from models import Camera
+from models import Camera, CameraSummary, ScanDiff
 
 
 class CameraCard(QFrame):
     """Widget representing a single camera as a card."""
     
     clicked = pyqtSignal(Camera)
+    summary_clicked = pyqtSignal(object)  # CameraSummary, while the camera is still loading
     
-    def __init__(self, camera: Camera):
+    def __init__(self, camera: Union[Camera, CameraSummary]):
         super().__init__()
         self.camera = camera
         self.setup_ui()
+        self.update_status()
         self.setObjectName("CameraCard")
         self.setFixedSize(300, 220)
     
@@ -44,20 +46,14 @@ class CameraCard(QFrame):
         info_layout.setSpacing(5)
         
         # Total recording days
-        days_label = QLabel(f"Recording days: {self.camera.total_recording_days}")
-        days_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        info_layout.addWidget(days_label)
+        self.days_label = QLabel()
+        self.days_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        info_layout.addWidget(self.days_label)
         
         # Latest recording date
-        if self.camera.latest_recording_date:
-            latest_label = QLabel(f"Latest: {self.camera.latest_recording_date.strftime('%Y-%m-%d')}")
-            latest_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            info_layout.addWidget(latest_label)
-        else:
-            no_data_label = QLabel("No recordings found")
-            no_data_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_data_label.setObjectName("mutedText")
-            info_layout.addWidget(no_data_label)
+        self.latest_label = QLabel()
+        self.latest_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        info_layout.addWidget(self.latest_label)
         
         layout.addLayout(info_layout)
         
@@ -65,22 +61,61 @@ class CameraCard(QFrame):
         status_frame = QFrame()
         status_layout = QHBoxLayout(status_frame); status_layout.setContentsMargins(0,0,0,0)
         
-        status_dot = QLabel("●")
-        status_dot.setProperty("status", "active" if self.camera.has_recordings else "inactive")
-        status_text = QLabel("Active" if self.camera.has_recordings else "No Data")
-        status_text.setProperty("status", "active" if self.camera.has_recordings else "inactive")
+        self.status_dot = QLabel("●")
+        self.status_text = QLabel()
         
-        status_layout.addWidget(status_dot)
-        status_layout.addWidget(status_text)
+        status_layout.addWidget(self.status_dot)
+        status_layout.addWidget(self.status_text)
         status_layout.addStretch()
         
         layout.addWidget(status_frame)
         layout.addStretch()
     
+    @property
+    def is_ready(self) -> bool:
+        """Whether the camera's recordings are loaded (not just its summary)."""
+        return isinstance(self.camera, Camera)
+    
+    def set_camera(self, camera: Camera):
+        """Replace the summary with the fully loaded camera, or show its updated recordings."""
+        self.camera = camera
+        self.update_status()
+    
+    def update_info(self):
+        """Update the recording days and latest date labels."""
+        self.days_label.setText(f"Recording days: {self.camera.total_recording_days}")
+        if self.camera.latest_recording_date:
+            self.latest_label.setText(f"Latest: {self.camera.latest_recording_date.strftime('%Y-%m-%d')}")
+            self.latest_label.setObjectName("")
+        else:
+            self.latest_label.setText("No recordings found")
+            self.latest_label.setObjectName("mutedText")
+        self.latest_label.style().unpolish(self.latest_label)
+        self.latest_label.style().polish(self.latest_label)
+    
+    def update_status(self):
+        """Update the info labels and the status indicator."""
+        self.update_info()
+        if not self.is_ready:
+            status, text = "inactive", "Loading..."
+        elif self.camera.has_recordings:
+            status, text = "active", "Active"
+        else:
+            status, text = "inactive", "No Data"
+        for label in (self.status_dot, self.status_text):
+            label.setProperty("status", status)
+            # Re-polish so the stylesheet picks up the new property value
+            label.style().unpolish(label)
+            label.style().polish(label)
+        self.status_text.setText(text)
+    
     def mousePressEvent(self, event):
         """Handle mouse click."""
         if event.button() == Qt.MouseButton.LeftButton:
-            self.clicked.emit(self.camera)
+            if self.is_ready:
+                self.clicked.emit(self.camera)
+            else:
+                self.summary_clicked.emit(self.camera)
         super().mousePressEvent(event)
 
 
@@ -88,10 +123,11 @@ class DashboardView(QWidget):
     """Main dashboard view showing camera cards."""
     
     camera_selected = pyqtSignal(Camera)
+    camera_summary_selected = pyqtSignal(object)  # CameraSummary of a camera not loaded yet
     
     def __init__(self):
         super().__init__()
-        self.cameras: List[Camera] = []
+        self.cameras: List[Union[Camera, CameraSummary]] = []
         self.camera_cards: List[CameraCard] = []
         self.setup_ui()
     
@@ -190,6 +226,32 @@ class DashboardView(QWidget):
         self.cameras = cameras
         self.update_cards()
     
+    def set_camera_summaries(self, summaries: List[CameraSummary]):
+        """Show cards from cached summaries while the full camera data loads."""
+        self.cameras = list(summaries)
+        self.update_cards()
+    
+    def set_camera_ready(self, camera: Camera):
+        """Make a camera's card clickable once its recordings are loaded."""
+        for i, existing in enumerate(self.cameras):
+            if existing.camera_id == camera.camera_id:
+                self.cameras[i] = camera
+                break
+        for card in self.camera_cards:
+            if card.camera.camera_id == camera.camera_id:
+                card.set_camera(camera)
+                break
+    
+    def apply_diff(self, diff: ScanDiff):
+        """Update the cards after an incremental refresh, rebuilding only if cameras came or went."""
+        if diff.added_cameras or diff.removed_cameras:
+            self.update_cards()
+            return
+        changed = set(diff.changed_cameras)
+        for card in self.camera_cards:
+            if card.camera.camera_id in changed:
+                card.update_status()
+    
     def update_cards(self):
         """Update the camera cards display."""
         # Clear existing cards
@@ -212,6 +274,7 @@ class DashboardView(QWidget):
         for i, camera in enumerate(self.cameras):
             card = CameraCard(camera)
             card.clicked.connect(self.on_camera_clicked)
+            card.summary_clicked.connect(self.camera_summary_selected)
             
             row = i // columns
             col = i % columns
@@ -0,0 +1,317 @@
+"""
+Dialogs for exporting a camera's recordings as a single clip or a timelapse.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                             QDateTimeEdit, QLineEdit, QPushButton, QProgressBar,
+                             QFileDialog, QMessageBox, QSpinBox, QComboBox)
+from PyQt6.QtCore import pyqtSignal, QDateTime
+
+from models import Camera
+from clip_export import ClipExportService
+from timelapse import TimelapseJob, TimelapseService
+
+
+class ClipExportDialog(QDialog):
+    """Dialog that exports [start, end) of a camera to an MP4 file without re-encoding."""
+
+    # Signals (emitted from the export thread, delivered on the GUI thread)
+    progress_updated = pyqtSignal('qint64', 'qint64')  # Bytes copied, total bytes (64-bit: exports pass 2 GiB)
+    export_finished = pyqtSignal(object, object)  # Output size or None, error or None
+
+    def __init__(self, camera: Camera, start: datetime, parent=None):
+        super().__init__(parent)
+        self.camera = camera
+        self.export_service = ClipExportService()
+
+        self.setWindowTitle(f"Export Clip - {camera.name}")
+        self.setMinimumWidth(480)
+
+        self.setup_ui(start)
+
+        self.progress_updated.connect(self.on_progress)
+        self.export_finished.connect(self.on_finished)
+
+    def setup_ui(self, start: datetime):
+        """Setup the dialog UI."""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        grid_layout = QGridLayout()
+        grid_layout.setSpacing(10)
+
+        grid_layout.addWidget(QLabel("Start:"), 0, 0)
+        self.start_edit = QDateTimeEdit(QDateTime(start))
+        self.start_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.start_edit.setCalendarPopup(True)
+        grid_layout.addWidget(self.start_edit, 0, 1)
+
+        grid_layout.addWidget(QLabel("End:"), 1, 0)
+        self.end_edit = QDateTimeEdit(QDateTime(start + timedelta(minutes=10)))
+        self.end_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.end_edit.setCalendarPopup(True)
+        grid_layout.addWidget(self.end_edit, 1, 1)
+
+        grid_layout.addWidget(QLabel("Save to:"), 2, 0)
+        path_layout = QHBoxLayout()
+        default_name = f"{self.camera.camera_id}_{start.strftime('%Y%m%d_%H%M%S')}.mp4"
+        self.output_edit = QLineEdit(os.path.join(os.path.expanduser("~"), default_name))
+        path_layout.addWidget(self.output_edit)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_output)
+        path_layout.addWidget(browse_button)
+        grid_layout.addLayout(path_layout, 2, 1)
+
+        layout.addLayout(grid_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("The clip starts at the nearest keyframe before the start time.")
+        self.status_label.setObjectName("mutedText")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_or_close)
+        button_layout.addWidget(self.cancel_button)
+
+        self.export_button = QPushButton("Export")
+        self.export_button.setObjectName("saveButton")
+        self.export_button.clicked.connect(self.start_export)
+        button_layout.addWidget(self.export_button)
+
+        layout.addLayout(button_layout)
+
+    def browse_output(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Clip", self.output_edit.text(), "MP4 Video (*.mp4)")
+        if path:
+            self.output_edit.setText(path)
+
+    def start_export(self):
+        """Validate the range and start the background export."""
+        start = self.start_edit.dateTime().toPyDateTime()
+        end = self.end_edit.dateTime().toPyDateTime()
+        output_path = self.output_edit.text().strip()
+
+        if end <= start:
+            QMessageBox.warning(self, "Invalid Range", "The end time must be after the start time.")
+            return
+        if not output_path:
+            QMessageBox.warning(self, "Invalid Input", "Choose where to save the clip.")
+            return
+
+        self.export_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.status_label.setText("Exporting...")
+
+        self.export_service.export_async(
+            self.camera, start, end, output_path,
+            progress_callback=self.progress_updated.emit,
+            complete_callback=self.export_finished.emit
+        )
+
+    def on_progress(self, copied: int, total: int):
+        if total:
+            self.progress_bar.setValue(int(copied * 100 / total))
+            self.status_label.setText(f"Exporting... {copied / 1_048_576:.1f} / {total / 1_048_576:.1f} MB")
+
+    def on_finished(self, size: Optional[int], error: Optional[str]):
+        self.export_button.setEnabled(True)
+        if error:
+            self.progress_bar.hide()
+            self.status_label.setText(f"Export failed: {error}")
+        else:
+            self.progress_bar.setValue(100)
+            self.status_label.setText(f"Saved {size / 1_048_576:.1f} MB to {self.output_edit.text()}")
+
+    def cancel_or_close(self):
+        if self.export_service.is_exporting:
+            self.export_service.cancel()
+        else:
+            self.reject()
+
+    def closeEvent(self, event):
+        self.export_service.cancel()
+        super().closeEvent(event)
+
+    def reject(self):
+        """Escape closes the dialog without a closeEvent; stop the worker here too."""
+        self.export_service.cancel()
+        super().reject()
+
+
+class TimelapseDialog(QDialog):
+    """Dialog that builds a timelapse by sampling one frame every N seconds."""
+
+    # Signals (emitted from the build thread, delivered on the GUI thread)
+    progress_updated = pyqtSignal(int, int, int)  # Segments done, total segments, frames written
+    build_finished = pyqtSignal(object, object)  # Frame count or None, error or None
+
+    FRAME_SIZES = [(640, 360), (1280, 720), (1920, 1080)]
+
+    def __init__(self, camera: Camera, start: datetime, end: datetime, parent=None):
+        super().__init__(parent)
+        self.camera = camera
+        self.timelapse_service = TimelapseService()
+
+        self.setWindowTitle(f"Build Timelapse - {camera.name}")
+        self.setMinimumWidth(480)
+
+        self.setup_ui(start, end)
+
+        self.progress_updated.connect(self.on_progress)
+        self.build_finished.connect(self.on_finished)
+
+    def setup_ui(self, start: datetime, end: datetime):
+        """Setup the dialog UI."""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        grid_layout = QGridLayout()
+        grid_layout.setSpacing(10)
+
+        grid_layout.addWidget(QLabel("From:"), 0, 0)
+        self.start_edit = QDateTimeEdit(QDateTime(start))
+        self.start_edit.setDisplayFormat("yyyy-MM-dd HH:mm")
+        self.start_edit.setCalendarPopup(True)
+        grid_layout.addWidget(self.start_edit, 0, 1)
+
+        grid_layout.addWidget(QLabel("To:"), 1, 0)
+        self.end_edit = QDateTimeEdit(QDateTime(end))
+        self.end_edit.setDisplayFormat("yyyy-MM-dd HH:mm")
+        self.end_edit.setCalendarPopup(True)
+        grid_layout.addWidget(self.end_edit, 1, 1)
+
+        grid_layout.addWidget(QLabel("One frame every (seconds):"), 2, 0)
+        self.interval_spinbox = QSpinBox()
+        self.interval_spinbox.setRange(1, 3600)
+        self.interval_spinbox.setValue(60)
+        grid_layout.addWidget(self.interval_spinbox, 2, 1)
+
+        grid_layout.addWidget(QLabel("Frames per second:"), 3, 0)
+        self.fps_spinbox = QSpinBox()
+        self.fps_spinbox.setRange(1, 60)
+        self.fps_spinbox.setValue(25)
+        grid_layout.addWidget(self.fps_spinbox, 3, 1)
+
+        grid_layout.addWidget(QLabel("Frame size:"), 4, 0)
+        self.size_combo = QComboBox()
+        for width, height in self.FRAME_SIZES:
+            self.size_combo.addItem(f"{width}×{height}", (width, height))
+        self.size_combo.setCurrentIndex(1)
+        grid_layout.addWidget(self.size_combo, 4, 1)
+
+        grid_layout.addWidget(QLabel("Save to:"), 5, 0)
+        path_layout = QHBoxLayout()
+        default_name = f"{self.camera.camera_id}_{start.strftime('%Y%m%d')}_timelapse.avi"
+        self.output_edit = QLineEdit(os.path.join(os.path.expanduser("~"), default_name))
+        path_layout.addWidget(self.output_edit)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_output)
+        path_layout.addWidget(browse_button)
+        grid_layout.addLayout(path_layout, 5, 1)
+
+        layout.addLayout(grid_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Interrupted builds resume from the last completed segment.")
+        self.status_label.setObjectName("mutedText")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_or_close)
+        button_layout.addWidget(self.cancel_button)
+
+        self.build_button = QPushButton("Build")
+        self.build_button.setObjectName("saveButton")
+        self.build_button.clicked.connect(self.start_build)
+        button_layout.addWidget(self.build_button)
+
+        layout.addLayout(button_layout)
+
+    def browse_output(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Timelapse", self.output_edit.text(), "AVI Video (*.avi)")
+        if path:
+            self.output_edit.setText(path)
+
+    def create_job(self) -> TimelapseJob:
+        width, height = self.size_combo.currentData()
+        return TimelapseJob(
+            camera_id=self.camera.camera_id,
+            start=self.start_edit.dateTime().toPyDateTime(),
+            end=self.end_edit.dateTime().toPyDateTime(),
+            interval_seconds=self.interval_spinbox.value(),
+            output_path=self.output_edit.text().strip(),
+            fps=self.fps_spinbox.value(),
+            width=width,
+            height=height
+        )
+
+    def start_build(self):
+        """Validate the job and start (or resume) the background build."""
+        job = self.create_job()
+        if job.end <= job.start:
+            QMessageBox.warning(self, "Invalid Range", "The end time must be after the start time.")
+            return
+        if not job.output_path:
+            QMessageBox.warning(self, "Invalid Input", "Choose where to save the timelapse.")
+            return
+
+        resuming = self.timelapse_service.has_partial_build(job)
+        self.build_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.status_label.setText("Resuming timelapse..." if resuming else "Building timelapse...")
+
+        self.timelapse_service.build_async(
+            self.camera, job,
+            progress_callback=self.progress_updated.emit,
+            complete_callback=self.build_finished.emit
+        )
+
+    def on_progress(self, done: int, total: int, frames: int):
+        if total:
+            self.progress_bar.setValue(int(done * 100 / total))
+            self.status_label.setText(f"Segment {done}/{total} - {frames} frames written")
+
+    def on_finished(self, frames: Optional[int], error: Optional[str]):
+        self.build_button.setEnabled(True)
+        if error:
+            self.progress_bar.hide()
+            self.status_label.setText(error)
+        else:
+            self.progress_bar.setValue(100)
+            self.status_label.setText(f"Saved {frames} frames to {self.output_edit.text()}")
+
+    def cancel_or_close(self):
+        if self.timelapse_service.is_building:
+            self.timelapse_service.cancel()
+        else:
+            self.reject()
+
+    def closeEvent(self, event):
+        self.timelapse_service.cancel()
+        super().closeEvent(event)
+
+    def reject(self):
+        """Escape closes the dialog without a closeEvent; stop the worker here too."""
+        self.timelapse_service.cancel()
+        super().reject()
@@ -0,0 +1,47 @@
+"""
+Bulk parsing of segment file names from a folder listing.
+
+Cameras write one file per minute into hour folders, named
+`<MM>M<SS>S_<epoch>.mp4`. Rather than matching each name on its own,
+`parse_listing` joins a whole listing into one string, runs a single
+compiled pattern over it and collects the results into columns, which the
+scanner keeps as the day's columns (see models.SegmentArrays).
+"""
+import re
+from array import array
+from typing import List, Sequence
+
+
+# One name per line: the whole name, minute and second
+LISTING_PATTERN = re.compile(r'^((\d\d)M(\d\d)S_\d{0,18}[^\n]*?(?i:\.mp4))$', re.MULTILINE)
+
+_TWO_DIGITS = {f"{i:02d}": i for i in range(60)}
+
+
+class ParsedListing:
+    """The segment files of one listing, as parallel columns in listing order."""
+
+    __slots__ = ('names', 'starts')
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.starts = array('I')  # Seconds from midnight
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def parse_listing(names: Sequence[str], hour: int) -> ParsedListing:
+    """Parse the segment file names of an hour folder; other names are skipped."""
+    listing = ParsedListing()
+    text = "\n".join(name for name in names if "\n" not in name)
+    base = hour * 3600
+    for name, minute, second in LISTING_PATTERN.findall(text):
+        minutes = _TWO_DIGITS.get(minute)
+        seconds = _TWO_DIGITS.get(second)
+        if minutes is None or seconds is None:
+            print(f"Error parsing time from filename {name}: out of range")
+            continue
+        listing.names.append(name)
+        listing.starts.append(base + minutes * 60 + seconds)
+    return listing
@@ -0,0 +1,149 @@
+"""
+Frame extraction from video segments using Qt Multimedia, for use in worker processes.
+
+Worker processes have no GUI of their own, so `init_worker` starts an
+offscreen QGuiApplication once per process before any frames are grabbed.
+"""
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import Qt, QEventLoop, QTimer, QUrl, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QGuiApplication, QImage, QPainter, QColor
+from PyQt6.QtMultimedia import QMediaPlayer, QVideoSink, QVideoFrame
+
+
+LOAD_TIMEOUT_MS = 10000
+FRAME_TIMEOUT_MS = 3000
+
+_app = None
+
+
+def init_worker() -> None:
+    """Initialize Qt in a worker process (ProcessPoolExecutor initializer)."""
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.environ.setdefault('QT_LOGGING_RULES', 'qt.multimedia.ffmpeg=false')
+    if QGuiApplication.instance() is None:
+        _app = QGuiApplication([])
+
+
+class FrameGrabber:
+    """Decodes frames at chosen positions of a single video file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.player = QMediaPlayer()
+        self.sink = QVideoSink()
+        self.player.setVideoSink(self.sink)
+        self._frame: Optional[QVideoFrame] = None
+        self._loop = QEventLoop()
+        self._timeout = QTimer()
+        self._timeout.setSingleShot(True)
+        self._timeout.timeout.connect(self._loop.quit)
+        self.sink.videoFrameChanged.connect(self._on_frame)
+        self.player.mediaStatusChanged.connect(self._on_status)
+
+    def _on_frame(self, frame: QVideoFrame):
+        if frame.isValid():
+            self._frame = frame
+            self._loop.quit()
+
+    def _on_status(self, status: QMediaPlayer.MediaStatus):
+        if status in (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.InvalidMedia):
+            self._loop.quit()
+
+    def _wait(self, timeout_ms: int):
+        self._timeout.start(timeout_ms)
+        self._loop.exec()
+        self._timeout.stop()
+
+    def open(self) -> bool:
+        """Load the file; returns False if it cannot be decoded."""
+        self.player.setSource(QUrl.fromLocalFile(self.path))
+        if self.player.mediaStatus() != QMediaPlayer.MediaStatus.LoadedMedia:
+            self._wait(LOAD_TIMEOUT_MS)
+        return self.player.mediaStatus() == QMediaPlayer.MediaStatus.LoadedMedia
+
+    def grab(self, position_ms: int) -> Optional[QImage]:
+        """Decode the frame shown at `position_ms`."""
+        self._frame = None
+        self.player.setPosition(position_ms)
+        self.player.pause()
+        if self._frame is None:
+            self._wait(FRAME_TIMEOUT_MS)
+        if self._frame is None:
+            return None
+        image = self._frame.toImage()
+        return None if image.isNull() else image
+
+    def close(self):
+        self.player.stop()
+        self.player.setSource(QUrl())
+
+
+def fit_image(image: QImage, size: Tuple[int, int]) -> QImage:
+    """Scale an image into a fixed-size frame, letterboxing to keep its aspect ratio."""
+    width, height = size
+    scaled = image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio,
+                          Qt.TransformationMode.SmoothTransformation)
+    if scaled.width() == width and scaled.height() == height:
+        return scaled.convertToFormat(QImage.Format.Format_RGB888)
+    canvas = QImage(width, height, QImage.Format.Format_RGB888)
+    canvas.fill(QColor("#000000"))
+    painter = QPainter(canvas)
+    painter.drawImage((width - scaled.width()) // 2, (height - scaled.height()) // 2, scaled)
+    painter.end()
+    return canvas
+
+
+def encode_jpeg(image: QImage, quality: int = 80) -> bytes:
+    """Encode an image as JPEG bytes."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPG", quality)
+    buffer.close()
+    return bytes(data)
+
+
+def grab_jpeg_frames(path: str, positions_ms: Sequence[int], size: Tuple[int, int],
+                     quality: int = 80) -> List[Optional[bytes]]:
+    """Decode frames at the given positions and return them as JPEG bytes (None on failure)."""
+    grabber = FrameGrabber(path)
+    try:
+        if not grabber.open():
+            return [None] * len(positions_ms)
+        frames = []
+        for position in positions_ms:
+            image = grabber.grab(position)
+            frames.append(encode_jpeg(fit_image(image, size), quality) if image is not None else None)
+        return frames
+    finally:
+        grabber.close()
+
+
+def grab_gray_frames(path: str, positions_ms: Sequence[int], size: Tuple[int, int]) -> List[Optional[bytes]]:
+    """Decode frames at the given positions as packed 8-bit grayscale (None on failure)."""
+    width, height = size
+    grabber = FrameGrabber(path)
+    try:
+        if not grabber.open():
+            return [None] * len(positions_ms)
+        frames = []
+        for position in positions_ms:
+            image = grabber.grab(position)
+            if image is None:
+                frames.append(None)
+                continue
+            gray = image.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                Qt.TransformationMode.FastTransformation)
+            gray = gray.convertToFormat(QImage.Format.Format_Grayscale8)
+            # Rows are padded to 32-bit boundaries; keep only the pixels
+            stride = gray.bytesPerLine()
+            bits = gray.constBits()
+            bits.setsize(stride * height)
+            raw = bytes(bits)
+            frames.append(b''.join(raw[row * stride:row * stride + width] for row in range(height)))
+        return frames
+    finally:
+        grabber.close()
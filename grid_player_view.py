@@ -0,0 +1,663 @@
+"""
+Multi-camera grid view playing several cameras in sync on a shared clock.
+"""
+import time as monotonic_time
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame,
+                             QPushButton, QLabel, QComboBox, QDateEdit, QMenu, QStyle,
+                             QSizePolicy)
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer, QUrl, QDate, QRect
+from PyQt6.QtGui import QPainter, QColor, QFont, QImage, QAction
+from PyQt6.QtMultimedia import QMediaPlayer, QVideoSink, QVideoFrame
+
+from models import Camera, RecordingDay, ScanDiff, VideoSegment
+from segment_prefetcher import SegmentPrefetcher
+from timeline_widget import TimelineWidget
+from tracing import traced
+
+
+class MasterClock(QObject):
+    """Wall-clock time shared by every tile in the grid."""
+
+    # Signals
+    ticked = pyqtSignal(object)  # Current wall-clock datetime
+    seeked = pyqtSignal(object)  # New wall-clock datetime after a jump
+
+    TICK_INTERVAL_MS = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._anchor_time = datetime.now()
+        self._anchor_mono = monotonic_time.monotonic()
+        self._rate = 1.0
+        self._playing = False
+        self.last_tick_lateness_ms = 0.0
+        self._last_tick_mono = self._anchor_mono
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.TICK_INTERVAL_MS)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def is_playing(self) -> bool:
+        return self._playing
+
+    @property
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def current_time(self) -> datetime:
+        """Get the current wall-clock time of the recordings being shown."""
+        if not self._playing:
+            return self._anchor_time
+        elapsed = monotonic_time.monotonic() - self._anchor_mono
+        return self._anchor_time + timedelta(seconds=elapsed * self._rate)
+
+    def _reanchor(self, new_time: Optional[datetime] = None):
+        self._anchor_time = new_time if new_time is not None else self.current_time()
+        self._anchor_mono = monotonic_time.monotonic()
+
+    def seek(self, target: datetime):
+        """Jump to a new wall-clock time."""
+        self._reanchor(target)
+        self.seeked.emit(target)
+        self.ticked.emit(target)
+
+    def play(self):
+        if not self._playing:
+            self._reanchor()
+            self._playing = True
+
+    def pause(self):
+        if self._playing:
+            self._reanchor()
+            self._playing = False
+
+    def set_rate(self, rate: float):
+        self._reanchor()
+        self._rate = rate
+
+    def stop(self):
+        self.pause()
+        self._timer.stop()
+
+    def start(self):
+        if not self._timer.isActive():
+            self._last_tick_mono = monotonic_time.monotonic()
+            self._timer.start()
+
+    def _on_timeout(self):
+        now = monotonic_time.monotonic()
+        self.last_tick_lateness_ms = max(0.0, (now - self._last_tick_mono) * 1000 - self.TICK_INTERVAL_MS)
+        self._last_tick_mono = now
+        self.ticked.emit(self.current_time())
+
+
+class FrameBudgetGovernor:
+    """Caps the frame rate of background tiles when the GUI thread is saturated.
+
+    Saturation is judged once a second from how late the master clock ticks
+    arrive and how much time was spent converting frames. Each level halves
+    the frame rate allowed for tiles that are not focused.
+    """
+
+    LEVELS = [0, 15, 8, 4, 2, 1]  # Max frames per second for background tiles, 0 = uncapped
+    WINDOW_SECONDS = 1.0
+    HIGH_LATENESS_MS = 30.0
+    LOW_LATENESS_MS = 5.0
+    HIGH_WORK_RATIO = 0.5
+    LOW_WORK_RATIO = 0.2
+
+    def __init__(self):
+        self.level = 0
+        self._window_start = monotonic_time.monotonic()
+        self._work_seconds = 0.0
+        self._lateness_total = 0.0
+        self._lateness_samples = 0
+        self._calm_windows = 0
+        self._last_frame: Dict[int, float] = {}
+
+    @property
+    def background_fps(self) -> int:
+        return self.LEVELS[self.level]
+
+    def record_tick(self, lateness_ms: float):
+        """Record the lateness of a master clock tick."""
+        self._lateness_total += lateness_ms
+        self._lateness_samples += 1
+        self._evaluate()
+
+    def record_work(self, seconds: float):
+        """Record time spent converting and scaling a frame."""
+        self._work_seconds += seconds
+
+    def allow_frame(self, tile_key: int, focused: bool) -> bool:
+        """Decide whether a tile may convert and show the frame it just received."""
+        now = monotonic_time.monotonic()
+        fps = self.background_fps
+        if not focused and fps:
+            last = self._last_frame.get(tile_key, 0.0)
+            if now - last < 1.0 / fps:
+                return False
+        self._last_frame[tile_key] = now
+        return True
+
+    def _evaluate(self):
+        now = monotonic_time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.WINDOW_SECONDS:
+            return
+
+        lateness = self._lateness_total / max(1, self._lateness_samples)
+        work_ratio = self._work_seconds / elapsed
+
+        if lateness > self.HIGH_LATENESS_MS or work_ratio > self.HIGH_WORK_RATIO:
+            self.level = min(self.level + 1, len(self.LEVELS) - 1)
+            self._calm_windows = 0
+        elif lateness < self.LOW_LATENESS_MS and work_ratio < self.LOW_WORK_RATIO:
+            # Require a few calm seconds before raising the frame rate again
+            self._calm_windows += 1
+            if self._calm_windows >= 3 and self.level > 0:
+                self.level -= 1
+                self._calm_windows = 0
+        else:
+            self._calm_windows = 0
+
+        self._window_start = now
+        self._work_seconds = 0.0
+        self._lateness_total = 0.0
+        self._lateness_samples = 0
+
+
+class GridTile(QFrame):
+    """A single camera tile with its own player kept in sync with the master clock."""
+
+    # Signals
+    clicked = pyqtSignal(object)  # GridTile
+    double_clicked = pyqtSignal(object)  # GridTile
+
+    SOFT_DRIFT_MS = 120
+    HARD_DRIFT_MS = 750
+    MAX_RATE_CORRECTION = 0.1
+
+    def __init__(self, governor: FrameBudgetGovernor, prefetcher: SegmentPrefetcher):
+        super().__init__()
+        self.setObjectName("gridTile")
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(160, 90)
+
+        self.governor = governor
+        self.prefetcher = prefetcher
+        self.camera: Optional[Camera] = None
+        self.focused = False
+
+        self._day: Optional[RecordingDay] = None
+        self._segment: Optional[VideoSegment] = None
+        self._pending_seek_ms = -1
+        self._loading = False
+        self._image: Optional[QImage] = None
+        self._status_text = "No camera"
+
+        self.player = QMediaPlayer(self)
+        self.video_sink = QVideoSink(self)
+        self.player.setVideoSink(self.video_sink)
+        self.video_sink.videoFrameChanged.connect(self.on_video_frame)
+        self.player.mediaStatusChanged.connect(self.on_media_status_changed)
+        self.player.errorOccurred.connect(self.on_player_error)
+
+    def set_camera(self, camera: Optional[Camera]):
+        """Assign the camera shown in this tile."""
+        self.camera = camera
+        self._day = None
+        self._segment = None
+        self._image = None
+        self.player.stop()
+        self.player.setSource(QUrl())
+        self._status_text = "No camera" if camera is None else "No recording"
+        self.update()
+
+    def refresh_day(self):
+        """Look the current day up again after the camera's recordings changed."""
+        self._day = None
+
+    def set_focused(self, focused: bool):
+        self.focused = focused
+        self.update()
+
+    def sync(self, now: datetime, playing: bool, rate: float, force_seek: bool = False):
+        """Bring the tile's player in line with the master clock."""
+        if self.camera is None:
+            return
+
+        if self._day is None or self._day.date != now.date():
+            self._day = self.camera.get_recording_day(now.date())
+
+        seconds = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1_000_000
+        index = self._day.segment_index_at(seconds) if self._day else -1
+        if index < 0:
+            if self._segment is not None:
+                self._segment = None
+                self._image = None
+                self.player.stop()
+                self.player.setSource(QUrl())
+            self._status_text = "No recording"
+            self.update()
+            return
+
+        segment = self._day.video_segments[index]
+        expected_ms = int((seconds - segment.start_seconds) * 1000)
+
+        if segment is not self._segment:
+            self._load_segment(segment, expected_ms)
+            upcoming = self._day.video_segments[index + 1:index + 1 + self.prefetcher.segments_ahead]
+            self.prefetcher.request(upcoming)
+        elif not self._loading:
+            self._correct_drift(expected_ms, rate, force_seek)
+
+        state = self.player.playbackState()
+        if playing and state != QMediaPlayer.PlaybackState.PlayingState:
+            self.player.play()
+        elif not playing and state != QMediaPlayer.PlaybackState.PausedState:
+            # Pausing (rather than stopping) keeps the current frame on screen
+            self.player.pause()
+
+    def _load_segment(self, segment: VideoSegment, position_ms: int):
+        self._segment = segment
+        self._loading = True
+        self._pending_seek_ms = position_ms
+        self._status_text = ""
+        self.player.setSource(QUrl.fromLocalFile(self.prefetcher.playback_path(segment)))
+
+    def _correct_drift(self, expected_ms: int, rate: float, force_seek: bool):
+        """Nudge the playback rate for small drift, seek for large drift."""
+        drift_ms = self.player.position() - expected_ms
+        if force_seek or abs(drift_ms) > self.HARD_DRIFT_MS:
+            self.player.setPosition(max(0, expected_ms))
+            self.player.setPlaybackRate(rate)
+        elif abs(drift_ms) > self.SOFT_DRIFT_MS:
+            correction = max(-self.MAX_RATE_CORRECTION,
+                             min(self.MAX_RATE_CORRECTION, drift_ms / 2000.0))
+            self.player.setPlaybackRate(rate * (1.0 - correction))
+        elif self.player.playbackRate() != rate:
+            self.player.setPlaybackRate(rate)
+
+    def on_media_status_changed(self, status: QMediaPlayer.MediaStatus):
+        if status in (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia):
+            if self._pending_seek_ms >= 0:
+                self.player.setPosition(self._pending_seek_ms)
+                self._pending_seek_ms = -1
+            self._loading = False
+        elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self._loading = False
+            self._status_text = "Unable to play segment"
+            self.update()
+
+    def on_player_error(self, error, error_string):
+        print(f"Grid Tile Player Error: {error_string}")
+
+    def on_video_frame(self, frame: QVideoFrame):
+        """Convert a decoded frame, scaled down to the tile, if the frame budget allows."""
+        if not frame.isValid() or not self.governor.allow_frame(id(self), self.focused):
+            return
+        started = monotonic_time.perf_counter()
+        image = frame.toImage()
+        if not image.isNull():
+            self._image = image.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                                       Qt.TransformationMode.FastTransformation)
+        self.governor.record_work(monotonic_time.perf_counter() - started)
+        self.update()
+
+    def stop(self):
+        self.player.stop()
+
+    @traced("paint.grid_tile", "ui")
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#000000"))
+
+        if self._image is not None and self._segment is not None:
+            x = (self.width() - self._image.width()) // 2
+            y = (self.height() - self._image.height()) // 2
+            painter.drawImage(x, y, self._image)
+        elif self._status_text:
+            painter.setPen(QColor("#a0a0a0"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._status_text)
+
+        if self.camera is not None:
+            painter.setFont(QFont("Arial", 9, QFont.Weight.Bold))
+            label_rect = QRect(6, 6, self.width() - 12, 18)
+            painter.fillRect(label_rect.adjusted(-2, -2, 2, 2), QColor(0, 0, 0, 140))
+            painter.setPen(QColor("#ffffff"))
+            painter.drawText(label_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             self.camera.name)
+
+        if self.focused:
+            painter.setPen(QColor("#5a8ed5"))
+            painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.clicked.emit(self)
+        super().mousePressEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.double_clicked.emit(self)
+        super().mouseDoubleClickEvent(event)
+
+
+class GridPlayerView(QWidget):
+    """Grid of camera tiles playing the same wall-clock time."""
+
+    # Signals
+    back_to_dashboard = pyqtSignal()
+    camera_opened = pyqtSignal(Camera, object)  # Camera, wall-clock datetime
+
+    GRID_SIZES = [2, 3]
+
+    def __init__(self):
+        super().__init__()
+
+        # State
+        self.cameras: List[Camera] = []
+        self.grid_size = 2
+        self.page = 0
+        self.focused_tile: Optional[GridTile] = None
+        self.tiles: List[GridTile] = []
+
+        # Shared playback machinery
+        self.clock = MasterClock(self)
+        self.governor = FrameBudgetGovernor()
+        self.prefetcher = SegmentPrefetcher.shared()
+
+        self.setup_ui()
+
+        self.clock.ticked.connect(self.on_clock_tick)
+        self.clock.seeked.connect(self.on_clock_seeked)
+
+    def setup_ui(self):
+        """Setup the grid UI."""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        layout.addWidget(self.create_toolbar())
+
+        self.grid_container = QWidget()
+        self.grid_layout = QGridLayout(self.grid_container)
+        self.grid_layout.setContentsMargins(2, 2, 2, 2)
+        self.grid_layout.setSpacing(2)
+        layout.addWidget(self.grid_container, 1)
+
+        layout.addWidget(self.create_timeline_section())
+
+        self.rebuild_tiles()
+
+    def create_toolbar(self) -> QWidget:
+        """Create the toolbar with navigation, layout and date controls."""
+        toolbar = QFrame()
+        toolbar.setObjectName("timelineSection")
+        toolbar_layout = QHBoxLayout(toolbar)
+        toolbar_layout.setContentsMargins(10, 5, 10, 5)
+
+        back_button = QPushButton(" Back to Dashboard")
+        back_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowLeft))
+        back_button.setObjectName("backButton")
+        back_button.clicked.connect(self.back_to_dashboard.emit)
+        toolbar_layout.addWidget(back_button)
+
+        toolbar_layout.addStretch(1)
+
+        self.layout_combo = QComboBox()
+        for size in self.GRID_SIZES:
+            self.layout_combo.addItem(f"{size}×{size}", size)
+        self.layout_combo.currentIndexChanged.connect(self.on_layout_changed)
+        toolbar_layout.addWidget(self.layout_combo)
+
+        self.prev_page_button = QPushButton()
+        self.prev_page_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowBack))
+        self.prev_page_button.clicked.connect(lambda: self.set_page(self.page - 1))
+        toolbar_layout.addWidget(self.prev_page_button)
+
+        self.page_label = QLabel()
+        toolbar_layout.addWidget(self.page_label)
+
+        self.next_page_button = QPushButton()
+        self.next_page_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowForward))
+        self.next_page_button.clicked.connect(lambda: self.set_page(self.page + 1))
+        toolbar_layout.addWidget(self.next_page_button)
+
+        self.date_edit = QDateEdit()
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDisplayFormat("yyyy-MM-dd")
+        self.date_edit.dateChanged.connect(self.on_date_changed)
+        toolbar_layout.addWidget(self.date_edit)
+
+        return toolbar
+
+    def create_timeline_section(self) -> QWidget:
+        """Create the shared timeline and playback controls."""
+        section = QFrame()
+        section.setFrameStyle(QFrame.Shape.StyledPanel)
+        section.setObjectName("timelineSection")
+        section.setFixedHeight(180)
+
+        layout = QVBoxLayout(section)
+        layout.setContentsMargins(15, 10, 15, 10)
+        layout.setSpacing(10)
+
+        self.timeline_widget = TimelineWidget()
+        self.timeline_widget.time_clicked.connect(self.on_timeline_clicked)
+        self.timeline_widget.playhead_moved.connect(self.on_timeline_clicked)
+        layout.addWidget(self.timeline_widget)
+
+        controls_layout = QHBoxLayout()
+        controls_layout.setSpacing(10)
+
+        self.play_button = QPushButton()
+        self.play_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
+        self.play_button.setFixedSize(40, 40)
+        self.play_button.clicked.connect(self.toggle_play_pause)
+        controls_layout.addWidget(self.play_button)
+
+        self.clock_label = QLabel("--:--:--")
+        controls_layout.addWidget(self.clock_label)
+
+        controls_layout.addStretch(1)
+
+        self.speed_button = QPushButton("1.0x")
+        self.speed_button.setFixedWidth(70)
+        self.speed_button.setToolTip("Playback Speed")
+        speed_menu = QMenu(self)
+        for rate in [0.5, 1.0, 2.0, 4.0, 8.0]:
+            action = QAction(f"{rate}x", self)
+            action.setData(rate)
+            action.triggered.connect(self.set_playback_speed)
+            speed_menu.addAction(action)
+        self.speed_button.setMenu(speed_menu)
+        controls_layout.addWidget(self.speed_button)
+
+        layout.addLayout(controls_layout)
+        return section
+
+    def set_cameras(self, cameras: List[Camera]):
+        """Set the list of cameras available to the grid."""
+        self.cameras = cameras
+        self.page = min(self.page, self.page_count - 1)
+        self.assign_cameras()
+
+    def apply_diff(self, diff: ScanDiff):
+        """Update the grid after an incremental refresh without restarting playback."""
+        if diff.added_cameras or diff.removed_cameras:
+            self.set_cameras(self.cameras)
+            return
+        changed = set(diff.changed_cameras)
+        for tile in self.tiles:
+            if tile.camera and tile.camera.camera_id in changed:
+                tile.refresh_day()
+        if self.focused_tile and self.focused_tile.camera and self.focused_tile.camera.camera_id in changed:
+            self.update_timeline_day(keep_view=True)
+
+    @property
+    def page_count(self) -> int:
+        per_page = self.grid_size * self.grid_size
+        return max(1, (len(self.cameras) + per_page - 1) // per_page)
+
+    def rebuild_tiles(self):
+        """Recreate the tile widgets for the current grid size."""
+        for tile in self.tiles:
+            tile.stop()
+            tile.setParent(None)
+            tile.deleteLater()
+        self.tiles = []
+        self.focused_tile = None
+
+        for i in range(self.grid_size * self.grid_size):
+            tile = GridTile(self.governor, self.prefetcher)
+            tile.clicked.connect(self.focus_tile)
+            tile.double_clicked.connect(self.on_tile_double_clicked)
+            self.grid_layout.addWidget(tile, i // self.grid_size, i % self.grid_size)
+            self.tiles.append(tile)
+
+        self.assign_cameras()
+
+    def assign_cameras(self):
+        """Assign cameras of the current page to tiles."""
+        per_page = self.grid_size * self.grid_size
+        page_cameras = self.cameras[self.page * per_page:(self.page + 1) * per_page]
+        for i, tile in enumerate(self.tiles):
+            tile.set_camera(page_cameras[i] if i < len(page_cameras) else None)
+
+        self.page_label.setText(f"{self.page + 1}/{self.page_count}")
+        self.prev_page_button.setEnabled(self.page > 0)
+        self.next_page_button.setEnabled(self.page < self.page_count - 1)
+
+        self.focus_tile(self.tiles[0] if self.tiles else None)
+        if self.clock.is_running:
+            self.sync_tiles(force_seek=True)
+
+    def set_page(self, page: int):
+        if 0 <= page < self.page_count and page != self.page:
+            self.page = page
+            self.assign_cameras()
+
+    def on_layout_changed(self, index: int):
+        self.grid_size = self.layout_combo.itemData(index)
+        self.page = 0
+        self.rebuild_tiles()
+
+    def focus_tile(self, tile: Optional[GridTile]):
+        """Give a tile full frame rate and show its camera on the timeline."""
+        for other in self.tiles:
+            other.set_focused(other is tile)
+        self.focused_tile = tile
+        self.update_timeline_day()
+
+    def on_tile_double_clicked(self, tile: GridTile):
+        if tile.camera is not None:
+            self.camera_opened.emit(tile.camera, self.clock.current_time())
+
+    def start_at(self, start_time: datetime):
+        """Start grid playback from a wall-clock time."""
+        self.clock.start()
+        self.clock.seek(start_time)
+
+    def default_start_time(self) -> Optional[datetime]:
+        """Start of the most recent recorded hour across all cameras."""
+        latest = None
+        for camera in self.cameras:
+            latest_date = camera.latest_recording_date
+            if latest_date is None:
+                continue
+            day = camera.get_recording_day(latest_date)
+            last_start = day.video_segments[-1].start_time
+            if latest is None or last_start > latest:
+                latest = last_start
+        if latest is None:
+            return None
+        return latest.replace(minute=0, second=0, microsecond=0)
+
+    def stop(self):
+        """Stop all playback, e.g. when leaving the view."""
+        self.clock.stop()
+        for tile in self.tiles:
+            tile.stop()
+        self.update_play_button()
+
+    def sync_tiles(self, force_seek: bool = False):
+        now = self.clock.current_time()
+        for tile in self.tiles:
+            tile.sync(now, self.clock.is_playing, self.clock.rate, force_seek)
+
+    def on_clock_tick(self, now: datetime):
+        self.governor.record_tick(self.clock.last_tick_lateness_ms)
+        self.sync_tiles()
+
+        if self.date_edit.date().toPyDate() != now.date():
+            self.date_edit.blockSignals(True)
+            self.date_edit.setDate(QDate(now.date()))
+            self.date_edit.blockSignals(False)
+            self.update_timeline_day()
+
+        seconds = now.hour * 3600 + now.minute * 60 + now.second
+        if not self.timeline_widget.dragging_playhead:
+            self.timeline_widget.set_playhead_position(seconds)
+        self.clock_label.setText(now.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def on_clock_seeked(self, now: datetime):
+        self.sync_tiles(force_seek=True)
+
+    def update_timeline_day(self, keep_view: bool = False):
+        """Show the focused camera's recordings for the current date on the timeline."""
+        current_date = self.clock.current_time().date()
+        camera = self.focused_tile.camera if self.focused_tile else None
+        day = camera.get_recording_day(current_date) if camera else None
+        if day and keep_view:
+            self.timeline_widget.refresh_recording_day(day)
+        elif day:
+            self.timeline_widget.set_recording_day(day)
+        else:
+            self.timeline_widget.clear_timeline()
+
+    def on_timeline_clicked(self, seconds: float):
+        current_date = self.clock.current_time().date()
+        self.clock.seek(datetime.combine(current_date, time()) + timedelta(seconds=seconds))
+
+    def on_date_changed(self, qdate: QDate):
+        now = self.clock.current_time()
+        self.clock.seek(datetime.combine(qdate.toPyDate(), now.time()))
+        self.update_timeline_day()
+
+    def toggle_play_pause(self):
+        if self.clock.is_playing:
+            self.clock.pause()
+        else:
+            self.clock.play()
+        self.sync_tiles()
+        self.update_play_button()
+
+    def update_play_button(self):
+        icon = QStyle.StandardPixmap.SP_MediaPause if self.clock.is_playing else QStyle.StandardPixmap.SP_MediaPlay
+        self.play_button.setIcon(self.style().standardIcon(icon))
+
+    def set_playback_speed(self):
+        action = self.sender()
+        if isinstance(action, QAction):
+            rate = action.data()
+            self.clock.set_rate(rate)
+            self.speed_button.setText(f"{rate}x")
+            self.sync_tiles(force_seek=True)
+
+    def apply_theme(self, theme_dict: dict):
+        """Apply theme to child widgets that need it."""
+        self.timeline_widget.apply_theme(theme_dict)
+
+    def cleanup(self):
+        """Clean up resources."""
+        self.stop()
@@ -2,30 +2,57 @@
 Main application window for the NAS Camera Viewer.
 """
 from PyQt6.QtWidgets import (QMainWindow, QStackedWidget, QVBoxLayout, QApplication,
-                            QWidget, QStatusBar, QMenuBar, QMenu, QMessageBox)
-from PyQt6.QtCore import QTimer, pyqtSignal
+                            QWidget, QStatusBar, QMenuBar, QMenu, QMessageBox, QFileDialog)
+from PyQt6.QtCore import QTimer, QEvent, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon
-from typing import List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
+from datetime import datetime
 
-from models import Camera
+from models import Camera, CameraSummary, ScanDiff, ScanProgress
 from services import ConfigService, NASScannerService
+from scan_worker import ScanWorker
+from segment_prefetcher import SegmentPrefetcher
+from refresh_scheduler import RefreshScheduler
+from startup_timer import startup_timer
+from tracing import tracer
+from activity_analyzer import ActivityAnalyzer
 from dashboard_view import DashboardView
-from camera_player_view import CameraPlayerView
-from settings_view import SettingsView
+
+if TYPE_CHECKING:
+    # Created on first navigation; importing them loads Qt Multimedia
+    from camera_player_view import CameraPlayerView
+    from grid_player_view import GridPlayerView
+    from settings_view import SettingsView
+
+
+MULTIMEDIA_WARM_UP_DELAY_MS = 1000
+REFRESH_TICK_MS = 10 * 1000  # How often the refresh scheduler is asked whether anything is due
+CACHE_FLUSH_TIMEOUT_SECONDS = 10
 
 
 class MainWindow(QMainWindow):
     """Main application window with navigation between views."""
     
+    # Signals (emitted from the cache loading thread)
+    camera_loaded = pyqtSignal(object)  # Camera
+    cache_loaded = pyqtSignal(object, object)  # List of cameras or None, error or None
+    
     def __init__(self):
         super().__init__()
         
         # Services
         self.config_service = ConfigService()
         self.nas_scanner = NASScannerService()
+        self.scan_worker = ScanWorker(self.nas_scanner, parent=self)
+        self.activity_analyzer = ActivityAnalyzer()
+        self.refresh_scheduler = RefreshScheduler()
+        self.apply_prefetch_settings()
         
         # Data
         self.cameras: List[Camera] = []
+        self._loading_cache = False
+        self._loaded_on_demand: Dict[str, Camera] = {}  # Cameras opened before the cache finished loading
+        self.theme_dict: Optional[dict] = None
         
         # UI Setup
         self.setWindowTitle("NAS Camera Viewer")
@@ -36,13 +63,36 @@ class MainWindow(QMainWindow):
         self.setup_ui()
         self.setup_menu_bar()
         
-        # Auto-refresh timer
+        # Auto-refresh timer, asking the scheduler what is due
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.auto_refresh)
         
+        # Time the first paint of the dashboard
+        self.dashboard_view.installEventFilter(self)
+        
         # Load initial data
+        self.camera_loaded.connect(self.on_cached_camera_loaded)
+        self.cache_loaded.connect(self.on_cache_loaded)
+        self.scan_worker.progress.connect(self.on_scan_progress)
+        self.scan_worker.finished.connect(self.on_scan_complete)
+        self.scan_worker.cancelled.connect(self.on_scan_cancelled)
         self.load_cameras()
     
+    def eventFilter(self, obj, event):
+        """Record when the dashboard is first painted."""
+        if obj is self.dashboard_view and event.type() == QEvent.Type.Paint:
+            startup_timer.mark("first_paint")
+            startup_timer.report()
+            self.dashboard_view.removeEventFilter(self)
+            QTimer.singleShot(MULTIMEDIA_WARM_UP_DELAY_MS, self.warm_up_multimedia)
+        return super().eventFilter(obj, event)
+    
+    def warm_up_multimedia(self):
+        """Load the multimedia backend while idle so opening the first camera is quick."""
+        with startup_timer.measure("warm up multimedia"):
+            from video_player import warm_up_backend
+            warm_up_backend()
+    
     def setup_ui(self):
         """Setup the main UI components."""
         # Central widget with stacked layout for different views
@@ -57,26 +107,88 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         layout.addWidget(self.stacked_widget)
         
-        # Create views
-        self.dashboard_view = DashboardView()
-        self.camera_player_view = CameraPlayerView()
-        self.settings_view = SettingsView()
+        # Create the dashboard; the other views are created on first navigation
+        with startup_timer.measure("construct DashboardView"):
+            self.dashboard_view = DashboardView()
+        self._camera_player_view: Optional['CameraPlayerView'] = None
+        self._grid_player_view: Optional['GridPlayerView'] = None
+        self._settings_view: Optional['SettingsView'] = None
         
         # Add views to stack
         self.stacked_widget.addWidget(self.dashboard_view)
-        self.stacked_widget.addWidget(self.camera_player_view)
-        self.stacked_widget.addWidget(self.settings_view)
         
         # Connect signals
         self.dashboard_view.camera_selected.connect(self.open_camera_player)
-        self.camera_player_view.back_to_dashboard.connect(self.show_dashboard)
-        self.camera_player_view.camera_switched.connect(self.switch_camera)
-        self.settings_view.settings_saved.connect(self.on_settings_saved)
-        self.settings_view.back_to_dashboard.connect(self.show_dashboard)
+        self.dashboard_view.camera_summary_selected.connect(self.open_camera_from_summary)
         
         # Show dashboard initially
         self.show_dashboard()
     
+    @property
+    def camera_player_view(self) -> 'CameraPlayerView':
+        """The single camera player, created on first use."""
+        if self._camera_player_view is None:
+            with startup_timer.measure("construct CameraPlayerView"):
+                from camera_player_view import CameraPlayerView
+                view = CameraPlayerView()
+            view.back_to_dashboard.connect(self.show_dashboard)
+            view.camera_switched.connect(self.switch_camera)
+            view.grid_requested.connect(self.show_grid)
+            self.activity_analyzer.day_updated.connect(view.on_activity_updated)
+            view.set_cameras(self.cameras)
+            view.video_player.set_metrics_overlay_visible(self.playback_overlay_action.isChecked())
+            view.performance_hud.scan_worker = self.scan_worker
+            view.performance_hud.refresh_scheduler = self.refresh_scheduler
+            view.performance_hud.set_active(self.performance_hud_action.isChecked())
+            self._add_view(view)
+            self._camera_player_view = view
+        return self._camera_player_view
+    
+    @property
+    def grid_player_view(self) -> 'GridPlayerView':
+        """The multi-camera grid, created on first use."""
+        if self._grid_player_view is None:
+            with startup_timer.measure("construct GridPlayerView"):
+                from grid_player_view import GridPlayerView
+                view = GridPlayerView()
+            view.back_to_dashboard.connect(self.show_dashboard)
+            view.camera_opened.connect(self.open_camera_from_grid)
+            view.set_cameras(self.cameras)
+            self._add_view(view)
+            self._grid_player_view = view
+        return self._grid_player_view
+    
+    @property
+    def settings_view(self) -> 'SettingsView':
+        """The settings page, created on first use."""
+        if self._settings_view is None:
+            with startup_timer.measure("construct SettingsView"):
+                from settings_view import SettingsView
+                view = SettingsView()
+            view.settings_saved.connect(self.on_settings_saved)
+            view.back_to_dashboard.connect(self.show_dashboard)
+            self._add_view(view)
+            self._settings_view = view
+        return self._settings_view
+    
+    def _add_view(self, view: QWidget):
+        """Add a lazily created view to the stack and bring it up to date with the theme."""
+        self.stacked_widget.addWidget(view)
+        if self.theme_dict is not None and hasattr(view, 'apply_theme'):
+            view.apply_theme(self.theme_dict)
+    
+    def update_view_cameras(self):
+        """Pass the camera list to the views that have been created."""
+        self.dashboard_view.set_cameras(self.cameras)
+        for view in (self._camera_player_view, self._grid_player_view):
+            if view is not None:
+                view.set_cameras(self.cameras)
+    
+    def stop_grid(self):
+        """Stop grid playback, if the grid has been created."""
+        if self._grid_player_view is not None:
+            self._grid_player_view.stop()
+    
     def setup_menu_bar(self):
         """Setup the application menu bar."""
         menubar = self.menuBar()
@@ -86,9 +198,24 @@ class MainWindow(QMainWindow):
         
         refresh_action = QAction('Refresh Cameras', self)
         refresh_action.setShortcut('F5')
-        refresh_action.triggered.connect(self.refresh_cameras)
+        refresh_action.triggered.connect(lambda: self.refresh_cameras())
         file_menu.addAction(refresh_action)
         
+        full_rescan_action = QAction('Full Rescan', self)
+        full_rescan_action.setShortcut('Ctrl+F5')
+        full_rescan_action.triggered.connect(lambda: self.refresh_cameras(full=True))
+        file_menu.addAction(full_rescan_action)
+        
+        cancel_scan_action = QAction('Cancel Scan', self)
+        cancel_scan_action.triggered.connect(self.scan_worker.cancel)
+        file_menu.addAction(cancel_scan_action)
+        
+        file_menu.addSeparator()
+        
+        export_metrics_action = QAction('Export Playback Metrics...', self)
+        export_metrics_action.triggered.connect(self.export_playback_metrics)
+        file_menu.addAction(export_metrics_action)
+        
         file_menu.addSeparator()
         
         settings_action = QAction('Settings', self)
@@ -111,9 +238,51 @@ class MainWindow(QMainWindow):
         dashboard_action.triggered.connect(self.show_dashboard)
         view_menu.addAction(dashboard_action)
         
+        grid_action = QAction('Camera Grid', self)
+        grid_action.setShortcut('Ctrl+G')
+        grid_action.triggered.connect(lambda: self.show_grid())
+        view_menu.addAction(grid_action)
+        
+        view_menu.addSeparator()
+        
+        self.playback_overlay_action = QAction('Playback Latency Overlay', self)
+        self.playback_overlay_action.setCheckable(True)
+        self.playback_overlay_action.toggled.connect(self.set_playback_overlay_visible)
+        view_menu.addAction(self.playback_overlay_action)
+        
+        self.performance_hud_action = QAction('Performance HUD', self)
+        self.performance_hud_action.setShortcut('Ctrl+H')
+        self.performance_hud_action.setCheckable(True)
+        self.performance_hud_action.toggled.connect(self.set_performance_hud_visible)
+        view_menu.addAction(self.performance_hud_action)
+        
         # Help menu
         help_menu = menubar.addMenu('Help')
         
+        diagnostics_menu = help_menu.addMenu('Diagnostics')
+        
+        record_trace_action = QAction('Record Trace', self)
+        record_trace_action.setCheckable(True)
+        record_trace_action.setChecked(tracer.enabled)
+        record_trace_action.toggled.connect(self.set_tracing)
+        diagnostics_menu.addAction(record_trace_action)
+        
+        save_trace_action = QAction('Save Trace...', self)
+        save_trace_action.triggered.connect(self.save_trace)
+        diagnostics_menu.addAction(save_trace_action)
+        
+        clear_trace_action = QAction('Clear Trace', self)
+        clear_trace_action.triggered.connect(tracer.clear)
+        diagnostics_menu.addAction(clear_trace_action)
+        
+        diagnostics_menu.addSeparator()
+        
+        refresh_schedule_action = QAction('Refresh Schedule...', self)
+        refresh_schedule_action.triggered.connect(self.show_refresh_schedule)
+        diagnostics_menu.addAction(refresh_schedule_action)
+        
+        help_menu.addSeparator()
+        
         about_action = QAction('About', self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
@@ -125,73 +294,220 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("Ready")
     
     def load_cameras(self):
-        """Load cameras from cache or trigger scan."""
-        # Try to load from cache first
-        cached_cameras = self.nas_scanner.get_cached_cameras()
-        
-        if cached_cameras is not None:
-            self.cameras = cached_cameras
-            self.dashboard_view.set_cameras(self.cameras)
-            self.camera_player_view.set_cameras(self.cameras)
-            self.status_bar.showMessage(f"Loaded {len(self.cameras)} cameras from cache")
-            
+        """Show cached cameras right away and load their recordings in the background, or trigger scan."""
+        # The summary is a small JSON file, so the dashboard can be drawn before the cache is read
+        summaries = self.nas_scanner.get_cached_summary()
+        
+        if summaries is not None:
+            self._loading_cache = True
+            self._loaded_on_demand.clear()
+            self.dashboard_view.set_camera_summaries(summaries)
+            self.status_bar.showMessage(f"Loading {len(summaries)} cameras from cache...")
+            self.nas_scanner.load_cached_async(
+                camera_callback=self.camera_loaded.emit,
+                complete_callback=self.cache_loaded.emit
+            )
+        else:
+            # No cache, start scan immediately
+            self.refresh_cameras()
+    
+    def on_cached_camera_loaded(self, camera: Camera):
+        """Make a camera clickable as soon as its cached recordings are loaded."""
+        if self._loading_cache and camera.camera_id not in self._loaded_on_demand:
+            self.dashboard_view.set_camera_ready(camera)
+    
+    def open_camera_from_summary(self, summary: CameraSummary):
+        """Open a camera that the background load has not reached yet by loading just its shard."""
+        if not self._loading_cache:
+            return
+        camera = self.nas_scanner.cache_service.load_camera(summary.camera_id)
+        if camera is None:
+            self.status_bar.showMessage(f"Camera {summary.name} is still loading")
+            return
+        self._loaded_on_demand[camera.camera_id] = camera
+        self.dashboard_view.set_camera_ready(camera)
+        self.open_camera_player(camera)
+    
+    def on_cache_loaded(self, cameras: Optional[List[Camera]], error: Optional[str]):
+        """Handle the background cache load finishing."""
+        if not self._loading_cache:
+            # A scan finished first and its results are newer
+            return
+        self._loading_cache = False
+        
+        if cameras is None:
+            # Unreadable cache, fall back to a scan
+            self.refresh_cameras()
+            return
+        
+        # Keep the objects already opened, so the player's camera stays part of the list
+        self.cameras = [self._loaded_on_demand.get(camera.camera_id, camera) for camera in cameras]
+        self._loaded_on_demand.clear()
+        self.update_view_cameras()
+        self.start_activity_analysis()
+        self.status_bar.showMessage(f"Loaded {len(self.cameras)} cameras from cache")
+        self.mark_interactive()
+        
+        if self.nas_scanner.is_cache_fresh():
             # Start auto-refresh timer
             self.start_auto_refresh()
         else:
-            # No cache, start scan immediately
+            # Stale cache: keep showing it while checking the NAS for changes
             self.refresh_cameras()
     
-    def refresh_cameras(self):
-        """Refresh camera list from NAS."""
-        if self.nas_scanner.is_scanning:
+    def mark_interactive(self):
+        """Record that camera data is loaded and usable, reporting startup if the dashboard was painted."""
+        startup_timer.mark("interactive")
+        startup_timer.report()
+    
+    def refresh_cameras(self, full: bool = False):
+        """Refresh camera list from NAS.
+        
+        With cameras already loaded the refresh is incremental and the
+        current data stays on screen; otherwise (or with `full`) every
+        folder is scanned again.
+        """
+        if self.scan_worker.is_running:
             return
+        if self.refresh_scheduler.running is None:
+            self.refresh_scheduler.begin('sweep', "full" if full else "manual")
         
-        self.status_bar.showMessage("Scanning NAS for cameras...")
-        self.dashboard_view.set_loading(True)
+        if self.cameras and not full:
+            self.status_bar.showMessage("Checking NAS for new recordings...")
+            previous = self.cameras
+        else:
+            self.status_bar.showMessage("Scanning NAS for cameras...")
+            self.dashboard_view.set_loading(True)
+            previous = None
         
-        self.nas_scanner.scan_async(
-            progress_callback=self.on_scan_progress,
-            complete_callback=self.on_scan_complete
-        )
+        self.scan_worker.start(previous, out_of_process=self.config_service.settings.scan_in_separate_process)
     
-    def on_scan_progress(self, message: str):
+    def on_scan_progress(self, progress: ScanProgress):
         """Handle scan progress updates."""
-        self.status_bar.showMessage(message)
+        self.status_bar.showMessage(progress.status_text)
+    
+    def on_scan_cancelled(self):
+        """Handle a scan stopped from the menu; the cameras already shown are kept."""
+        self.refresh_scheduler.finish(self.scan_worker.last_progress, None, None, self.cameras, cancelled=True)
+        self.dashboard_view.set_loading(False)
+        self.status_bar.showMessage(f"Scan cancelled - {len(self.cameras)} cameras")
     
-    def on_scan_complete(self, cameras: Optional[List[Camera]], error: Optional[str]):
+    def on_scan_complete(self, cameras: Optional[List[Camera]], diff: Optional[ScanDiff], error: Optional[str]):
         """Handle scan completion."""
         self.dashboard_view.set_loading(False)
+        self.mark_interactive()
         
         if error:
             self.status_bar.showMessage(f"Scan failed: {error}")
-            QMessageBox.warning(self, "Scan Error", f"Failed to scan NAS:\n{error}")
+            if not self.cameras:
+                QMessageBox.warning(self, "Scan Error", f"Failed to scan NAS:\n{error}")
+        elif diff is not None:
+            self.apply_scan_diff(cameras or [], diff)
         else:
+            self._loading_cache = False
             self.cameras = cameras or []
-            self.dashboard_view.set_cameras(self.cameras)
-            self.camera_player_view.set_cameras(self.cameras)
+            self.update_view_cameras()
+            self.start_activity_analysis()
             self.status_bar.showMessage(f"Found {len(self.cameras)} cameras")
-            
+        
+        progress = self.scan_worker.last_progress
+        operation = self.refresh_scheduler.finish(progress, diff, error, self.cameras)
+        if not error and progress is not None and progress.stale_reason:
+            # The NAS stopped answering; what could not be scanned is shown as it was
+            self.status_bar.showMessage(progress.status_text)
+        elif not error and operation is not None and operation.kind == 'revalidate':
+            self.status_bar.showMessage(f"{operation.summary} - {len(self.cameras)} cameras")
+        
+        if not error:
             # Start auto-refresh timer
             self.start_auto_refresh()
     
+    def apply_scan_diff(self, cameras: List[Camera], diff: ScanDiff):
+        """Apply the result of an incremental refresh to the loaded cameras and views in place.
+        
+        The existing Camera objects are updated rather than replaced, so the
+        camera open in the player keeps playing its day.
+        """
+        diff.apply_to(self.cameras)
+        if diff.is_empty:
+            self.status_bar.showMessage(f"Up to date - {len(self.cameras)} cameras")
+            return
+        
+        self.dashboard_view.apply_diff(diff)
+        if self._camera_player_view is not None:
+            self._camera_player_view.apply_diff(diff)
+        if self._grid_player_view is not None:
+            self._grid_player_view.apply_diff(diff)
+        self.start_activity_analysis(diff)
+        self.status_bar.showMessage(
+            f"Updated {diff.changed_day_count} days, {len(diff.added_cameras)} new cameras - {len(self.cameras)} cameras")
+    
+    def start_activity_analysis(self, diff: Optional[ScanDiff] = None):
+        """Analyze recordings for activity in the background, if enabled (see ActivityAnalyzer.set_cameras)."""
+        if self.config_service.settings.activity_analysis_enabled:
+            self.activity_analyzer.set_cameras(self.cameras, diff)
+        else:
+            self.activity_analyzer.stop()
+    
+    def apply_prefetch_settings(self):
+        """Give the shared segment prefetcher the configured depth and cache budget."""
+        settings = self.config_service.settings
+        SegmentPrefetcher.shared().configure(max_bytes=settings.prefetch_cache_mb * 1024 * 1024,
+                                             segments_ahead=settings.prefetch_segments)
+    
     def start_auto_refresh(self):
-        """Start the auto-refresh timer."""
+        """Start the auto-refresh timer, if it is not running yet.
+        
+        The auto-refresh interval is how often every camera is checked; the
+        scheduler checks the cameras that are recording more often, as
+        their write cadence suggests (see refresh_scheduler).
+        """
         interval_minutes = self.config_service.settings.auto_refresh_interval_minutes
-        if interval_minutes > 0:
-            self.refresh_timer.start(interval_minutes * 60 * 1000)  # Convert to milliseconds
+        if interval_minutes <= 0:
+            self.refresh_timer.stop()
+            return
+        self.refresh_scheduler.set_sweep_interval(interval_minutes * 60)
+        self.refresh_scheduler.observe(self.cameras)
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start(REFRESH_TICK_MS)
     
     def auto_refresh(self):
-        """Perform automatic refresh."""
-        if not self.nas_scanner.is_scanning:
+        """Run the refresh the scheduler says is due, if any."""
+        if self.scan_worker.is_running:
+            return
+        operation = self.refresh_scheduler.next_operation(self.user_activity())
+        if operation is None:
+            return
+        if operation.kind == 'sweep':
             self.refresh_cameras()
+        else:
+            self.status_bar.showMessage(f"Checking {len(operation.folders)} cameras for new recordings...")
+            self.scan_worker.start(self.cameras, folders=operation.folders)
+    
+    def user_activity(self) -> Optional[str]:
+        """What the user is doing that scheduled refreshes wait for: 'timeline', 'playback' or None."""
+        views = [view for view in (self._camera_player_view, self._grid_player_view) if view is not None]
+        if any(view.timeline_widget.is_interacting for view in views):
+            return 'timeline'
+        if self._camera_player_view is not None and self._camera_player_view.video_player.is_playing:
+            return 'playback'
+        if self._grid_player_view is not None and self._grid_player_view.clock.is_playing:
+            return 'playback'
+        return None
+    
+    def show_refresh_schedule(self):
+        """Show what the refresh scheduler has learned and its recent operations."""
+        QMessageBox.information(self, "Refresh Schedule", "\n".join(self.refresh_scheduler.summary_lines()))
     
     def show_dashboard(self):
         """Show the dashboard view."""
+        self.stop_grid()
         self.stacked_widget.setCurrentWidget(self.dashboard_view)
         self.status_bar.showMessage(f"Dashboard - {len(self.cameras)} cameras")
     
     def show_settings(self):
         """Show the settings view."""
+        self.stop_grid()
         self.settings_view.load_settings()
         self.stacked_widget.setCurrentWidget(self.settings_view)
         self.status_bar.showMessage("Settings")
@@ -202,6 +518,27 @@ class MainWindow(QMainWindow):
         self.stacked_widget.setCurrentWidget(self.camera_player_view)
         self.status_bar.showMessage(f"Viewing camera: {camera.name}")
     
+    def show_grid(self, start_time: Optional[datetime] = None):
+        """Show the multi-camera grid view."""
+        if not self.cameras:
+            self.status_bar.showMessage("No cameras available for the grid")
+            return
+        if self._camera_player_view is not None:
+            self._camera_player_view.video_player.pause()
+        self.stacked_widget.setCurrentWidget(self.grid_player_view)
+        start_time = start_time or self.grid_player_view.default_start_time()
+        if start_time:
+            self.grid_player_view.start_at(start_time)
+        self.status_bar.showMessage(f"Camera grid - {len(self.cameras)} cameras")
+    
+    def open_camera_from_grid(self, camera: Camera, wall_time: datetime):
+        """Open a grid tile's camera in the single camera player."""
+        self.grid_player_view.stop()
+        self.open_camera_player(camera)
+        self.camera_player_view.load_recording_day(wall_time.date())
+        seconds = wall_time.hour * 3600 + wall_time.minute * 60 + wall_time.second
+        self.camera_player_view.on_timeline_clicked(seconds)
+    
     def switch_camera(self, camera: Camera):
         """Switch to a different camera in the player view."""
         self.camera_player_view.set_current_camera(camera)
@@ -213,13 +550,72 @@ class MainWindow(QMainWindow):
         # Restart auto-refresh timer with new interval
         self.refresh_timer.stop()
         self.start_auto_refresh()
+        self.start_activity_analysis()
+        self.apply_prefetch_settings()
         # Re-apply theme in case it was changed
         if QApplication.instance():
             QApplication.instance().apply_theme()
 
     def apply_theme(self, theme_dict: dict):
         """Propagate theme changes to child widgets."""
-        self.camera_player_view.apply_theme(theme_dict)
+        self.theme_dict = theme_dict
+        for view in (self._camera_player_view, self._grid_player_view):
+            if view is not None:
+                view.apply_theme(theme_dict)
+    
+    def set_playback_overlay_visible(self, visible: bool):
+        """Show or hide the latency overlay on the camera player, if it has been created."""
+        if self._camera_player_view is not None:
+            self._camera_player_view.video_player.set_metrics_overlay_visible(visible)
+    
+    def set_performance_hud_visible(self, visible: bool):
+        """Show or hide the performance HUD on the camera player, if it has been created."""
+        if self._camera_player_view is not None:
+            self._camera_player_view.performance_hud.set_active(visible)
+    
+    def export_playback_metrics(self):
+        """Save the camera player's playback latency histograms as JSON."""
+        if self._camera_player_view is None:
+            self.status_bar.showMessage("Nothing played yet - no playback metrics to export")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Playback Metrics", "playback_metrics.json",
+                                              "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self._camera_player_view.video_player.metrics.export_json(path)
+            self.status_bar.showMessage(f"Playback metrics saved to {path}")
+        except OSError as e:
+            print(f"Error exporting playback metrics: {e}")
+            QMessageBox.warning(self, "Export Failed", f"Could not save playback metrics:\n{e}")
+    
+    def set_tracing(self, enabled: bool):
+        """Start or stop recording trace events; what was recorded is kept until cleared."""
+        if enabled:
+            tracer.enable()
+            self.status_bar.showMessage("Recording trace - Help > Diagnostics > Save Trace... to send it")
+        else:
+            tracer.disable()
+            self.status_bar.showMessage(f"Trace stopped ({len(tracer.events)} events)")
+    
+    def save_trace(self):
+        """Save the recorded trace events as Chrome trace JSON."""
+        if not tracer.events:
+            QMessageBox.information(self, "Save Trace",
+                                    "No trace recorded yet.\n\n"
+                                    "Turn on Help > Diagnostics > Record Trace, reproduce the slowness, "
+                                    "then save the trace.")
+            return
+        default_name = f"nas_camera_viewer_trace_{datetime.now():%Y%m%d_%H%M%S}.json"
+        path, _ = QFileDialog.getSaveFileName(self, "Save Trace", default_name, "Chrome Trace (*.json)")
+        if not path:
+            return
+        try:
+            count = tracer.dump(path)
+            self.status_bar.showMessage(f"Saved {count} trace events to {path}")
+        except OSError as e:
+            print(f"Error saving trace: {e}")
+            QMessageBox.warning(self, "Save Failed", f"Could not save the trace:\n{e}")
     
     def show_about(self):
         """Show about dialog."""
@@ -234,10 +630,19 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Handle application close event."""
-        # Stop timers
+        # Stop timers and background work
         self.refresh_timer.stop()
+        self.scan_worker.cancel()
+        self.activity_analyzer.stop()
+        
+        # Let a pending cache write finish so the next start does not rescan
+        self.nas_scanner.cache_service.flush(timeout=CACHE_FLUSH_TIMEOUT_SECONDS)
         
         # Clean up resources
-        self.camera_player_view.cleanup()
+        for view in (self._camera_player_view, self._grid_player_view):
+            if view is not None:
+                view.cleanup()
+        # The copies are only worth keeping while the players run
+        SegmentPrefetcher.shared().shutdown()
         
         event.accept()
@@ -1,18 +1,32 @@
 """
 Data models for the NAS Camera Viewer application.
 """
-from dataclasses import dataclass
-from datetime import datetime, date
-from typing import List, Optional
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass, field
+from datetime import datetime, date, time, timedelta
+from typing import Dict, List, Optional, Sequence
 import os
 
 
+# Per-day activity arrays: one byte per bin, 0..MAX_SCORE, NOT_ANALYZED where unknown
+ACTIVITY_BIN_SECONDS = 10
+ACTIVITY_BINS = 24 * 3600 // ACTIVITY_BIN_SECONDS
+NOT_ANALYZED = 255
+MAX_SCORE = 254
+
+# Cameras may still write a day's last segments shortly after midnight
+DAY_SETTLE_GRACE = timedelta(minutes=10)
+
+
 @dataclass
 class VideoSegment:
     """Represents a single 1-minute video file."""
     path: str
     start_time: datetime
     duration: int = 60  # seconds
+    size: int = 0  # bytes, from the directory listing (0 if unknown)
     
     @property
     def filename(self) -> str:
@@ -21,35 +35,148 @@ class VideoSegment:
     @property
     def exists(self) -> bool:
         return os.path.exists(self.path)
+    
+    @property
+    def start_seconds(self) -> int:
+        """Start time in seconds from the start of the day."""
+        st = self.start_time
+        return st.hour * 3600 + st.minute * 60 + st.second
+
+
+class SegmentArrays(SequenceABC):
+    """A day's segments as the scanner listed them: a path list and typed columns.
+    
+    Like columnar_index.SegmentColumns, it exposes `starts`, `durations` and
+    `sizes`, and indexing or iterating builds the day's `VideoSegment`
+    objects once. The scanner fills it with `extend`, then `sort`s it.
+    """
+    
+    def __init__(self, day: date):
+        self.day = day
+        self.paths: List[str] = []
+        self.starts = array('I')  # Seconds from midnight
+        self.durations = array('I')
+        self.sizes = array('Q')
+        self._segments: Optional[List[VideoSegment]] = None
+    
+    def extend(self, paths: List[str], starts: Sequence[int], sizes: Sequence[int], duration: int) -> None:
+        """Add the files of a listing, all `duration` seconds long."""
+        self.paths.extend(paths)
+        self.starts.extend(starts)
+        self.durations.extend([duration] * len(paths))
+        self.sizes.extend(sizes)
+    
+    def sort(self) -> None:
+        """Order the rows by start time (listings come in no particular order)."""
+        order = sorted(range(len(self.paths)), key=self.starts.__getitem__)
+        if order != list(range(len(order))):
+            self.paths = [self.paths[i] for i in order]
+            self.starts = array('I', (self.starts[i] for i in order))
+            self.durations = array('I', (self.durations[i] for i in order))
+            self.sizes = array('Q', (self.sizes[i] for i in order))
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def segment(self, i: int) -> VideoSegment:
+        """The `i`th segment, built on its own unless the day is already materialized."""
+        if self._segments is not None:
+            return self._segments[i]
+        midnight = datetime.combine(self.day, time())
+        return VideoSegment(path=self.paths[i], start_time=midnight + timedelta(seconds=self.starts[i]),
+                            duration=self.durations[i], size=self.sizes[i])
+    
+    def _materialize(self) -> List[VideoSegment]:
+        if self._segments is None:
+            midnight = datetime.combine(self.day, time())
+            self._segments = [VideoSegment(path=path, start_time=midnight + timedelta(seconds=start),
+                                           duration=duration, size=size)
+                              for path, start, duration, size in zip(self.paths, self.starts,
+                                                                     self.durations, self.sizes)]
+        return self._segments
+    
+    def __getitem__(self, item):
+        return self._materialize()[item]
+    
+    def __iter__(self):
+        return iter(self._materialize())
 
 
 @dataclass
 class RecordingDay:
-    """Represents a single day of recordings."""
+    """Represents a single day of recordings.
+    
+    `video_segments` is a list, or a read-only sequence of columns: backed
+    by the columnar index (see columnar_index.SegmentColumns), or as a scan
+    listed them (SegmentArrays). Those are already sorted and expose their
+    `starts`, `durations` and `sizes` columns.
+    """
     date: date
-    video_segments: List[VideoSegment]
+    video_segments: Sequence[VideoSegment]
+    scanned_at: Optional[datetime] = None  # When the day's folders were last listed
+    listed_hours: int = 0  # Bit per hour folder found in that listing (bit 0 = hour 00); 0 if unknown
     
     def __post_init__(self):
         # Sort video segments by start time
-        self.video_segments.sort(key=lambda x: x.start_time)
+        if isinstance(self.video_segments, list):
+            self.video_segments.sort(key=lambda x: x.start_time)
+        elif isinstance(self.video_segments, SegmentArrays):
+            self.video_segments.sort()
+    
+    def segment_starts(self) -> Sequence[int]:
+        """Start of each segment in seconds from midnight, without building segments if indexed."""
+        starts = getattr(self.video_segments, 'starts', None)
+        return starts if starts is not None else [seg.start_seconds for seg in self.video_segments]
+    
+    def segment_durations(self) -> Sequence[int]:
+        durations = getattr(self.video_segments, 'durations', None)
+        return durations if durations is not None else [seg.duration for seg in self.video_segments]
+    
+    def segment_sizes(self) -> Sequence[int]:
+        sizes = getattr(self.video_segments, 'sizes', None)
+        return sizes if sizes is not None else [seg.size for seg in self.video_segments]
+    
+    def segment_paths(self) -> List[str]:
+        """Segment paths, without building segments if the scan's columns hold them."""
+        paths = getattr(self.video_segments, 'paths', None)
+        return paths if paths is not None else [seg.path for seg in self.video_segments]
     
     @property
     def has_recordings(self) -> bool:
         return len(self.video_segments) > 0
     
+    @property
+    def is_settled(self) -> bool:
+        """Whether the day was last scanned after it ended, so no more recordings are expected."""
+        if self.scanned_at is None:
+            return False
+        return self.scanned_at >= datetime.combine(self.date + timedelta(days=1), time()) + DAY_SETTLE_GRACE
+    
     @property
     def total_duration(self) -> int:
         """Total recording duration in seconds."""
-        return sum(segment.duration for segment in self.video_segments)
+        return sum(self.segment_durations())
     
     @property
     def recording_hours(self) -> List[int]:
         """Returns list of hours (0-23) that have recordings."""
         hours = set()
-        for segment in self.video_segments:
-            hours.add(segment.start_time.hour)
+        for start in self.segment_starts():
+            hours.add(start // 3600)
         return sorted(list(hours))
     
+    def segment(self, i: int) -> VideoSegment:
+        """The `i`th segment, without building the others if indexed."""
+        build = getattr(self.video_segments, 'segment', None)
+        return build(i) if build is not None else self.video_segments[i]
+    
+    def append_segments(self, segments: List[VideoSegment]) -> None:
+        """Add segments recorded after the current last one."""
+        if not isinstance(self.video_segments, list):
+            # Index-backed days are read-only; switch to a list
+            self.video_segments = list(self.video_segments)
+        self.video_segments.extend(segments)
+    
     def get_segments_for_hour(self, hour: int) -> List[VideoSegment]:
         """Get all video segments for a specific hour."""
         return [seg for seg in self.video_segments if seg.start_time.hour == hour]
@@ -63,6 +190,14 @@ class RecordingDay:
             if segment.start_time <= target_time < segment_end:
                 return segment
         return None
+    
+    def segment_index_at(self, seconds: float) -> int:
+        """Index of the segment covering `seconds` from midnight, or -1 if none."""
+        starts = self.segment_starts()
+        index = bisect_right(starts, seconds) - 1
+        if index >= 0 and seconds < starts[index] + self.segment_durations()[index]:
+            return index
+        return -1
 
 
 @dataclass
@@ -72,6 +207,7 @@ class Camera:
     name: str
     nas_path: str
     recording_days: List[RecordingDay]
+    scanned_at: Optional[datetime] = None  # When the camera folder was last listed
     
     def __post_init__(self):
         # Sort recording days by date
@@ -101,9 +237,213 @@ class Camera:
                 return day
         return None
     
+    def set_recording_day(self, recording_day: RecordingDay) -> None:
+        """Add a day, or replace the existing day with the same date."""
+        self.remove_recording_day(recording_day.date)
+        self.recording_days.append(recording_day)
+        self.recording_days.sort(key=lambda x: x.date, reverse=True)
+    
+    def remove_recording_day(self, target_date: date) -> None:
+        self.recording_days[:] = [day for day in self.recording_days if day.date != target_date]
+    
     def get_available_dates(self) -> List[date]:
         """Returns list of dates that have recordings."""
         return [day.date for day in self.recording_days if day.has_recordings]
+    
+    def get_segments_between(self, start: datetime, end: datetime) -> List[VideoSegment]:
+        """Get segments overlapping [start, end), in chronological order."""
+        segments = []
+        for day in sorted(self.recording_days, key=lambda d: d.date):
+            if day.date < start.date() or day.date > end.date():
+                continue
+            for segment in day.video_segments:
+                segment_end = segment.start_time + timedelta(seconds=segment.duration)
+                if segment_end > start and segment.start_time < end:
+                    segments.append(segment)
+        return segments
+
+
+@dataclass
+class ScanDiff:
+    """What a revalidation changed compared to the previous scan.
+    
+    Holds the new objects themselves, so `apply_to` can update the
+    cameras the views already show in place instead of replacing them.
+    """
+    added_cameras: List[Camera] = field(default_factory=list)
+    removed_cameras: List[str] = field(default_factory=list)
+    added_days: Dict[str, List[RecordingDay]] = field(default_factory=dict)
+    removed_days: Dict[str, List[date]] = field(default_factory=dict)
+    appended_segments: Dict[str, Dict[date, List[VideoSegment]]] = field(default_factory=dict)
+    replaced_days: Dict[str, List[RecordingDay]] = field(default_factory=dict)  # Days changed other than by appending
+    scanned_at: Dict[str, Dict[date, datetime]] = field(default_factory=dict)  # Every rescanned day
+    listed_hours: Dict[str, Dict[date, int]] = field(default_factory=dict)  # Every rescanned day
+    camera_scanned_at: Dict[str, datetime] = field(default_factory=dict)
+    new_segments: int = 0  # Segments whose paths the previous scan did not have
+    
+    @property
+    def is_empty(self) -> bool:
+        """Whether nothing visible changed (scan times may still have moved on)."""
+        return not (self.added_cameras or self.removed_cameras or self.added_days
+                    or self.removed_days or self.appended_segments or self.replaced_days)
+    
+    @property
+    def changed_day_count(self) -> int:
+        return sum(len(days) for days in (*self.added_days.values(), *self.removed_days.values(),
+                                          *self.appended_segments.values(), *self.replaced_days.values()))
+    
+    @property
+    def changed_cameras(self) -> List[str]:
+        """IDs of existing cameras whose days changed."""
+        ids = set(self.added_days) | set(self.removed_days) | set(self.appended_segments) | set(self.replaced_days)
+        return sorted(ids)
+    
+    def day_changed(self, camera_id: str, day: date) -> bool:
+        """Whether a specific day of a camera was added, changed or removed."""
+        return (day in self.removed_days.get(camera_id, [])
+                or day in self.appended_segments.get(camera_id, {})
+                or any(d.date == day for d in self.added_days.get(camera_id, []))
+                or any(d.date == day for d in self.replaced_days.get(camera_id, [])))
+    
+    @classmethod
+    def between(cls, old: List['Camera'], new: List['Camera']) -> 'ScanDiff':
+        """Compare two scans day by day; days carried over unchanged are skipped cheaply."""
+        diff = cls()
+        old_by_id = {camera.camera_id: camera for camera in old}
+        new_ids = set()
+        for camera in new:
+            camera_id = camera.camera_id
+            new_ids.add(camera_id)
+            previous = old_by_id.get(camera_id)
+            if previous is None:
+                diff.added_cameras.append(camera)
+                diff.new_segments += sum(len(day.video_segments) for day in camera.recording_days)
+                continue
+            if camera.scanned_at:
+                diff.camera_scanned_at[camera_id] = camera.scanned_at
+            old_days = {day.date: day for day in previous.recording_days}
+            for day in camera.recording_days:
+                old_day = old_days.pop(day.date, None)
+                if old_day is day:
+                    continue
+                if old_day is None:
+                    diff.added_days.setdefault(camera_id, []).append(day)
+                    diff.new_segments += len(day.video_segments)
+                    continue
+                if day.scanned_at:
+                    diff.scanned_at.setdefault(camera_id, {})[day.date] = day.scanned_at
+                diff.listed_hours.setdefault(camera_id, {})[day.date] = day.listed_hours
+                old_paths = old_day.segment_paths()
+                new_paths = day.segment_paths()
+                if new_paths == old_paths:
+                    continue
+                if new_paths[:len(old_paths)] == old_paths:
+                    diff.appended_segments.setdefault(camera_id, {})[day.date] = \
+                        list(day.video_segments[len(old_paths):])
+                    diff.new_segments += len(new_paths) - len(old_paths)
+                else:
+                    diff.replaced_days.setdefault(camera_id, []).append(day)
+                    old_set = set(old_paths)
+                    diff.new_segments += sum(1 for path in new_paths if path not in old_set)
+            if old_days:
+                diff.removed_days[camera_id] = sorted(old_days)
+        diff.removed_cameras = [camera_id for camera_id in old_by_id if camera_id not in new_ids]
+        return diff
+    
+    def apply_to(self, cameras: List['Camera']) -> None:
+        """Update `cameras` (the list and the objects in it) to match the new scan."""
+        cameras[:] = [camera for camera in cameras if camera.camera_id not in self.removed_cameras]
+        cameras.extend(self.added_cameras)
+        for camera in cameras:
+            camera_id = camera.camera_id
+            for day_date in self.removed_days.get(camera_id, []):
+                camera.remove_recording_day(day_date)
+            for day in self.added_days.get(camera_id, []) + self.replaced_days.get(camera_id, []):
+                camera.set_recording_day(day)
+            for day_date, segments in self.appended_segments.get(camera_id, {}).items():
+                camera.get_recording_day(day_date).append_segments(segments)
+            for day_date, scanned_at in self.scanned_at.get(camera_id, {}).items():
+                day = camera.get_recording_day(day_date)
+                if day:
+                    day.scanned_at = scanned_at
+            for day_date, listed_hours in self.listed_hours.get(camera_id, {}).items():
+                day = camera.get_recording_day(day_date)
+                if day:
+                    day.listed_hours = listed_hours
+            if camera_id in self.camera_scanned_at:
+                camera.scanned_at = self.camera_scanned_at[camera_id]
+
+
+@dataclass
+class ScanProgress:
+    """Counters for a running NAS scan."""
+    message: str = ""
+    cameras_total: int = 0
+    cameras_done: int = 0
+    folders_scanned: int = 0
+    files_scanned: int = 0
+    days_reused: int = 0
+    elapsed_seconds: float = 0.0
+    stale_reason: str = ""  # Set when the NAS stopped answering and the result is partial
+    
+    @property
+    def files_per_second(self) -> float:
+        return self.files_scanned / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+    
+    @property
+    def status_text(self) -> str:
+        """One line for the status bar."""
+        if self.stale_reason:
+            return f"{self.message} showing partial results ({self.stale_reason})"
+        if not self.files_scanned:
+            return self.message
+        return f"{self.message} {self.files_scanned} files, {self.files_per_second:.0f}/s"
+
+
+@dataclass
+class CameraSummary:
+    """The few camera fields the dashboard shows, small enough to load at startup."""
+    camera_id: str
+    name: str
+    nas_path: str
+    total_recording_days: int
+    latest_recording_date: Optional[date]
+    
+    @property
+    def has_recordings(self) -> bool:
+        return self.total_recording_days > 0
+    
+    @classmethod
+    def from_camera(cls, camera: Camera) -> 'CameraSummary':
+        return cls(
+            camera_id=camera.camera_id,
+            name=camera.name,
+            nas_path=camera.nas_path,
+            total_recording_days=camera.total_recording_days,
+            latest_recording_date=camera.latest_recording_date
+        )
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'camera_id': self.camera_id,
+            'name': self.name,
+            'nas_path': self.nas_path,
+            'total_recording_days': self.total_recording_days,
+            'latest_recording_date': self.latest_recording_date.isoformat() if self.latest_recording_date else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CameraSummary':
+        """Create CameraSummary instance from dictionary."""
+        latest = data.get('latest_recording_date')
+        return cls(
+            camera_id=data['camera_id'],
+            name=data.get('name', data['camera_id']),
+            nas_path=data.get('nas_path', ''),
+            total_recording_days=data.get('total_recording_days', 0),
+            latest_recording_date=date.fromisoformat(latest) if latest else None
+        )
 
 
 @dataclass
@@ -117,6 +457,12 @@ class Settings:
     cache_enabled: bool = True
     cache_max_age_hours: int = 24
     auto_refresh_interval_minutes: int = 30
+    activity_analysis_enabled: bool = True
+    scan_in_separate_process: bool = False
+    storage_backend: str = "local"  # 'local' (OS mount) or 'smb' (built-in client); see storage.py
+    scan_concurrency: int = 0  # Folder listings in flight while scanning; 0 leaves it to the storage backend
+    prefetch_segments: int = 2  # Segments each grid tile copies ahead
+    prefetch_cache_mb: int = 512  # Local copies kept by the prefetcher
     theme: str = "light"
     
     def to_dict(self) -> dict:
@@ -130,6 +476,12 @@ class Settings:
             'cache_enabled': self.cache_enabled,
             'cache_max_age_hours': self.cache_max_age_hours,
             'auto_refresh_interval_minutes': self.auto_refresh_interval_minutes,
+            'activity_analysis_enabled': self.activity_analysis_enabled,
+            'scan_in_separate_process': self.scan_in_separate_process,
+            'storage_backend': self.storage_backend,
+            'scan_concurrency': self.scan_concurrency,
+            'prefetch_segments': self.prefetch_segments,
+            'prefetch_cache_mb': self.prefetch_cache_mb,
             'theme': self.theme
         }
     
@@ -145,6 +497,12 @@ class Settings:
             cache_enabled=data.get('cache_enabled', True),
             cache_max_age_hours=data.get('cache_max_age_hours', 24),
             auto_refresh_interval_minutes=data.get('auto_refresh_interval_minutes', 30),
+            activity_analysis_enabled=data.get('activity_analysis_enabled', True),
+            scan_in_separate_process=data.get('scan_in_separate_process', False),
+            storage_backend=data.get('storage_backend', 'local'),
+            scan_concurrency=data.get('scan_concurrency', 0),
+            prefetch_segments=data.get('prefetch_segments', 2),
+            prefetch_cache_mb=data.get('prefetch_cache_mb', 512),
             theme=data.get('theme', 'light')
         )
     
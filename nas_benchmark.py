@@ -0,0 +1,313 @@
+"""
+NAS latency and throughput benchmark, run by the settings' connection test.
+
+`run_benchmark` reaches the camera folders the way a scan does, then times:
+
+    listing      hour folders listed one at a time (p50/p95 latency)
+    parallel     batches of hour folders listed 1, 2, 4, 8 and 16 at a time
+    stat         files stat'ed one at a time
+    read         a recent segment read from start to end
+
+`BenchmarkResult.recommend` turns the figures into settings: how many
+listings the scanner keeps in flight, how many segments the grid copies
+ahead and how large the prefetch cache is. Every NAS call goes through a
+NASGuard, so a stalled NAS fails the benchmark instead of hanging it.
+Nothing here uses Qt; the settings view runs it on a thread.
+"""
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from models import Settings
+from nas_guard import NASGuard
+from segment_prefetcher import SegmentPrefetcher
+from storage import create_backend
+
+
+LISTING_SAMPLES = 24  # Hour folders listed one at a time
+CONCURRENCY_LEVELS = (1, 2, 4, 8, 16)
+SWEEP_FOLDERS = 16  # Hour folders listed at each concurrency level
+CAMERAS_SAMPLED = 16
+STAT_SECONDS = 2.0
+STAT_LIMIT = 200
+READ_SECONDS = 8.0
+READ_CHUNK_BYTES = 1024 * 1024
+CALL_TIMEOUT_SECONDS = 10.0
+
+SEGMENT_SECONDS = 60
+TYPICAL_TILES = 4  # The grid's default 2x2 layout
+MAX_TILES = 9  # Its largest, 3x3
+CONCURRENCY_TOLERANCE = 0.9  # Fewest listings in flight reaching this share of the best rate
+SPIKY_LATENCY_MS = 250
+CACHE_STEP_MB = 64
+MIN_CACHE_MB = 256
+MAX_CACHE_MB = 8192
+
+
+class BenchmarkCancelled(Exception):
+    """Raised inside the benchmark when its cancel event is set."""
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of `values` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+@dataclass
+class Recommendations:
+    """Settings suggested by a benchmark, with the reason for each."""
+    scan_concurrency: int
+    prefetch_segments: int
+    prefetch_cache_mb: int
+    reasons: List[str] = field(default_factory=list)
+
+    def to_settings(self) -> dict:
+        """Keyword arguments for `ConfigService.update_settings`."""
+        return {
+            'scan_concurrency': self.scan_concurrency,
+            'prefetch_segments': self.prefetch_segments,
+            'prefetch_cache_mb': self.prefetch_cache_mb,
+        }
+
+
+@dataclass
+class BenchmarkResult:
+    """What a benchmark measured."""
+    backend: str
+    camera_folders: int = 0
+    listing_ms: List[float] = field(default_factory=list)
+    listings_per_second: Dict[int, float] = field(default_factory=dict)  # By listings in flight
+    stats: int = 0
+    stat_seconds: float = 0.0
+    sample_segment: str = ""
+    segment_bytes: int = 0  # Median size of the segments listed
+    read_bytes: int = 0
+    read_seconds: float = 0.0
+    first_byte_ms: float = 0.0
+    free_cache_bytes: Optional[int] = None  # Free space where the prefetcher keeps its copies
+
+    @property
+    def listing_p50_ms(self) -> float:
+        return percentile(self.listing_ms, 0.5)
+
+    @property
+    def listing_p95_ms(self) -> float:
+        return percentile(self.listing_ms, 0.95)
+
+    @property
+    def stats_per_second(self) -> float:
+        return self.stats / self.stat_seconds if self.stat_seconds > 0 else 0.0
+
+    @property
+    def read_mb_per_second(self) -> float:
+        return self.read_bytes / self.read_seconds / (1024 * 1024) if self.read_seconds > 0 else 0.0
+
+    def report_lines(self) -> List[str]:
+        lines = [f"Listing latency: p50 {self.listing_p50_ms:.0f} ms, p95 {self.listing_p95_ms:.0f} ms "
+                 f"over {len(self.listing_ms)} folders"]
+        if self.listings_per_second:
+            rates = ", ".join(f"{level} at once {rate:.0f}/s" for level, rate in self.listings_per_second.items())
+            lines.append(f"Folder listings: {rates}")
+        if self.stats:
+            lines.append(f"Stat rate: {self.stats_per_second:.0f} files/s")
+        if self.read_bytes:
+            lines.append(f"Sequential read: {self.read_mb_per_second:.1f} MB/s, first byte after "
+                         f"{self.first_byte_ms:.0f} ms ({os.path.basename(self.sample_segment)})")
+        return lines
+
+    def recommend(self) -> Recommendations:
+        """Settings suited to the measured NAS."""
+        reasons = []
+
+        concurrency = 0
+        if self.listings_per_second:
+            best = max(self.listings_per_second.values())
+            concurrency = min(level for level, rate in self.listings_per_second.items()
+                              if rate >= best * CONCURRENCY_TOLERANCE)
+            if concurrency == CONCURRENCY_LEVELS[-1]:
+                why = "listing still sped up at the most tried"
+            else:
+                why = "more did not list faster"
+            reasons.append(f"Scan with {concurrency} folder listing{'s' if concurrency > 1 else ''} in flight: {why}")
+        else:
+            reasons.append("Scan concurrency left to the storage backend: too few folders to measure")
+
+        segment_bytes = self.segment_bytes or self.read_bytes
+        segment_rate = segment_bytes / SEGMENT_SECONDS  # Bytes per second one camera plays
+        read_rate = self.read_bytes / self.read_seconds if self.read_seconds > 0 else 0.0
+        if not read_rate or not segment_rate:
+            prefetch = Settings.prefetch_segments
+            reasons.append(f"Prefetch depth left at {prefetch}: no segment could be read")
+        elif read_rate < segment_rate * TYPICAL_TILES * 1.5:
+            prefetch = 1
+            reasons.append(f"Prefetch 1 segment ahead: the NAS reads {read_rate / segment_rate:.1f}x what a "
+                           f"camera plays, so copying further ahead would slow the playing tiles")
+        else:
+            # Copies for every tile must finish while one segment plays
+            copy_seconds = segment_bytes / read_rate + self.first_byte_ms / 1000
+            fits = max(1, int(SEGMENT_SECONDS / (copy_seconds * TYPICAL_TILES)))
+            spiky = max(self.listing_p95_ms, self.first_byte_ms) > SPIKY_LATENCY_MS
+            prefetch = min(3 if spiky else 2, fits)
+            reasons.append(f"Prefetch {prefetch} segments ahead: a segment copies in {copy_seconds:.1f} s"
+                           + (", and latency spikes need a deeper buffer" if spiky else ""))
+
+        if segment_bytes:
+            # Every tile of the largest grid, its prefetched segments and as many again to seek back into
+            needed_mb = segment_bytes * MAX_TILES * (prefetch + 1) * 2 / (1024 * 1024)
+            cache_mb = max(MIN_CACHE_MB, math.ceil(needed_mb / CACHE_STEP_MB) * CACHE_STEP_MB)
+            cache_mb = min(cache_mb, MAX_CACHE_MB)
+            if self.free_cache_bytes is not None:
+                quarter_mb = self.free_cache_bytes // 4 // (1024 * 1024) // CACHE_STEP_MB * CACHE_STEP_MB
+                cache_mb = max(CACHE_STEP_MB, min(cache_mb, quarter_mb))
+            reasons.append(f"Prefetch cache of {cache_mb} MB: {MAX_TILES} tiles of "
+                           f"{segment_bytes / (1024 * 1024):.0f} MB segments")
+        else:
+            cache_mb = Settings.prefetch_cache_mb
+            reasons.append(f"Prefetch cache left at {cache_mb} MB: no segment sizes were listed")
+
+        return Recommendations(concurrency, prefetch, cache_mb, reasons)
+
+
+def run_benchmark(settings: Settings, progress_callback: Optional[Callable[[str], None]] = None,
+                  cancel_event: Optional[threading.Event] = None) -> BenchmarkResult:
+    """Benchmark the NAS of `settings` on the calling thread.
+
+    `progress_callback(line)` is called with a line of progress text after
+    each step. Raises an exception with a readable message if the camera
+    folders cannot be reached, and BenchmarkCancelled if `cancel_event` is set.
+    """
+    def report(line: str) -> None:
+        if progress_callback:
+            progress_callback(line)
+
+    def check_cancelled() -> None:
+        if cancel_event is not None and cancel_event.is_set():
+            raise BenchmarkCancelled()
+
+    backend = create_backend(settings)
+    guard = NASGuard(timeout=CALL_TIMEOUT_SECONDS, retries=0)
+    result = BenchmarkResult(backend=backend.name)
+    try:
+        nas_path = settings.full_nas_path
+        if not guard.call(f"Opening {nas_path}", backend.exists, nas_path, check_cancelled=check_cancelled):
+            raise Exception(f"Path is not accessible: {nas_path}")
+        cameras = sorted(guard.call(f"Listing {nas_path}", backend.list_dirs, nas_path,
+                                    check_cancelled=check_cancelled))
+        result.camera_folders = len(cameras)
+        report(f"✓ Found {len(cameras)} camera folders through the {backend.name} backend")
+
+        folders = _recent_hour_folders(guard, backend, nas_path, cameras, check_cancelled)
+        if not folders:
+            report("⚠ No recording folders found; only the connection was tested")
+            return result
+
+        # One at a time, newest first (the folders a refresh lists)
+        files = []
+        for path in folders[:LISTING_SAMPLES]:
+            check_cancelled()
+            started = time.perf_counter()
+            entries = guard.call(f"Listing {path}", backend.scandir, path, check_cancelled=check_cancelled)
+            result.listing_ms.append((time.perf_counter() - started) * 1000)
+            files.extend(entry for name, entry in sorted(entries.items()) if name.lower().endswith('.mp4'))
+        report(result.report_lines()[0])
+
+        # In parallel, each level on folders not listed yet where there are enough
+        remaining = folders[LISTING_SAMPLES:] or folders
+        for level in CONCURRENCY_LEVELS:
+            batch = [remaining[i % len(remaining)] for i in range(SWEEP_FOLDERS)]
+            remaining = remaining[SWEEP_FOLDERS:] or folders
+            guard.set_threads(level)
+            started = time.perf_counter()
+            with_errors = sum(1 for _, _, error in guard.map("Listing", backend.scandir, batch,
+                                                             check_cancelled=check_cancelled) if error)
+            seconds = time.perf_counter() - started
+            if with_errors:
+                report(f"⚠ {with_errors} listings failed with {level} in flight")
+            result.listings_per_second[level] = len(batch) / seconds if seconds > 0 else 0.0
+            check_cancelled()
+        report(result.report_lines()[1])
+
+        # Stat one at a time, as exists checks and the SMB proxy do
+        started = time.perf_counter()
+        for entry in files[:STAT_LIMIT]:
+            check_cancelled()
+            guard.call(f"Reading the size of {entry.path}", backend.size, entry.path)
+            result.stats += 1
+            if time.perf_counter() - started > STAT_SECONDS:
+                break
+        result.stat_seconds = time.perf_counter() - started
+        if result.stats:
+            report(f"Stat rate: {result.stats_per_second:.0f} files/s")
+
+        sizes = sorted(_entry_size(entry) for entry in files)
+        result.segment_bytes = sizes[len(sizes) // 2] if sizes else 0
+        # The newest finished segment: the last file may still be being written
+        sample = next((entry for entry in reversed(files[:-1]) if _entry_size(entry) > 0), None)
+        if sample is not None:
+            result.sample_segment = sample.path
+            guard.call(f"Reading {sample.path}", _read, backend, sample.path, result, cancel_event)
+            check_cancelled()
+            report(f"Sequential read: {result.read_mb_per_second:.1f} MB/s, "
+                   f"first byte after {result.first_byte_ms:.0f} ms")
+
+        cache_dir = SegmentPrefetcher.shared().cache_dir
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            result.free_cache_bytes = shutil.disk_usage(cache_dir).free
+        except OSError:
+            pass
+        return result
+    finally:
+        guard.close()
+        backend.close()
+
+
+def _recent_hour_folders(guard: NASGuard, backend, nas_path: str, cameras: List[str],
+                         check_cancelled: Callable) -> List[str]:
+    """Hour folders of up to CAMERAS_SAMPLED cameras, newest first, taking turns between cameras."""
+    needed = LISTING_SAMPLES + SWEEP_FOLDERS * len(CONCURRENCY_LEVELS)
+    per_camera = []
+    for camera_id in cameras[:CAMERAS_SAMPLED]:
+        camera_path = os.path.join(nas_path, camera_id)
+        try:
+            names = guard.call(f"Listing {camera_path}", backend.list_dirs, camera_path,
+                               check_cancelled=check_cancelled)
+        except OSError as e:
+            print(f"Error listing camera folder {camera_path}: {e}")
+            continue
+        hours = sorted((name for name in names if re.match(r'^\d{10}$', name)), reverse=True)
+        per_camera.append([os.path.join(camera_path, name) for name in hours[:needed]])
+
+    folders = []
+    for rank in range(max((len(paths) for paths in per_camera), default=0)):
+        folders.extend(paths[rank] for paths in per_camera if rank < len(paths))
+    return folders[:needed]
+
+
+def _read(backend, path: str, result: BenchmarkResult, cancel_event: Optional[threading.Event]) -> None:
+    """Read `path` from the start for up to READ_SECONDS, recording the throughput in `result`."""
+    started = time.perf_counter()
+    with backend.open(path) as f:
+        while time.perf_counter() - started < READ_SECONDS:
+            chunk = f.read(READ_CHUNK_BYTES)
+            if not result.read_bytes:
+                result.first_byte_ms = (time.perf_counter() - started) * 1000
+            if not chunk or (cancel_event is not None and cancel_event.is_set()):
+                break
+            result.read_bytes += len(chunk)
+    result.read_seconds = time.perf_counter() - started
+
+
+def _entry_size(entry: os.DirEntry) -> int:
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
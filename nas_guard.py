@@ -0,0 +1,217 @@
+"""
+Deadlines, retries and a circuit breaker for NAS I/O during a scan.
+
+A stalled NAS (a disk spinning up, a flaky Wi-Fi link) can block a single
+directory listing for minutes, and a blocked call cannot be interrupted.
+`NASGuard` therefore runs each call on one of its own daemon threads and
+waits at most `timeout` seconds for it. A call that times out is abandoned
+to finish (or hang) on its own, and the guard starts another thread in its
+place; the abandoned call's thread exits if it ever gets the call back, so
+the pool does not grow by a thread with every timeout.
+
+A call that times out or fails with a connection-type error is retried, up
+to `retries` times, after a backoff that doubles each time. Errors that are
+answers from the NAS (the folder is gone, access is denied) are not retried;
+they are told apart by errno, since backends raise their own OSError
+subclasses (smbclient's SMBOSError) rather than FileNotFoundError and kin.
+Once `failure_threshold` calls in a row have failed that way, the circuit
+opens: the call and every later one fail at once with NASUnavailable, so the
+scan can stop and return what it has.
+"""
+import errno
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+
+FOLDER_TIMEOUT_SECONDS = 20.0
+RETRIES = 2
+BACKOFF_SECONDS = 1.0
+FAILURE_THRESHOLD = 3
+
+# Errors that are the NAS's answer rather than a sign it is unreachable
+ANSWER_ERRORS = (FileNotFoundError, NotADirectoryError, IsADirectoryError, PermissionError)
+ANSWER_ERRNOS = {errno.ENOENT, errno.ENOTDIR, errno.EISDIR, errno.EACCES, errno.EPERM}
+
+
+def is_answer(error: BaseException) -> bool:
+    """Whether `error` is the NAS answering (not found, access denied) rather than failing to."""
+    return isinstance(error, ANSWER_ERRORS) or (isinstance(error, OSError) and error.errno in ANSWER_ERRNOS)
+
+
+def is_not_found(error: BaseException) -> bool:
+    """Whether `error` says the path does not exist, whichever backend raised it."""
+    return isinstance(error, FileNotFoundError) or (isinstance(error, OSError) and error.errno == errno.ENOENT)
+
+
+class NASUnavailable(Exception):
+    """The NAS stopped answering, so the rest of the scan was skipped."""
+
+
+class NASTimeout(OSError):
+    """A NAS call did not finish before its deadline."""
+
+
+class _Call:
+    def __init__(self, func: Callable, args: tuple):
+        self.func = func
+        self.args = args
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.abandoned = False  # Timed out; its thread no longer counts towards the pool
+
+
+class NASGuard:
+    """Runs NAS calls with deadlines, bounded retries and a circuit breaker."""
+
+    def __init__(self, timeout: float = FOLDER_TIMEOUT_SECONDS, retries: int = RETRIES,
+                 backoff: float = BACKOFF_SECONDS, failure_threshold: int = FAILURE_THRESHOLD,
+                 threads: int = 1):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = 0
+        self.open_reason: Optional[str] = None
+        self.timeouts = 0
+        self.retried = 0
+        self._queue = queue.Queue()
+        self._threads = 0
+        self._wanted_threads = 0
+        self._threads_lock = threading.Lock()
+        self.set_threads(threads)
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_reason is not None
+
+    def reset(self) -> None:
+        """Close the circuit again, e.g. at the start of the next scan."""
+        self.consecutive_failures = 0
+        self.open_reason = None
+        self.timeouts = 0
+        self.retried = 0
+
+    def set_threads(self, threads: int) -> None:
+        """Allow up to `threads` calls in flight; surplus threads exit after their current call."""
+        self._resize(max(1, threads))
+
+    def close(self) -> None:
+        """Let every thread exit once its current call is done."""
+        self._resize(0)
+
+    def _resize(self, threads: int) -> None:
+        with self._threads_lock:
+            self._wanted_threads = threads
+            while self._threads < threads:
+                self._start_thread()
+            for _ in range(self._threads - threads):
+                self._queue.put(None)  # Wakes an idle thread so it sees it is surplus
+
+    def _start_thread(self) -> None:
+        self._threads += 1
+        threading.Thread(target=self._work, name="nas-io", daemon=True).start()
+
+    def _work(self) -> None:
+        while True:
+            with self._threads_lock:
+                if self._threads > self._wanted_threads:
+                    self._threads -= 1
+                    return
+            call = self._queue.get()
+            if call is None:
+                continue
+            if not call.cancelled:
+                try:
+                    call.result = call.func(*call.args)
+                except BaseException as e:
+                    call.error = e
+            # A call can time out while still queued and be cancelled after; its thread was replaced all the same
+            with self._threads_lock:
+                call.done.set()
+                if call.abandoned:
+                    return  # Replaced while it hung
+
+    def _submit(self, func: Callable, *args) -> _Call:
+        call = _Call(func, args)
+        self._queue.put(call)
+        return call
+
+    def _wait(self, call: _Call, description: str):
+        """The call's result, raising its error or NASTimeout."""
+        if not call.done.wait(self.timeout):
+            with self._threads_lock:
+                timed_out = not call.done.is_set()
+                if timed_out:
+                    # The thread running it may never come back; keep the pool at strength
+                    call.abandoned = True
+                    self._threads -= 1
+                    self._start_thread()
+            if timed_out:
+                self.timeouts += 1
+                raise NASTimeout(f"{description} did not answer within {self.timeout:g} s")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _failed(self, description: str, error: BaseException) -> None:
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.open_reason = f"NAS not responding - {error}"
+
+    def call(self, description: str, func: Callable, *args, check_cancelled: Callable = None):
+        """Run `func(*args)` with a deadline and retries; raises NASUnavailable once the circuit is open."""
+        return self._run(description, self._submit(func, *args), func, args, check_cancelled)
+
+    def _run(self, description: str, call: _Call, func: Callable, args: tuple, check_cancelled: Callable):
+        attempt = 0
+        while True:
+            if self.is_open:
+                raise NASUnavailable(self.open_reason)
+            try:
+                result = self._wait(call, description)
+                self.consecutive_failures = 0
+                return result
+            except Exception as e:
+                if is_answer(e):
+                    self.consecutive_failures = 0
+                    raise
+                self._failed(description, e)
+                if self.is_open:
+                    raise NASUnavailable(self.open_reason) from e
+                if attempt >= self.retries:
+                    raise
+            delay = self.backoff * (2 ** attempt)
+            attempt += 1
+            self.retried += 1
+            deadline = time.monotonic() + delay
+            while time.monotonic() < deadline:
+                if check_cancelled:
+                    check_cancelled()
+                time.sleep(min(0.1, delay))
+            call = self._submit(func, *args)
+
+    def map(self, description: str, func: Callable, items: Iterable,
+            check_cancelled: Callable = None) -> Iterator[Tuple[object, object, Optional[Exception]]]:
+        """Run `func(item)` for every item with up to `threads` in flight, yielding (item, result, error) in order.
+
+        Each item gets the deadline and retries of `call`; its error, if it
+        still failed, is yielded rather than raised. NASUnavailable is raised.
+        """
+        items = list(items)
+        calls = [self._submit(func, item) for item in items]
+        try:
+            for item, call in zip(items, calls):
+                try:
+                    yield item, self._run(f"{description} {item}", call, func, (item,), check_cancelled), None
+                except NASUnavailable:
+                    raise
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # Stopped early (cancelled, circuit open): do not list the rest
+            for call in calls:
+                call.cancelled = True
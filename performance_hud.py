@@ -0,0 +1,136 @@
+"""
+Performance overlay (HUD) for the camera player, for live triage.
+
+The HUD only reads counters the player, timeline and scanner keep anyway, and
+its timer only runs while it is shown, so a hidden HUD costs nothing.
+"""
+import ctypes
+import os
+import sys
+import time
+from typing import Optional, TYPE_CHECKING
+
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+
+from segment_prefetcher import SegmentPrefetcher
+
+if TYPE_CHECKING:
+    from camera_player_view import CameraPlayerView
+    from refresh_scheduler import RefreshScheduler
+    from scan_worker import ScanWorker
+
+
+HUD_UPDATES_PER_SECOND = 4
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read."""
+    try:
+        if sys.platform == 'win32':
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                        'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            if kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+class PerformanceHud(QLabel):
+    """Overlay on the video showing playback, paint, scan and memory figures a few times a second."""
+
+    def __init__(self, view: 'CameraPlayerView'):
+        super().__init__(view.video_player)
+        self.view = view
+        self.scan_worker: Optional['ScanWorker'] = None  # Set by the main window
+        self.refresh_scheduler: Optional['RefreshScheduler'] = None  # Likewise
+        self.setFont(QFont("Consolas", 9))
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #f0f0f0; padding: 4px;")
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.hide()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // HUD_UPDATES_PER_SECOND)
+        self.timer.timeout.connect(self.refresh)
+        self._last_frames = 0
+        self._last_tick = 0.0
+
+    def set_active(self, active: bool):
+        """Show the HUD and start sampling, or hide it and stop."""
+        if active:
+            self._last_frames = self.view.video_player.frames_decoded
+            self._last_tick = time.perf_counter()
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def refresh(self):
+        """Sample the counters and redraw."""
+        self.setText("\n".join(self.lines()))
+        self.adjustSize()
+        self.move(max(0, self.parentWidget().width() - self.width() - 8), 8)
+
+    def lines(self) -> list:
+        player = self.view.video_player
+
+        now = time.perf_counter()
+        frames = player.frames_decoded
+        fps = (frames - self._last_frames) / (now - self._last_tick) if now > self._last_tick else 0.0
+        self._last_frames, self._last_tick = frames, now
+        lines = [f"fps     {fps:5.1f} decoded, rate {player.player.playbackRate():g}x"]
+
+        segment = player.current_segment
+        if segment is not None:
+            url = player.player.source()
+            source = url.toLocalFile()
+            cache_dir = SegmentPrefetcher.shared().cache_dir
+            if url.scheme() == 'http':
+                origin = "NAS via SMB proxy"
+            elif source and os.path.normpath(source).startswith(cache_dir):
+                origin = "local cache"
+            else:
+                origin = "NAS"
+            lines.append(f"segment {os.path.basename(segment.path)} ({origin})")
+        else:
+            lines.append("segment -")
+        lines.append(f"prefetch queue {SegmentPrefetcher.shared().queue_depth}")
+
+        seeks = player.metrics.histograms.get('seek/total')
+        lines.append(f"seek    {seeks.recent[-1]:.0f} ms" if seeks and seeks.recent else "seek    -")
+        lines.append(f"paint   {self.view.timeline_widget.last_paint_ms:.1f} ms timeline")
+
+        worker = self.scan_worker
+        if worker is not None and worker.is_running:
+            progress = worker.last_progress
+            lines.append(f"scan    {progress.status_text if progress else 'starting'}")
+        else:
+            lines.append("scan    idle")
+
+        scheduler = self.refresh_scheduler
+        if scheduler is not None:
+            lines.append(f"refresh {scheduler.status_line()}")
+            if scheduler.history:
+                last = scheduler.history[-1]
+                lines.append(f"        last {last.kind}: {last.folders_listed} folders, {last.seconds * 1000:.0f} ms")
+
+        rss = process_rss_bytes()
+        lines.append(f"rss     {rss / (1024 * 1024):.0f} MB" if rss is not None else "rss     -")
+        return lines
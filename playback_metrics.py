@@ -0,0 +1,140 @@
+"""
+Latency of playback requests, stage by stage.
+
+A request starts when playback is asked to show a new position: a seek
+(timeline click or `seek_to_time`), a playlist load, or the move to the next
+segment at a boundary. It then passes through these stages, each timed from
+the one before it:
+
+    set_source      setSource returned (opening the file on the NAS)
+    loading         the backend reported LoadingMedia (reported during
+                    setSource, it is recorded once setSource returns)
+    loaded          LoadedMedia (reading and demuxing the container)
+    first_position  the first positionChanged (the seek landed)
+    first_frame     the first decoded frame reached the video sink
+
+Seeks within the current segment skip the first three. Each stage, and the
+total of each request, goes into a histogram named `<kind>/<stage>` or
+`<kind>/total`; boundary totals also go into `boundary_stall`.
+"""
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional
+
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+RECENT_SAMPLES = 500
+
+STAGES = ('set_source', 'loading', 'loaded', 'first_position', 'first_frame')
+
+
+class LatencyHistogram:
+    """Counts of durations per bucket, plus recent samples for percentiles."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is over the largest bound
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.recent.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Percentile of the recent samples, or None if there are none."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def to_dict(self) -> dict:
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else None,
+            'p50_ms': round(p50, 2) if p50 is not None else None,
+            'p95_ms': round(p95, 2) if p95 is not None else None,
+            'max_ms': round(self.max_ms, 2),
+            'buckets_ms': dict(zip(labels, self.counts)),
+        }
+
+
+class PlaybackMetrics:
+    """Times playback requests through their stages into histograms."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.last: Optional[dict] = None  # The most recently completed request
+        self._kind: Optional[str] = None
+        self._started = 0.0
+        self._previous = 0.0
+        self._stages: Dict[str, float] = {}
+
+    @property
+    def pending(self) -> bool:
+        """Whether a request is waiting for its first frame."""
+        return self._kind is not None
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+        return self.histograms[name]
+
+    def begin(self, kind: str) -> None:
+        """Start timing a request ('seek', 'load' or 'boundary'), abandoning any unfinished one."""
+        self._kind = kind
+        self._started = self._previous = time.perf_counter()
+        self._stages = {}
+
+    def stage(self, name: str) -> bool:
+        """Record that the pending request reached a stage; True when that completed it."""
+        if self._kind is None or name in self._stages:
+            return False
+        now = time.perf_counter()
+        ms = (now - self._previous) * 1000
+        self._previous = now
+        self._stages[name] = round(ms, 2)
+        self.histogram(f"{self._kind}/{name}").add(ms)
+        if name != 'first_frame':
+            return False
+
+        total = (now - self._started) * 1000
+        self.histogram(f"{self._kind}/total").add(total)
+        if self._kind == 'boundary':
+            self.histogram('boundary_stall').add(total)
+        self.last = {'kind': self._kind, 'total_ms': round(total, 2), 'stages_ms': dict(self._stages)}
+        self._kind = None
+        return True
+
+    def summary_lines(self) -> List[str]:
+        """A few lines for the debug overlay."""
+        lines = []
+        if self.last:
+            stages = ", ".join(f"{name.replace('first_', '')} {ms:.0f}" for name, ms in self.last['stages_ms'].items())
+            lines.append(f"last {self.last['kind']}: {self.last['total_ms']:.0f} ms ({stages})")
+        for name in ('seek/total', 'load/total', 'boundary_stall'):
+            histogram = self.histograms.get(name)
+            if histogram and histogram.count:
+                lines.append(f"{name}: p50 {histogram.percentile(0.5):.0f} / p95 {histogram.percentile(0.95):.0f} ms"
+                             f" (n={histogram.count})")
+        return lines or ["No playback requests timed yet"]
+
+    def to_dict(self) -> dict:
+        return {
+            'stages': list(STAGES),
+            'histograms': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            'last': self.last,
+        }
+
+    def export_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
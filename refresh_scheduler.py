@@ -0,0 +1,274 @@
+"""
+Scheduling of background refreshes from each camera's observed write cadence.
+
+A refresh of every camera lists each camera folder and each day that has
+not settled, yet between two refreshes a camera only adds files to the hour
+folder it is recording into. The scheduler therefore keeps, per camera:
+
+    cadence      seconds between its recent segments (median of the gaps)
+    idle_checks  checks in a row that found nothing new
+    due          when to check it next
+
+When cameras are due it asks for a revalidation of just their current hour
+folders (`NASScannerService.revalidate`). Each idle check doubles the
+camera's interval; a camera whose newest segment is hours old (offline, or
+recording on motion) is left to the sweeps. Sweeps, the incremental scans
+of everything, still run every `auto_refresh_interval_minutes` to pick up
+new cameras, new days and retention.
+
+Due work waits while the user plays video or works the timeline, up to a
+limit. Every interval stretches while the NAS is slow: the backoff doubles
+after a slow or failed operation and halves after a fast one. Operations
+are kept in `history`, recorded in the trace (`refresh.*`) and summarized
+for the status bar and the performance HUD.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Dict, List, Optional
+
+from models import Camera, ScanDiff, ScanProgress
+from tracing import tracer
+
+
+MIN_CHECK_SECONDS = 120  # No camera is checked more often than this
+CADENCE_SAMPLES = 20  # Newest segments whose gaps give the cadence
+MAX_IDLE_DOUBLINGS = 4
+STALE_CAMERA_HOURS = 6  # Newest segment older than this: leave the camera to the sweeps
+LOOKBACK_HOURS = 2  # Hour folders before the current one a check lists, after a gap
+MAX_CHECK_DEFER_SECONDS = 180  # Longest a check waits for playback or scrubbing to stop
+MAX_SWEEP_DEFER_SECONDS = 900
+SLOW_LISTING_SECONDS = 0.5
+FAST_LISTING_SECONDS = 0.1
+MAX_BACKOFF = 8.0
+HISTORY = 50
+
+
+@dataclass
+class RefreshOperation:
+    """One scheduled (or manual) refresh and what it cost."""
+    kind: str  # 'revalidate' (some hour folders) or 'sweep' (every camera)
+    reason: str = ""
+    folders: Dict[str, List[str]] = field(default_factory=dict)  # Camera ID -> hour folders, for 'revalidate'
+    deferred_seconds: float = 0.0
+    started: float = 0.0  # time.monotonic()
+    seconds: float = 0.0
+    folders_listed: int = 0
+    new_segments: int = 0
+    error: str = ""
+
+    @property
+    def summary(self) -> str:
+        """One line for the status bar."""
+        if self.kind == 'revalidate':
+            what = f"Checked {len(self.folders)} camera{'s' if len(self.folders) != 1 else ''}"
+        else:
+            what = "Checked all cameras"
+        text = (f"{what} ({self.folders_listed} folder{'s' if self.folders_listed != 1 else ''} "
+                f"in {self.seconds * 1000:.0f} ms")
+        if self.deferred_seconds >= 1:
+            text += f", waited {self.deferred_seconds:.0f} s"
+        text += ")"
+        if self.error:
+            return f"{text}: {self.error}"
+        if self.new_segments:
+            return f"{text}: {self.new_segments} new recordings"
+        return f"{text}: no new recordings"
+
+
+@dataclass
+class CameraCadence:
+    """What the scheduler has learned about one camera."""
+    cadence: float = 60.0  # Seconds between segments
+    last_segment: Optional[datetime] = None  # Start of the newest segment
+    idle_checks: int = 0
+    due: float = 0.0  # time.monotonic() of the next check
+
+    def hour_folders(self, now: datetime) -> List[str]:
+        """The hour folders new segments can be in: from the newest segment's hour (at most a few back) to now."""
+        first = now - timedelta(hours=LOOKBACK_HOURS)
+        if self.last_segment is not None and self.last_segment > first:
+            first = min(self.last_segment, now)  # A camera clock running ahead still gets the current hour
+        hour = first.replace(minute=0, second=0, microsecond=0)
+        folders = []
+        while hour <= now:
+            folders.append(hour.strftime('%Y%m%d%H'))
+            hour += timedelta(hours=1)
+        return folders
+
+
+class RefreshScheduler:
+    """Decides which refresh to run next; the main window runs it and reports back."""
+
+    def __init__(self, sweep_interval: float = 30 * 60):
+        self.sweep_interval = sweep_interval
+        self.cameras: Dict[str, CameraCadence] = {}
+        self.backoff = 1.0
+        self.last_sweep = time.monotonic()
+        self.running: Optional[RefreshOperation] = None
+        self.deferred_by: Optional[str] = None  # What due work is waiting for
+        self.deferrals = 0
+        self.history = deque(maxlen=HISTORY)
+        self._deferred_since: Optional[float] = None
+
+    @property
+    def next_sweep(self) -> float:
+        return self.last_sweep + self.sweep_interval * self.backoff
+
+    def set_sweep_interval(self, seconds: float) -> None:
+        self.sweep_interval = seconds
+
+    def observe(self, cameras: List[Camera]) -> None:
+        """Learn each camera's cadence and newest segment, scheduling cameras seen for the first time."""
+        now = time.monotonic()
+        seen = set()
+        for camera in cameras:
+            seen.add(camera.camera_id)
+            state = self.cameras.get(camera.camera_id)
+            if state is None:
+                state = self.cameras[camera.camera_id] = CameraCadence()
+                self._learn(state, camera)
+                self._schedule(state, now)
+            else:
+                self._learn(state, camera)
+        for camera_id in list(self.cameras):
+            if camera_id not in seen:
+                del self.cameras[camera_id]
+
+    def _learn(self, state: CameraCadence, camera: Camera) -> None:
+        day = next((day for day in camera.recording_days if day.has_recordings), None)  # Newest first
+        if day is None:
+            return
+        starts = day.segment_starts()
+        recent = starts[-CADENCE_SAMPLES - 1:]
+        gaps = [b - a for a, b in zip(recent, recent[1:]) if b > a]
+        if gaps:
+            state.cadence = float(median(gaps))
+        state.last_segment = datetime.combine(day.date, datetime.min.time()) + timedelta(seconds=starts[-1])
+
+    def _schedule(self, state: CameraCadence, now: float) -> None:
+        if state.last_segment is not None and datetime.now() - state.last_segment > timedelta(hours=STALE_CAMERA_HOURS):
+            state.due = float('inf')  # The sweeps will notice when it records again
+            return
+        interval = max(MIN_CHECK_SECONDS, state.cadence) * 2 ** min(state.idle_checks, MAX_IDLE_DOUBLINGS)
+        state.due = now + interval * self.backoff
+
+    def begin(self, kind: str, reason: str, folders: Optional[Dict[str, List[str]]] = None) -> RefreshOperation:
+        """Record that a refresh started (scheduled here, or asked for by the user)."""
+        operation = RefreshOperation(kind=kind, reason=reason, folders=folders or {}, started=time.monotonic())
+        self.running = operation
+        tracer.instant(f"refresh.{kind}", "refresh", reason=reason, cameras=len(operation.folders))
+        return operation
+
+    def next_operation(self, activity: Optional[str] = None) -> Optional[RefreshOperation]:
+        """The refresh to run now, if one is due and `activity` (e.g. 'playback') does not hold it back."""
+        if self.running is not None:
+            return None
+        now = time.monotonic()
+        sweep_due = now >= self.next_sweep
+        due = sorted(camera_id for camera_id, state in self.cameras.items() if state.due <= now)
+        if not sweep_due and not due:
+            return None
+
+        if activity:
+            if self._deferred_since is None:
+                self._deferred_since = now
+                self.deferrals += 1
+                tracer.instant("refresh.deferred", "refresh", activity=activity, sweep=sweep_due, cameras=len(due))
+            limit = MAX_SWEEP_DEFER_SECONDS if sweep_due else MAX_CHECK_DEFER_SECONDS
+            if now - self._deferred_since < limit:
+                self.deferred_by = activity
+                return None
+        deferred = now - self._deferred_since if self._deferred_since is not None else 0.0
+        self._deferred_since = None
+        self.deferred_by = None
+
+        if sweep_due:
+            operation = self.begin('sweep', "interval")
+        else:
+            wall_now = datetime.now()
+            folders = {camera_id: self.cameras[camera_id].hour_folders(wall_now) for camera_id in due}
+            operation = self.begin('revalidate', "cadence", folders)
+        operation.deferred_seconds = deferred
+        return operation
+
+    def finish(self, progress: Optional[ScanProgress], diff: Optional[ScanDiff], error: Optional[str],
+               cameras: List[Camera], cancelled: bool = False) -> Optional[RefreshOperation]:
+        """Record how the running refresh went and schedule the next ones; returns the operation."""
+        operation = self.running
+        self.running = None
+        if operation is None:
+            return None
+        now = time.monotonic()
+        operation.seconds = now - operation.started
+        operation.folders_listed = progress.folders_scanned if progress is not None else 0
+        operation.error = error or (progress.stale_reason if progress is not None else "") or ""
+        if diff is not None:
+            operation.new_segments = diff.new_segments
+
+        if not cancelled:
+            per_listing = operation.seconds / max(1, operation.folders_listed)
+            if operation.error or per_listing > SLOW_LISTING_SECONDS:
+                self.backoff = min(MAX_BACKOFF, self.backoff * 2)
+            elif per_listing < FAST_LISTING_SECONDS:
+                self.backoff = max(1.0, self.backoff / 2)
+
+        self.observe(cameras)
+        if operation.kind == 'sweep':
+            checked = list(self.cameras)
+            self.last_sweep = now  # Cancelled too, or the next tick would start it again
+        else:
+            checked = [camera_id for camera_id in operation.folders if camera_id in self.cameras]
+        changed = set(diff.changed_cameras) if diff is not None else set(checked)
+        for camera_id in checked:
+            state = self.cameras[camera_id]
+            if not operation.error and not cancelled:
+                state.idle_checks = 0 if camera_id in changed else state.idle_checks + 1
+            self._schedule(state, now)
+
+        self.history.append(operation)
+        tracer.counter("refresh", folders=operation.folders_listed, ms=round(operation.seconds * 1000),
+                       backoff=self.backoff)
+        return operation
+
+    def status_line(self) -> str:
+        """What the scheduler is doing or will do next, for the HUD."""
+        if self.running is not None:
+            return f"{self.running.kind} running"
+        if self.deferred_by:
+            return f"waiting for {self.deferred_by} to stop"
+        now = time.monotonic()
+        next_check = min((state.due for state in self.cameras.values()), default=float('inf'))
+        text = f"sweep in {_duration(self.next_sweep - now)}"
+        if next_check != float('inf'):
+            text = f"check in {_duration(next_check - now)}, {text}"
+        if self.backoff > 1:
+            text += f", backoff x{self.backoff:g}"
+        return text
+
+    def summary_lines(self) -> List[str]:
+        """The schedule and recent operations, for the diagnostics dialog."""
+        now = time.monotonic()
+        lines = [f"Next sweep in {_duration(self.next_sweep - now)}, NAS backoff x{self.backoff:g}, "
+                 f"deferred {self.deferrals} times", ""]
+        for camera_id, state in sorted(self.cameras.items()):
+            due = "with the sweeps" if state.due == float('inf') else f"in {_duration(state.due - now)}"
+            newest = state.last_segment.strftime('%Y-%m-%d %H:%M') if state.last_segment else "-"
+            lines.append(f"{camera_id}: a segment every {state.cadence:.0f} s, newest {newest}, "
+                         f"idle {state.idle_checks}, next check {due}")
+        if self.history:
+            lines.append("")
+            for operation in list(self.history)[-10:]:
+                lines.append(operation.summary)
+        return lines
+
+
+def _duration(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    if seconds < 120:
+        return f"{seconds} s"
+    if seconds < 2 * 3600:
+        return f"{seconds // 60} min"
+    return f"{seconds // 3600} h"
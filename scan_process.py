@@ -0,0 +1,152 @@
+"""
+NAS scans in a separate process.
+
+Parsing names and building segments for millions of files holds the GIL for
+long stretches, which shows up as stutter in timeline painting and playback
+when the scan runs in a thread of the GUI process. `ProcessScanner` runs the
+same scan in a child process instead. The child loads the previous scan from
+the cache itself and sends each camera back as the columnar index bytes of
+the days it rescanned, plus the dates of the days it reused, so only new
+data crosses the pipe.
+
+This module must not import Qt: the child process imports it on start.
+"""
+import multiprocessing
+import time as monotonic_time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from columnar_index import decode_camera_index, encode_camera_index
+from models import Camera, ScanDiff
+from services import CacheService, NASScannerService, ScanCancelled
+
+
+PROGRESS_INTERVAL_SECONDS = 0.1
+POLL_SECONDS = 0.1
+
+
+def _encode_camera(camera: Camera, reused: List[date]) -> tuple:
+    rescanned = Camera(
+        camera_id=camera.camera_id,
+        name=camera.name,
+        nas_path=camera.nas_path,
+        recording_days=[day for day in camera.recording_days if day.date not in reused],
+        scanned_at=camera.scanned_at
+    )
+    return (camera.camera_id, camera.name, camera.nas_path, camera.scanned_at,
+            [day.toordinal() for day in reused], encode_camera_index(rescanned))
+
+
+def _scan_child(conn, incremental: bool, cancel_event) -> None:
+    """Entry point of the scanner process."""
+    scanner = NASScannerService()
+    last_sent = 0.0
+    latest = None
+
+    def send_progress(progress):
+        nonlocal last_sent, latest
+        latest = progress
+        now = monotonic_time.monotonic()
+        if now - last_sent >= PROGRESS_INTERVAL_SECONDS:
+            last_sent = now
+            conn.send(('progress', progress))
+
+    try:
+        previous = scanner.cache_service.load_cache() if incremental else None
+        cameras = scanner.scan_cameras(previous, progress_callback=send_progress, cancel_event=cancel_event)
+        if latest is not None:
+            conn.send(('progress', latest))
+
+        previous_days = {id(day) for camera in previous or [] for day in camera.recording_days}
+        for camera in cameras:
+            reused = [day.date for day in camera.recording_days if id(day) in previous_days]
+            conn.send(('camera', _encode_camera(camera, reused)))
+        conn.send(('done', None))
+
+        # The parent waits for this before starting the next scan
+        if latest is None or not latest.stale_reason:
+            scanner.cache_service.save_cache(cameras)
+    except ScanCancelled:
+        conn.send(('cancelled', None))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+
+class ProcessScanner:
+    """Runs NAS scans in a child process, with the same `scan` interface as NASScannerService."""
+
+    def __init__(self, cache_service: Optional[CacheService] = None):
+        self.cache_service = cache_service or CacheService()
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+
+    def scan(self, previous: Optional[List[Camera]] = None, progress_callback=None,
+             cancel_event=None) -> Tuple[List[Camera], Optional[ScanDiff]]:
+        """Scan the NAS in a child process, blocking the calling thread until it is done.
+
+        The child saves the result to the cache after sending it back.
+        """
+        # The child reads the cache, so it must hold everything saved so far
+        if self._process is not None:
+            self._process.join()
+        self.cache_service.flush()
+
+        receiver, sender = self._context.Pipe(duplex=False)
+        child_cancel = self._context.Event()
+        self._process = self._context.Process(
+            target=_scan_child, args=(sender, previous is not None, child_cancel), daemon=True)
+        self._process.start()
+        sender.close()
+
+        previous_by_id = {camera.camera_id: camera for camera in previous or []}
+        cameras = []
+        try:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    child_cancel.set()
+                if not receiver.poll(POLL_SECONDS):
+                    continue
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    raise Exception("Scanner process exited unexpectedly")
+                if kind == 'progress':
+                    if progress_callback:
+                        progress_callback(payload)
+                elif kind == 'camera':
+                    cameras.append(self._decode_camera(payload, previous_by_id))
+                elif kind == 'done':
+                    break
+                elif kind == 'cancelled':
+                    raise ScanCancelled()
+                else:
+                    raise Exception(payload)
+        finally:
+            receiver.close()
+
+        diff = ScanDiff.between(previous, cameras) if previous is not None else None
+        return cameras, diff
+
+    def _decode_camera(self, payload: tuple, previous_by_id: Dict[str, Camera]) -> Camera:
+        """Rebuild a camera, taking the days the child reused from the previous scan."""
+        camera_id, name, nas_path, scanned_at, reused, data = payload
+        camera = decode_camera_index(data, camera_id, name, nas_path, scanned_at)
+        if not reused:
+            return camera
+
+        previous = previous_by_id.get(camera_id)
+        cached = None
+        for ordinal in reused:
+            day_date = date.fromordinal(ordinal)
+            day = previous.get_recording_day(day_date) if previous else None
+            if day is None:
+                # The cache the child read had a day the caller's cameras lack
+                if cached is None:
+                    cached = self.cache_service.load_camera(camera_id)
+                day = cached.get_recording_day(day_date) if cached else None
+            if day is not None:
+                camera.recording_days.append(day)
+        camera.recording_days.sort(key=lambda x: x.date, reverse=True)
+        return camera
@@ -0,0 +1,108 @@
+"""
+NAS scans on a worker thread, reported back through Qt signals.
+
+The scanner calls its progress callback on the worker thread after every
+folder. The worker passes on at most `max_progress_per_second` of those
+calls as signals; since the receivers live in the GUI thread, Qt queues
+every signal to its event loop, so the views are only touched from there.
+Scans can also run in a child process (see scan_process), reported the same way.
+Revalidations of a few hour folders (see refresh_scheduler) always run in
+this process, as they list too little to be worth a child process.
+"""
+import threading
+import time as monotonic_time
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from models import Camera, ScanProgress
+from scan_process import ProcessScanner
+from services import NASScannerService, ScanCancelled
+
+
+MAX_PROGRESS_PER_SECOND = 10
+
+
+class ScanWorker(QObject):
+    """Runs one NAS scan at a time in a background thread, with cooperative cancellation."""
+
+    # Signals (emitted from the scan thread, delivered in the receiver's thread)
+    progress = pyqtSignal(object)  # ScanProgress (a snapshot)
+    finished = pyqtSignal(object, object, object)  # List of cameras or None, ScanDiff or None, error or None
+    cancelled = pyqtSignal()
+
+    def __init__(self, scanner: NASScannerService, max_progress_per_second: int = MAX_PROGRESS_PER_SECOND,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.scanner = scanner
+        self._process_scanner: Optional[ProcessScanner] = None
+        self.min_progress_interval = 1.0 / max_progress_per_second
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._last_progress = 0.0
+        self._pending: Optional[ScanProgress] = None
+        self.last_progress: Optional[ScanProgress] = None  # Latest counters, uncoalesced
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, previous: Optional[List[Camera]] = None, out_of_process: bool = False,
+              folders: Optional[Dict[str, List[str]]] = None) -> bool:
+        """Start a scan (incremental against `previous`); False if one is already running.
+        
+        With `folders` (hour folder names by camera ID) only those folders
+        are listed again (see NASScannerService.revalidate).
+        """
+        if self.is_running:
+            return False
+        if out_of_process and folders is None:
+            if self._process_scanner is None:
+                self._process_scanner = ProcessScanner(self.scanner.cache_service)
+            scanner = self._process_scanner
+        else:
+            scanner = self.scanner
+        # A fresh event per scan, so cancelling never reaches a later scan
+        self._cancel = threading.Event()
+        self._last_progress = 0.0
+        self._pending = None
+        self.last_progress = None
+        self._thread = threading.Thread(target=self._run, args=(scanner, previous, folders, self._cancel),
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def cancel(self) -> None:
+        """Ask the running scan to stop at the next folder."""
+        self._cancel.set()
+
+    def _on_progress(self, progress: ScanProgress) -> None:
+        self.last_progress = progress
+        now = monotonic_time.monotonic()
+        if now - self._last_progress >= self.min_progress_interval:
+            self._last_progress = now
+            self._pending = None
+            self.progress.emit(replace(progress))
+        else:
+            self._pending = progress
+
+    def _run(self, scanner, previous: Optional[List[Camera]], folders: Optional[Dict[str, List[str]]],
+             cancel: threading.Event) -> None:
+        try:
+            if folders is not None:
+                cameras, diff = scanner.revalidate(previous, folders, progress_callback=self._on_progress,
+                                                   cancel_event=cancel)
+            else:
+                cameras, diff = scanner.scan(previous, progress_callback=self._on_progress, cancel_event=cancel)
+        except ScanCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.finished.emit(None, None, str(e))
+            return
+
+        # Report the final counters, which coalescing may have held back
+        if self._pending is not None:
+            self.progress.emit(replace(self._pending))
+        self.finished.emit(cameras, diff, None)
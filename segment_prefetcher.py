@@ -0,0 +1,157 @@
+"""
+Background prefetcher that copies upcoming video segments from the NAS to a local cache.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from typing import Iterable, Optional
+
+from models import VideoSegment
+
+
+class SegmentPrefetcher:
+    """Shared prefetcher copying segments to a bounded local cache directory.
+
+    Players ask for the segments they are about to need; a single worker thread
+    copies them in request order so that several players reading the NAS at
+    once do not compete for the same link. Copies are evicted least recently
+    used once `max_bytes` is exceeded.
+    """
+
+    _instance = None
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024,
+                 segments_ahead: int = 2):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "nas_camera_viewer_prefetch")
+        self.max_bytes = max_bytes
+        self.segments_ahead = segments_ahead  # How far ahead players ask for segments
+
+        self._lock = threading.Condition()
+        self._queue = deque()
+        self._queued = set()
+        self._ready: "OrderedDict[str, tuple]" = OrderedDict()  # NAS path -> (local path, bytes)
+        self._ready_bytes = 0
+        self._stopped = False
+        self._worker = None
+
+    @classmethod
+    def shared(cls) -> 'SegmentPrefetcher':
+        """Get the process-wide prefetcher instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def configure(self, max_bytes: int, segments_ahead: int) -> None:
+        """Apply a new cache budget and prefetch depth, evicting copies beyond the budget."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.segments_ahead = segments_ahead
+            self._evict()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of segments waiting to be copied."""
+        with self._lock:
+            return len(self._queue)
+
+    def request(self, segments: Iterable[VideoSegment]) -> None:
+        """Queue segments for prefetching, most urgent first."""
+        with self._lock:
+            for segment in segments:
+                path = segment.path
+                if path in self._ready or path in self._queued:
+                    continue
+                self._queue.append(path)
+                self._queued.add(path)
+            if self._queue:
+                self._ensure_worker()
+                self._lock.notify()
+
+    def local_path(self, segment: VideoSegment) -> Optional[str]:
+        """Get the local copy of a segment if it has already been prefetched."""
+        with self._lock:
+            entry = self._ready.get(segment.path)
+            if entry is None:
+                return None
+            self._ready.move_to_end(segment.path)
+            return entry[0]
+
+    def playback_path(self, segment: VideoSegment) -> str:
+        """Get the best path to play a segment from (local copy or NAS)."""
+        return self.local_path(segment) or segment.path
+
+    def stop(self) -> None:
+        """Stop the worker and discard pending requests."""
+        with self._lock:
+            self._stopped = True
+            self._queue.clear()
+            self._queued.clear()
+            self._lock.notify_all()
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Stop the worker and delete the cache directory with its copies (on exit)."""
+        self.stop()
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        with self._lock:
+            self._ready.clear()
+            self._ready_bytes = 0
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        """Worker loop copying queued segments."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        while True:
+            with self._lock:
+                while not self._queue and not self._stopped:
+                    self._lock.wait()
+                if self._stopped:
+                    return
+                path = self._queue.popleft()
+
+            local = self._copy(path)
+            size = os.path.getsize(local) if local is not None else 0
+
+            with self._lock:
+                self._queued.discard(path)
+                if local is not None:
+                    self._ready[path] = (local, size)
+                    self._ready_bytes += size
+                    self._evict()
+
+    def _copy(self, path: str) -> Optional[str]:
+        """Copy a single segment into the cache directory."""
+        name = hashlib.sha1(path.encode("utf-8")).hexdigest() + ".mp4"
+        local = os.path.join(self.cache_dir, name)
+        temp = local + ".part"
+        try:
+            shutil.copyfile(path, temp)
+            os.replace(temp, local)
+            return local
+        except OSError as e:
+            print(f"Error prefetching segment {path}: {e}")
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return None
+
+    def _evict(self) -> None:
+        """Drop least recently used copies until the cache fits its budget."""
+        while self._ready_bytes > self.max_bytes and len(self._ready) > 1:
+            _, (local, size) = self._ready.popitem(last=False)
+            self._ready_bytes -= size
+            try:
+                os.remove(local)
+            except OSError:
+                pass
@@ -3,13 +3,29 @@ Core services for the NAS Camera Viewer application.
 """
 import json
 import os
-import pickle
-from datetime import datetime, timedelta, date
+import shutil
+import struct
+import zlib
+from array import array
+from datetime import datetime, timedelta, date, time
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import Iterable, Iterator, List, Optional, Dict, Sequence, Tuple
 import re
 import threading
-from models import Settings, Camera, RecordingDay, VideoSegment
+import time as monotonic_time
+from columnar_index import IndexFormatError, read_camera_index, write_camera_index
+from filename_parser import parse_listing
+from nas_guard import NASGuard, NASUnavailable, is_not_found
+from models import (Settings, Camera, CameraSummary, RecordingDay, ScanDiff, ScanProgress, SegmentArrays,
+                    VideoSegment)
+from storage import LocalStorageBackend, get_backend
+from tracing import tracer
+
+
+SEGMENT_SECONDS = 60  # Assume 1-minute videos
+
+# An hour folder's video files: paths, starts in seconds from midnight and sizes
+HourFiles = Tuple[List[str], Sequence[int], Sequence[int]]
 
 
 class ConfigService:
@@ -68,57 +84,325 @@ class ConfigService:
         return self.save_settings()
 
 
+class CacheWriter:
+    """Writes the cache on a background thread, coalescing rapid updates.
+    
+    `submit` only records the latest camera list; the thread waits a moment
+    for further updates and then writes whichever list is newest, so a burst
+    of refreshes costs a single write.
+    """
+    
+    COALESCE_SECONDS = 2.0
+    
+    def __init__(self, cache_service: 'CacheService'):
+        self.cache_service = cache_service
+        self._pending: Optional[List[Camera]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flush = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def submit(self, cameras: List[Camera]) -> None:
+        """Schedule `cameras` to be written, replacing any write still pending."""
+        with self._lock:
+            self._pending = cameras
+            self._idle.clear()
+        self._wake.set()
+    
+    def discard(self) -> None:
+        """Drop a pending write (used when the cache is cleared)."""
+        with self._lock:
+            self._pending = None
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write any pending update now and wait for it; returns False on timeout."""
+        if self._idle.is_set():
+            return True
+        self._flush.set()
+        return self._idle.wait(timeout)
+    
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            # Give further updates a chance to replace this one (flush cuts this short)
+            self._flush.wait(self.COALESCE_SECONDS)
+            with self._lock:
+                self._flush.clear()
+                cameras, self._pending = self._pending, None
+            if cameras is not None:
+                self.cache_service.save_cache(cameras)
+            with self._lock:
+                if self._pending is None:
+                    self._idle.set()
+
+
 class CacheService:
-    """Service for caching NAS scan results locally."""
+    """Service for caching NAS scan results locally.
+    
+    The cache is a directory with one shard file per camera and a small
+    manifest listing the shards along with a summary of each camera (enough
+    to draw the dashboard). Shards use the memory-mapped columnar index
+    format (see columnar_index); the manifest holds a JSON metadata block
+    with a CRC32. Files are written to a temporary file, fsynced and
+    renamed, and shards are written before the manifest that refers to
+    them, so a crash leaves a consistent cache.
+    
+    Only shards whose camera changed are rewritten, under a new name so
+    that a shard still mapped by the running app is never overwritten. A
+    single camera can be loaded without reading the others.
+    """
+    
+    MAGIC = b'NASCACHE'
+    SCHEMA_VERSION = 3
+    HEADER = struct.Struct('<8sIIIQI')  # Magic, schema version, metadata length/CRC, data length/CRC
+    
+    _writer: Optional[CacheWriter] = None  # Shared, since every instance uses the same files
     
     def __init__(self):
-        self.cache_file = "nas_cache.pkl"
-        self.metadata_file = "cache_metadata.json"
+        self.cache_dir = "nas_cache"
+        self.manifest_file = os.path.join(self.cache_dir, "manifest.bin")
+        # Files of earlier cache formats; removed on the next save
+        self.legacy_files = ["nas_cache.bin", "nas_cache.pkl", "cache_metadata.json"]
+    
+    @property
+    def writer(self) -> CacheWriter:
+        if CacheService._writer is None:
+            CacheService._writer = CacheWriter(self)
+        return CacheService._writer
+    
+    def save_cache_async(self, cameras: List[Camera]) -> None:
+        """Save camera data in the background, coalescing with other pending saves."""
+        self.writer.submit(cameras)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for pending background saves to reach the disk."""
+        if CacheService._writer is None:
+            return True
+        return CacheService._writer.flush(timeout)
+    
+    @staticmethod
+    def shard_name(camera_id: str, fingerprint: int) -> str:
+        safe_id = re.sub(r'[^\w.-]', '_', camera_id)
+        return f"{safe_id}-{fingerprint:08x}.idx"
+    
+    @staticmethod
+    def fingerprint(camera: Camera) -> int:
+        """Cheap checksum of a camera's days, used to skip rewriting unchanged shards."""
+        parts = []
+        for day in camera.recording_days:
+            starts = day.segment_starts()
+            last = f"{starts[-1]}|{day.segment_sizes()[-1]}" if len(starts) else ""
+            parts.append(f"{day.date}|{len(starts)}|{last}|{day.is_settled}|{day.listed_hours}")
+        return zlib.crc32("\n".join(parts).encode('utf-8'))
     
     def save_cache(self, cameras: List[Camera]) -> bool:
-        """Save camera data to cache file."""
+        """Save camera data, rewriting only the shards of cameras that changed."""
+        with tracer.span("cache.save", "cache", cameras=len(cameras)):
+            return self._save_cache(cameras)
+    
+    def _save_cache(self, cameras: List[Camera]) -> bool:
         try:
-            with open(self.cache_file, 'wb') as f:
-                pickle.dump(cameras, f)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            previous = self._read_manifest_entries()
+            
+            entries = []
+            for camera in cameras:
+                fingerprint = self.fingerprint(camera)
+                shard = self.shard_name(camera.camera_id, fingerprint)
+                old = previous.get(camera.camera_id)
+                if (old is None or old['shard'] != shard
+                        or not os.path.exists(os.path.join(self.cache_dir, shard))):
+                    self._write_shard(os.path.join(self.cache_dir, shard), camera)
+                entry = CameraSummary.from_camera(camera).to_dict()
+                entry['shard'] = shard
+                entry['scanned_at'] = camera.scanned_at.isoformat() if camera.scanned_at else None
+                entries.append(entry)
             
-            # Save metadata
-            metadata = {
+            self._write_file(self.manifest_file, {
                 'timestamp': datetime.now().isoformat(),
                 'camera_count': len(cameras),
-                'total_days': sum(len(camera.recording_days) for camera in cameras)
-            }
-            with open(self.metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+                'total_days': sum(len(camera.recording_days) for camera in cameras),
+                'cameras': entries
+            })
             
+            # Shards of cameras that are gone are only removed once the manifest no longer lists them
+            live = {entry['shard'] for entry in entries} | {os.path.basename(self.manifest_file)}
+            for name in os.listdir(self.cache_dir):
+                if name not in live:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        # Still mapped on Windows; removed by a later save
+                        pass
+            
+            for legacy_file in self.legacy_files:
+                if os.path.exists(legacy_file):
+                    os.remove(legacy_file)
             return True
         except Exception as e:
             print(f"Error saving cache: {e}")
             return False
     
+    def _write_shard(self, path: str, camera: Camera) -> None:
+        """Atomically write a camera's columnar index."""
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                with tracer.span("cache.serialize", "cache", camera_id=camera.camera_id):
+                    write_camera_index(f, camera)
+                with tracer.span("cache.write", "cache", camera_id=camera.camera_id):
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self._fsync_directory(path)
+    
+    def _read_shard(self, entry: dict) -> Camera:
+        """Open a camera's shard from its manifest entry."""
+        scanned_at = entry.get('scanned_at')
+        with tracer.span("cache.load_shard", "cache", camera_id=entry['camera_id']):
+            return read_camera_index(
+                os.path.join(self.cache_dir, entry['shard']),
+                camera_id=entry['camera_id'],
+                name=entry['name'],
+                nas_path=entry['nas_path'],
+                scanned_at=datetime.fromisoformat(scanned_at) if scanned_at else None
+            )
+    
+    def _write_file(self, path: str, metadata: dict, data: bytes = b'') -> None:
+        """Atomically write a metadata block and payload with their CRCs."""
+        meta = json.dumps(metadata).encode('utf-8')
+        header = self.HEADER.pack(self.MAGIC, self.SCHEMA_VERSION,
+                                  len(meta), zlib.crc32(meta), len(data), zlib.crc32(data))
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(header)
+                f.write(meta)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self._fsync_directory(path)
+    
+    def _fsync_directory(self, path: str):
+        """Make a rename durable (not supported on Windows, where it is not needed)."""
+        if os.name == 'nt':
+            return
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+    
+    def _read_file(self, path: str, with_data: bool = True) -> Tuple[dict, bytes]:
+        """Read and check a file written by `_write_file`."""
+        with open(path, 'rb') as f:
+            raw = f.read(self.HEADER.size)
+            if len(raw) != self.HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, meta_len, meta_crc, data_len, data_crc = self.HEADER.unpack(raw)
+            if magic != self.MAGIC:
+                raise ValueError(f"{path} is not a cache file")
+            if version != self.SCHEMA_VERSION:
+                raise ValueError(f"{path} has unsupported schema version {version}")
+            meta = f.read(meta_len)
+            if len(meta) != meta_len or zlib.crc32(meta) != meta_crc:
+                raise ValueError(f"{path} metadata is corrupt")
+            data = b''
+            if with_data:
+                data = f.read(data_len)
+                if len(data) != data_len or zlib.crc32(data) != data_crc:
+                    raise ValueError(f"{path} data is corrupt")
+        return json.loads(meta.decode('utf-8')), data
+    
+    def _read_manifest(self) -> Optional[dict]:
+        if not os.path.exists(self.manifest_file):
+            return None
+        return self._read_file(self.manifest_file, with_data=False)[0]
+    
+    def _read_manifest_entries(self) -> Dict[str, dict]:
+        """Manifest entries by camera ID (empty if there is no readable manifest)."""
+        try:
+            manifest = self._read_manifest()
+        except Exception:
+            return {}
+        return {entry['camera_id']: entry for entry in manifest['cameras']} if manifest else {}
+    
+    def load_camera(self, camera_id: str) -> Optional[Camera]:
+        """Load a single camera's shard."""
+        try:
+            entry = self._read_manifest_entries().get(camera_id)
+            if entry is None:
+                return None
+            return self._read_shard(entry)
+        except Exception as e:
+            print(f"Error loading cached camera {camera_id}: {e}")
+            return None
+    
+    def iter_cache(self) -> Iterator[Camera]:
+        """Load cameras from their shards one at a time, in manifest order.
+        
+        A corrupt shard is skipped, so only that camera is scanned again.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            raise ValueError("no cache manifest")
+        for entry in manifest['cameras']:
+            try:
+                camera = self._read_shard(entry)
+            except (OSError, ValueError, IndexFormatError) as e:
+                print(f"Error loading cached camera {entry['camera_id']}: {e}")
+                continue
+            yield camera
+    
     def load_cache(self) -> Optional[List[Camera]]:
         """Load camera data from cache file."""
         try:
-            if not os.path.exists(self.cache_file):
+            if not os.path.exists(self.manifest_file):
                 return None
             
-            with open(self.cache_file, 'rb') as f:
-                cameras = pickle.load(f)
-            
-            return cameras
+            with tracer.span("cache.load", "cache"):
+                return list(self.iter_cache())
         except Exception as e:
             print(f"Error loading cache: {e}")
             return None
     
+    def load_summary(self) -> Optional[List[CameraSummary]]:
+        """Load the camera summaries stored in the manifest."""
+        try:
+            manifest = self._read_manifest()
+            if manifest is None:
+                return None
+            return [CameraSummary.from_dict(entry) for entry in manifest['cameras']]
+        except Exception as e:
+            print(f"Error loading cache summary: {e}")
+            return None
+    
     def is_cache_valid(self, max_age_hours: int = 24) -> bool:
         """Check if cache is valid based on age."""
         try:
-            if not os.path.exists(self.metadata_file):
+            manifest = self._read_manifest()
+            if manifest is None:
                 return False
             
-            with open(self.metadata_file, 'r') as f:
-                metadata = json.load(f)
-            
-            cache_time = datetime.fromisoformat(metadata['timestamp'])
+            cache_time = datetime.fromisoformat(manifest['timestamp'])
             age = datetime.now() - cache_time
             
             return age < timedelta(hours=max_age_hours)
@@ -129,97 +413,262 @@ class CacheService:
     def clear_cache(self) -> bool:
         """Clear cache files."""
         try:
-            if os.path.exists(self.cache_file):
-                os.remove(self.cache_file)
-            if os.path.exists(self.metadata_file):
-                os.remove(self.metadata_file)
+            if CacheService._writer is not None:
+                CacheService._writer.discard()
+            if os.path.isdir(self.cache_dir):
+                shutil.rmtree(self.cache_dir)
+            for path in self.legacy_files:
+                if os.path.exists(path):
+                    os.remove(path)
             return True
         except Exception as e:
             print(f"Error clearing cache: {e}")
             return False
 
 
+class ScanCancelled(Exception):
+    """Raised inside a scan when its cancel event is set."""
+
+
 class NASScannerService:
     """Service for scanning NAS and discovering camera recordings."""
     
     def __init__(self):
         self.config_service = ConfigService()
         self.cache_service = CacheService()
+        self.storage = LocalStorageBackend()  # Replaced by the configured backend when a scan starts
+        self.guard = NASGuard()
         self._scanning = False
-        self._scan_thread = None
         self._progress_callback = None
-        self._complete_callback = None
+        self._cancel_event: Optional[threading.Event] = None
+        self._progress = ScanProgress()
+        self._scan_started = 0.0
     
-    def scan_async(self, progress_callback=None, complete_callback=None) -> None:
-        """Start asynchronous scan of NAS."""
-        if self._scanning:
-            return
+    def scan(self, previous: Optional[List[Camera]] = None, progress_callback=None,
+             cancel_event: Optional[threading.Event] = None) -> Tuple[List[Camera], Optional[ScanDiff]]:
+        """Scan the NAS on the calling thread and save the result to the cache.
         
-        self._progress_callback = progress_callback
-        self._complete_callback = complete_callback
-        self._scanning = True
+        With `previous` cameras the scan is incremental: days that were
+        scanned after they ended and whose hour folders are unchanged are
+        reused as they are, and the returned ScanDiff is against `previous`
+        (None for a full scan). See `scan_cameras` for the other arguments.
+        """
+        cameras = self.scan_cameras(previous, progress_callback, cancel_event)
+        diff = ScanDiff.between(previous, cameras) if previous is not None else None
+        if not self._progress.stale_reason:
+            # A partial scan would drop what the NAS did not get to from the cache
+            self.cache_service.save_cache_async(cameras)
+        return cameras, diff
+    
+    def scan_cameras(self, previous: Optional[List[Camera]] = None, progress_callback=None,
+                     cancel_event: Optional[threading.Event] = None) -> List[Camera]:
+        """Scan the NAS on the calling thread, reusing settled days of `previous`.
+        
+        `progress_callback(progress)` is called after every folder with the
+        same ScanProgress object. Setting `cancel_event` stops the scan with
+        ScanCancelled.
         
-        self._scan_thread = threading.Thread(target=self._scan_worker)
-        self._scan_thread.daemon = True
-        self._scan_thread.start()
+        If the NAS stops answering part way, the cameras scanned so far are
+        returned together with the rest of `previous`, and the progress's
+        `stale_reason` says why.
+        """
+        self._start(progress_callback, cancel_event)
+        try:
+            with tracer.span("scan", "scan", incremental=previous is not None):
+                return self._scan_nas(previous)
+        finally:
+            self._finish()
     
-    def _scan_worker(self) -> None:
-        """Worker thread for scanning NAS."""
+    def revalidate(self, previous: List[Camera], folders: Dict[str, List[str]], progress_callback=None,
+                   cancel_event: Optional[threading.Event] = None) -> Tuple[List[Camera], ScanDiff]:
+        """List only `folders` (hour folder names by camera ID) again and merge them into `previous`.
+        
+        The refresh scheduler uses this for the hour folders cameras are
+        recording into, instead of a whole scan. Folders that do not exist
+        yet count as empty, and cameras not in `previous` are skipped. The
+        returned list holds new Camera objects only for cameras that changed,
+        and the cache is saved only if something did. See `scan_cameras`
+        for the other arguments.
+        """
+        self._start(progress_callback, cancel_event)
         try:
-            cameras = self._scan_nas()
-            self.cache_service.save_cache(cameras)
-            
-            if self._complete_callback:
-                self._complete_callback(cameras, None)
-        except Exception as e:
-            if self._complete_callback:
-                self._complete_callback(None, str(e))
+            with tracer.span("revalidate", "scan", cameras=len(folders),
+                             folders=sum(len(names) for names in folders.values())):
+                cameras = self._revalidate(previous, folders)
         finally:
-            self._scanning = False
+            self._finish()
+        diff = ScanDiff.between(previous, cameras)
+        if not diff.is_empty and not self._progress.stale_reason:
+            self.cache_service.save_cache_async(cameras)
+        return cameras, diff
+    
+    def _start(self, progress_callback, cancel_event: Optional[threading.Event]) -> None:
+        self._scanning = True
+        self._progress_callback = progress_callback
+        self._cancel_event = cancel_event
+        self._progress = ScanProgress()
+        self._scan_started = monotonic_time.monotonic()
+        self.guard.reset()
+    
+    def _finish(self) -> None:
+        self._scanning = False
+        self._progress_callback = None
+        self._cancel_event = None
+    
+    def _report(self, message: Optional[str] = None) -> None:
+        """Pass the scan's counters to the progress callback."""
+        if message is not None:
+            self._progress.message = message
+        self._progress.elapsed_seconds = monotonic_time.monotonic() - self._scan_started
+        if self._progress_callback:
+            self._progress_callback(self._progress)
     
-    def _scan_nas(self) -> List[Camera]:
-        """Scan NAS for camera recordings."""
+    def _check_cancelled(self) -> None:
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise ScanCancelled()
+    
+    def _scan_nas(self, previous: Optional[List[Camera]] = None) -> List[Camera]:
+        """Scan NAS for camera recordings, reusing settled days of `previous` cameras."""
         settings = self.config_service.settings
         cameras = []
         
-        if self._progress_callback:
-            self._progress_callback("Connecting to NAS...")
+        self._report("Connecting to NAS...")
         
+        self._use_backend(settings)
         nas_path = settings.full_nas_path
+        previous_by_id = {camera.camera_id: camera for camera in previous or []}
         
-        # Check if NAS path exists
-        if not os.path.exists(nas_path):
-            raise Exception(f"NAS path not accessible: {nas_path}")
+        try:
+            # Check if NAS path exists
+            if not self.guard.call(f"Opening {nas_path}", self.storage.exists, nas_path,
+                                   check_cancelled=self._check_cancelled):
+                raise Exception(f"NAS path not accessible: {nas_path}")
+            
+            self._report("Scanning camera folders...")
+            
+            # Scan for camera folders
+            try:
+                camera_folders = self.guard.call(f"Listing {nas_path}", self.storage.list_dirs, nas_path,
+                                                 check_cancelled=self._check_cancelled)
+            except (ScanCancelled, NASUnavailable):
+                raise
+            except Exception as e:
+                raise Exception(f"Unable to list camera folders: {e}")
+            
+            self._progress.cameras_total = len(camera_folders)
+            
+            for i, camera_id in enumerate(camera_folders):
+                self._check_cancelled()
+                self._report(f"Scanning camera {camera_id} ({i+1}/{len(camera_folders)})...")
+                
+                camera_path = os.path.join(nas_path, camera_id)
+                with tracer.span("camera", "scan", camera_id=camera_id):
+                    camera = self._scan_camera(camera_id, camera_path, previous_by_id.get(camera_id))
+                if camera.has_recordings:
+                    cameras.append(camera)
+                self._progress.cameras_done += 1
+        except NASUnavailable as e:
+            if previous is None and not cameras:
+                raise Exception(str(e))
+            return self._partial_result(cameras, previous or [], str(e))
         
-        if self._progress_callback:
-            self._progress_callback("Scanning camera folders...")
+        return cameras
+    
+    def _use_backend(self, settings: Settings) -> None:
+        self.storage = get_backend(settings)
+        self.guard.set_threads(settings.scan_concurrency or self.storage.listings_in_flight)
+    
+    def _revalidate(self, previous: List[Camera], folders: Dict[str, List[str]]) -> List[Camera]:
+        """`previous` with the days holding `folders` rebuilt from fresh listings of those folders."""
+        settings = self.config_service.settings
+        self._use_backend(settings)
+        nas_path = settings.full_nas_path
+        cameras = list(previous)
+        index_by_id = {camera.camera_id: i for i, camera in enumerate(cameras)}
+        paths = {os.path.join(nas_path, camera_id, name): (camera_id, name)
+                 for camera_id, names in folders.items() if camera_id in index_by_id
+                 for name in names if self._is_date_folder(name)}
+        self._progress.cameras_total = len({camera_id for camera_id, _ in paths.values()})
+        self._report(f"Checking {self._progress.cameras_total} cameras for new recordings...")
         
-        # Scan for camera folders
+        # Camera ID -> date -> hour -> segments (an empty list for an hour folder without any)
+        listed: Dict[str, Dict[date, Dict[int, List[VideoSegment]]]] = {}
         try:
-            camera_folders = [f for f in os.listdir(nas_path) 
-                            if os.path.isdir(os.path.join(nas_path, f))]
-        except Exception as e:
-            raise Exception(f"Unable to list camera folders: {e}")
+            for folder_path, files, error in self.guard.map("Listing", self._list_hour_folder, list(paths),
+                                                              check_cancelled=self._check_cancelled):
+                self._check_cancelled()
+                if is_not_found(error):
+                    continue  # No recordings in that hour yet
+                if error is not None:
+                    print(f"Error scanning folder {folder_path}: {error}")
+                    continue
+                camera_id, name = paths[folder_path]
+                target_date, hour = self._parse_date(name[:8]), int(name[8:10])
+                segments = self._scan_date_folder(folder_path, files, None, target_date, hour)
+                listed.setdefault(camera_id, {}).setdefault(target_date, {})[hour] = segments
+                self._progress.folders_scanned += 1
+                self._progress.files_scanned += len(segments)
+                self._report()
+        except NASUnavailable as e:
+            # Merge the folders listed before the NAS stopped answering; the others stay as they were
+            print(f"Revalidation stopped early: {e}")
+            self._progress.stale_reason = str(e)
         
-        for i, camera_id in enumerate(camera_folders):
-            if self._progress_callback:
-                self._progress_callback(f"Scanning camera {camera_id} ({i+1}/{len(camera_folders)})...")
-            
-            camera_path = os.path.join(nas_path, camera_id)
-            camera = self._scan_camera(camera_id, camera_path)
-            if camera.has_recordings:
-                cameras.append(camera)
+        for camera_id, days in listed.items():
+            camera = cameras[index_by_id[camera_id]]
+            recording_days = list(camera.recording_days)
+            changed = False
+            for day_date, hours in days.items():
+                old_day = camera.get_recording_day(day_date)
+                old_segments = list(old_day.video_segments) if old_day else []
+                old_hours = old_day.listed_hours if old_day else 0
+                listed_hours = old_hours | self._hour_mask(hours)
+                segments = [segment for segment in old_segments if segment.start_time.hour not in hours]
+                for hour_segments in hours.values():
+                    segments.extend(hour_segments)
+                segments.sort(key=lambda segment: segment.start_time)
+                if (listed_hours == old_hours
+                        and [segment.path for segment in segments] == [segment.path for segment in old_segments]):
+                    continue
+                changed = True
+                recording_days = [day for day in recording_days if day.date != day_date]
+                if segments:
+                    recording_days.append(RecordingDay(date=day_date, video_segments=segments,
+                                                       scanned_at=old_day.scanned_at if old_day else None,
+                                                       listed_hours=listed_hours))
+            if changed:
+                # A new object, so ScanDiff.between sees the replaced days; the rest are shared
+                cameras[index_by_id[camera_id]] = Camera(camera_id=camera.camera_id, name=camera.name,
+                                                         nas_path=camera.nas_path, recording_days=recording_days,
+                                                         scanned_at=camera.scanned_at)
         
+        if self._progress.stale_reason:
+            self._progress.cameras_done = len(listed)
+            self._report(f"Checked {len(listed)} of {self._progress.cameras_total} cameras;")
+        else:
+            self._progress.cameras_done = self._progress.cameras_total
         return cameras
     
-    def _scan_camera(self, camera_id: str, camera_path: str) -> Camera:
-        """Scan a single camera folder for recordings."""
+    def _partial_result(self, cameras: List[Camera], previous: List[Camera], reason: str) -> List[Camera]:
+        """The cameras scanned before the NAS stopped answering, plus the previous scan of the others."""
+        print(f"Scan stopped early: {reason}")
+        scanned = {camera.camera_id for camera in cameras}
+        result = cameras + [camera for camera in previous if camera.camera_id not in scanned]
+        self._progress.stale_reason = reason
+        self._report(f"Scanned {len(cameras)} of {self._progress.cameras_total} cameras;")
+        return result
+    
+    def _scan_camera(self, camera_id: str, camera_path: str, previous: Optional[Camera] = None) -> Camera:
+        """Scan a single camera folder for recordings, reusing settled days of `previous`."""
         recording_days = []
+        scanned_at = datetime.now()
+        previous_days = {day.date: day for day in previous.recording_days} if previous else {}
         
         try:
             # Get all date folders in camera directory
-            date_folders = [f for f in os.listdir(camera_path) 
-                          if os.path.isdir(os.path.join(camera_path, f)) and self._is_date_folder(f)]
+            date_folders = [f for f in self.guard.call(f"Listing {camera_path}", self.storage.list_dirs, camera_path,
+                                                       check_cancelled=self._check_cancelled)
+                            if self._is_date_folder(f)]
             
             # Group folders by date (handle multiple folders per day)
             date_groups = self._group_folders_by_date(date_folders)
@@ -227,23 +676,51 @@ class NASScannerService:
             for date_str, folders in date_groups.items():
                 try:
                     target_date = self._parse_date(date_str)
-                    video_segments = []
                     
-                    # Scan all folders for this date
-                    for folder in folders:
-                        folder_path = os.path.join(camera_path, folder)
-                        hour = int(folder[8:10])
-                        segments = self._scan_date_folder(folder_path, target_date, hour)
-                        video_segments.extend(segments)
+                    previous_day = previous_days.get(target_date)
+                    if previous_day and self._is_day_settled(previous_day, folders):
+                        recording_days.append(previous_day)
+                        self._progress.days_reused += 1
+                        continue
+                    
+                    # Kept as the columns the listings give; segments are only built for days looked at
+                    video_segments = SegmentArrays(target_date)
+                    listed_hours = []
+                    
+                    # Scan all folders for this date, with as many listings in flight as the backend allows
+                    folder_paths = [os.path.join(camera_path, folder) for folder in folders]
+                    with tracer.span("day", "scan", date=date_str, folders=len(folders)):
+                        listings = self.guard.map("Listing", self._list_hour_folder, folder_paths,
+                                                  check_cancelled=self._check_cancelled)
+                        for folder, (folder_path, files, error) in zip(folders, listings):
+                            self._check_cancelled()
+                            hour = int(folder[8:10])
+                            with tracer.span("folder", "scan", folder=folder):
+                                files = self._hour_files(folder_path, files, error, hour)
+                                if files is not None:
+                                    video_segments.extend(*files, SEGMENT_SECONDS)
+                            if error is None:
+                                listed_hours.append(hour)
+                            self._progress.folders_scanned += 1
+                            self._progress.files_scanned += len(files[0]) if files is not None else 0
+                            tracer.counter("scan.progress", folders=self._progress.folders_scanned,
+                                           files=self._progress.files_scanned)
+                            self._report()
 
                     if video_segments:
-                        recording_day = RecordingDay(date=target_date, video_segments=video_segments)
+                        recording_day = RecordingDay(date=target_date, video_segments=video_segments,
+                                                     scanned_at=scanned_at,
+                                                     listed_hours=self._hour_mask(listed_hours))
                         recording_days.append(recording_day)
 
+                except (ScanCancelled, NASUnavailable):
+                    raise
                 except Exception as e:
                     print(f"Error scanning date folder {date_str}: {e}")
                     continue
         
+        except (ScanCancelled, NASUnavailable):
+            raise
         except Exception as e:
             print(f"Error scanning camera {camera_id}: {e}")
         
@@ -251,38 +728,85 @@ class NASScannerService:
             camera_id=camera_id,
             name=camera_id,  # Use camera_id as display name for now
             nas_path=camera_path,
-            recording_days=recording_days
+            recording_days=recording_days,
+            scanned_at=scanned_at
         )
     
-    def _scan_date_folder(self, folder_path: str, target_date: date, hour: int) -> List[VideoSegment]:
-        """Scan a date folder for video files."""
-        video_segments = []
+    def _is_day_settled(self, day: RecordingDay, folders: List[str]) -> bool:
+        """Check if a previously scanned day can be reused without listing its folders again.
         
-        try:
-            video_files = [f for f in os.listdir(folder_path) 
-                          if f.lower().endswith('.mp4')]
-            
-            for video_file in video_files:
-                try:
-                    video_path = os.path.join(folder_path, video_file)
-                    start_time = self._parse_video_filename(video_file, target_date, hour)
-                    
-                    if start_time:
-                        segment = VideoSegment(
-                            path=video_path,
-                            start_time=start_time,
-                            duration=60  # Assume 1-minute videos
-                        )
-                        video_segments.append(segment)
-                
-                except Exception as e:
-                    print(f"Error parsing video file {video_file}: {e}")
-                    continue
+        A day is reused once it is settled (scanned after it ended) and the
+        hour folders on the NAS are still the ones that scan listed. Retention
+        deleting an hour folder, or a late folder appearing, makes the day
+        rescan. Days cached before the listed folders were kept fall back to
+        comparing with the hours that have recordings.
+        """
+        if not day.is_settled:
+            return False
+        hours = self._hour_mask(int(folder[8:10]) for folder in folders)
+        if day.listed_hours:
+            return hours == day.listed_hours
+        return hours == self._hour_mask(day.recording_hours)
+    
+    @staticmethod
+    def _hour_mask(hours: Iterable[int]) -> int:
+        """A bit per hour (see RecordingDay.listed_hours), ignoring folders numbered past 23."""
+        mask = 0
+        for hour in hours:
+            if hour <= 23:
+                mask |= 1 << hour
+        return mask
+    
+    def _list_hour_folder(self, folder_path: str) -> HourFiles:
+        """List an hour folder and stat its video files: their paths, starts (seconds from midnight) and sizes.
         
-        except Exception as e:
-            print(f"Error scanning folder {folder_path}: {e}")
+        Runs on a guard thread (see NASGuard.map), so the stats share the
+        listing's deadline; a stat stuck on a stalled NAS cannot block the scan.
+        The whole listing is parsed at once.
+        """
+        entries = self.storage.scandir(folder_path)
+        listing = parse_listing(list(entries), int(os.path.basename(folder_path)[8:10]))
+        paths = [entries[name].path for name in listing.names]
+        sizes = array('Q', (self._entry_size(entries[name]) for name in listing.names))
+        return paths, listing.starts, sizes
+    
+    def _hour_files(self, folder_path: str, files: Optional[HourFiles], error: Optional[Exception],
+                    hour: int) -> Optional[HourFiles]:
+        """The files of a date folder's listing, or None (reported) if it failed or is out of range.
         
-        return video_segments
+        `files` (see `_list_hour_folder`) or `error` is what listing the
+        folder through the guard returned.
+        """
+        if hour > 23:
+            print(f"Error scanning folder {folder_path}: hour {hour} out of range")
+            return None
+        if error is not None:
+            print(f"Error scanning folder {folder_path}: {error}")
+            return None
+        return files
+    
+    def _scan_date_folder(self, folder_path: str, files: Optional[HourFiles], error: Optional[Exception],
+                          target_date: date, hour: int) -> List[VideoSegment]:
+        """Build the video segments of a date folder (see `_hour_files`)."""
+        files = self._hour_files(folder_path, files, error, hour)
+        if files is None:
+            return []
+        midnight = datetime.combine(target_date, time())
+        return [VideoSegment(path=path, start_time=midnight + timedelta(seconds=start),
+                             duration=SEGMENT_SECONDS, size=size)
+                for path, start, size in zip(*files)]
+    
+    def _entry_size(self, entry: os.DirEntry) -> int:
+        """File size from a directory entry.
+        
+        On Windows, on SMB mounts that cache attributes from the listing and
+        with the SMB backend, the size comes with the directory enumeration,
+        so no file is opened.
+        """
+        try:
+            return entry.stat().st_size
+        except OSError:
+            return 0
     
     def _is_date_folder(self, folder_name: str) -> bool:
         """Check if folder name represents a date (YYYYMMDDHH format)."""
@@ -306,25 +830,6 @@ class NASScannerService:
         day = int(date_str[6:8])
         return date(year, month, day)
     
-    def _parse_video_filename(self, filename: str, target_date: date, hour: int) -> Optional[datetime]:
-        """Parse video filename to extract start time from filename components."""
-        # Expected format: 00M03S_1756195203.mp4
-        from datetime import time
-        match = re.match(r'(\d{2})M(\d{2})S_.*', filename)
-        if not match:
-            return None
-        
-        try:
-            minute = int(match.group(1))
-            second = int(match.group(2))
-            
-            # Construct datetime from folder/file parts
-            return datetime.combine(target_date, time(hour=hour, minute=minute, second=second))
-                
-        except ValueError as e:
-            print(f"Error parsing time from filename {filename}: {e}")
-            return None
-    
     @property
     def is_scanning(self) -> bool:
         """Check if scan is currently in progress."""
@@ -335,3 +840,35 @@ class NASScannerService:
         if self.cache_service.is_cache_valid(self.config_service.settings.cache_max_age_hours):
             return self.cache_service.load_cache()
         return None
+    
+    def get_cached_summary(self) -> Optional[List[CameraSummary]]:
+        """Get camera summaries from cache if available, however old (see `is_cache_fresh`)."""
+        return self.cache_service.load_summary()
+    
+    def is_cache_fresh(self) -> bool:
+        """Whether the cache is recent enough to be used without revalidating it."""
+        return self.cache_service.is_cache_valid(self.config_service.settings.cache_max_age_hours)
+    
+    def load_cached_async(self, camera_callback=None, complete_callback=None) -> None:
+        """Load the cached cameras in a background thread.
+        
+        `camera_callback(camera)` is called as each camera is loaded, then
+        `complete_callback(cameras, error)` once the whole cache is read.
+        """
+        def worker():
+            cameras = []
+            try:
+                for camera in self.cache_service.iter_cache():
+                    cameras.append(camera)
+                    if camera_callback:
+                        camera_callback(camera)
+                if complete_callback:
+                    complete_callback(cameras, None)
+            except Exception as e:
+                print(f"Error loading cache: {e}")
+                if complete_callback:
+                    complete_callback(None, str(e))
+        
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
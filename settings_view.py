@@ -5,11 +5,14 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QCo
                             QLabel, QLineEdit, QPushButton, QSpinBox, 
                             QCheckBox, QGroupBox, QFrame, QMessageBox,
                             QProgressBar, QTextEdit)
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 from typing import Optional
+import threading
 
 from services import ConfigService, NASScannerService
+from storage import BACKENDS
+from nas_benchmark import BenchmarkCancelled, Recommendations, run_benchmark
 
 
 class SettingsView(QWidget):
@@ -19,6 +22,10 @@ class SettingsView(QWidget):
     settings_saved = pyqtSignal()
     back_to_dashboard = pyqtSignal()
     
+    # Emitted from the connection test thread
+    test_line = pyqtSignal(str)
+    test_finished = pyqtSignal(object, object)  # BenchmarkResult or None, error message or None
+    
     def __init__(self):
         super().__init__()
         
@@ -28,9 +35,14 @@ class SettingsView(QWidget):
         
         # UI state
         self.testing_connection = False
+        self._test_cancel: Optional[threading.Event] = None
+        self.recommendations: Optional[Recommendations] = None
         
         self.setup_ui()
         self.load_settings()
+        
+        self.test_line.connect(self.on_test_line)
+        self.test_finished.connect(self.on_test_finished)
     
     def setup_ui(self):
         """Setup the settings UI."""
@@ -50,6 +62,9 @@ class SettingsView(QWidget):
         # Application Settings
         self.create_app_settings_section(layout)
         
+        # Performance
+        self.create_performance_section(layout)
+        
         # Connection Test
         self.create_connection_test_section(layout)
         
@@ -123,6 +138,16 @@ class SettingsView(QWidget):
         self.password_edit.setPlaceholderText("Optional")
         grid_layout.addWidget(self.password_edit, 4, 1)
         
+        # Storage backend
+        grid_layout.addWidget(QLabel("Access NAS via:"), 5, 0)
+        self.storage_backend_combobox = QComboBox()
+        for key, label in BACKENDS.items():
+            self.storage_backend_combobox.addItem(label, key)
+        self.storage_backend_combobox.setToolTip(
+            "The built-in SMB client logs in with the username and password above, so the share\n"
+            "does not need to be mapped. It needs the smbprotocol package (pip install smbprotocol).")
+        grid_layout.addWidget(self.storage_backend_combobox, 5, 1)
+        
         layout.addWidget(nas_group)
     
     def create_cache_config_section(self, layout: QVBoxLayout):
@@ -142,6 +167,8 @@ class SettingsView(QWidget):
         self.cache_max_age_spinbox = QSpinBox()
         self.cache_max_age_spinbox.setRange(1, 168)  # 1 hour to 1 week
         self.cache_max_age_spinbox.setValue(24)
+        self.cache_max_age_spinbox.setToolTip(
+            "Older caches are still shown at startup while the NAS is checked for changes")
 
         grid_layout.addWidget(self.cache_max_age_spinbox, 1, 1)
         
@@ -161,6 +188,9 @@ class SettingsView(QWidget):
         self.auto_refresh_spinbox.setRange(0, 1440)  # 0 (disabled) to 24 hours
         self.auto_refresh_spinbox.setValue(30)
         self.auto_refresh_spinbox.setSpecialValueText("Disabled")
+        self.auto_refresh_spinbox.setToolTip(
+            "How often every camera is checked. Cameras that are recording are checked for new\n"
+            "files in between, about as often as they write them.")
 
         grid_layout.addWidget(self.auto_refresh_spinbox, 0, 1)
 
@@ -170,9 +200,53 @@ class SettingsView(QWidget):
         self.theme_combobox.addItem("Light", "light")
         self.theme_combobox.addItem("Dark", "dark")
         grid_layout.addWidget(self.theme_combobox, 1, 1)
+
+        # Activity analysis
+        self.activity_analysis_checkbox = QCheckBox("Analyze recordings for activity in the background")
+        grid_layout.addWidget(self.activity_analysis_checkbox, 2, 0, 1, 2)
+
+        # Scanner process
+        self.scan_process_checkbox = QCheckBox("Scan the NAS in a separate process")
+        self.scan_process_checkbox.setToolTip(
+            "Keeps playback and the timeline smooth while very large folders are scanned,\n"
+            "at the cost of starting a helper process for each scan.")
+        grid_layout.addWidget(self.scan_process_checkbox, 3, 0, 1, 2)
         
         layout.addWidget(app_group)
     
+    def create_performance_section(self, layout: QVBoxLayout):
+        """Create the performance tuning section (the connection test can fill it in)."""
+        performance_group = QGroupBox("Performance")
+        
+        grid_layout = QGridLayout(performance_group)
+        grid_layout.setSpacing(10)
+        grid_layout.setContentsMargins(15, 20, 15, 15)
+        
+        # Scan concurrency
+        grid_layout.addWidget(QLabel("Folder listings in flight while scanning:"), 0, 0)
+        self.scan_concurrency_spinbox = QSpinBox()
+        self.scan_concurrency_spinbox.setRange(0, 32)
+        self.scan_concurrency_spinbox.setSpecialValueText("Automatic")
+        self.scan_concurrency_spinbox.setToolTip(
+            "Automatic lists one folder at a time through the operating system and 8 through the built-in SMB client")
+        grid_layout.addWidget(self.scan_concurrency_spinbox, 0, 1)
+        
+        # Prefetch depth
+        grid_layout.addWidget(QLabel("Segments prefetched ahead in the grid:"), 1, 0)
+        self.prefetch_segments_spinbox = QSpinBox()
+        self.prefetch_segments_spinbox.setRange(0, 6)
+        self.prefetch_segments_spinbox.setSpecialValueText("Off")
+        grid_layout.addWidget(self.prefetch_segments_spinbox, 1, 1)
+        
+        # Prefetch cache budget
+        grid_layout.addWidget(QLabel("Prefetch cache (MB):"), 2, 0)
+        self.prefetch_cache_spinbox = QSpinBox()
+        self.prefetch_cache_spinbox.setRange(64, 16384)
+        self.prefetch_cache_spinbox.setSingleStep(64)
+        grid_layout.addWidget(self.prefetch_cache_spinbox, 2, 1)
+        
+        layout.addWidget(performance_group)
+    
     def create_connection_test_section(self, layout: QVBoxLayout):
         """Create connection test section."""
         test_group = QGroupBox("Test Connection")
@@ -187,6 +261,12 @@ class SettingsView(QWidget):
         self.test_button.setObjectName("testButton")
         self.test_button.clicked.connect(self.test_connection)
         button_layout.addWidget(self.test_button)
+        
+        # Apply recommendations button (shown once a test has measured the NAS)
+        self.apply_recommendations_button = QPushButton("Apply Recommendations")
+        self.apply_recommendations_button.clicked.connect(self.apply_recommendations)
+        self.apply_recommendations_button.hide()
+        button_layout.addWidget(self.apply_recommendations_button)
         button_layout.addStretch()
         
         test_layout.addLayout(button_layout)
@@ -199,7 +279,7 @@ class SettingsView(QWidget):
         
         # Test results
         self.test_results = QTextEdit()
-        self.test_results.setMaximumHeight(100)
+        self.test_results.setMaximumHeight(180)
         self.test_results.setReadOnly(True)
         self.test_results.hide()
         test_layout.addWidget(self.test_results)
@@ -241,11 +321,19 @@ class SettingsView(QWidget):
         self.camera_folder_edit.setText(settings.camera_default_folder)
         self.username_edit.setText(settings.username)
         self.password_edit.setText(settings.password)
+        index = self.storage_backend_combobox.findData(settings.storage_backend)
+        self.storage_backend_combobox.setCurrentIndex(max(0, index))
         
         self.cache_enabled_checkbox.setChecked(settings.cache_enabled)
         self.cache_max_age_spinbox.setValue(settings.cache_max_age_hours)
         
         self.auto_refresh_spinbox.setValue(settings.auto_refresh_interval_minutes)
+        self.activity_analysis_checkbox.setChecked(settings.activity_analysis_enabled)
+        self.scan_process_checkbox.setChecked(settings.scan_in_separate_process)
+        
+        self.scan_concurrency_spinbox.setValue(settings.scan_concurrency)
+        self.prefetch_segments_spinbox.setValue(settings.prefetch_segments)
+        self.prefetch_cache_spinbox.setValue(settings.prefetch_cache_mb)
 
         # Set theme combobox
         index = self.theme_combobox.findData(settings.theme)
@@ -271,9 +359,15 @@ class SettingsView(QWidget):
                 camera_default_folder=self.camera_folder_edit.text().strip(),
                 username=self.username_edit.text().strip(),
                 password=self.password_edit.text(),
+                storage_backend=self.storage_backend_combobox.currentData(),
                 cache_enabled=self.cache_enabled_checkbox.isChecked(),
                 cache_max_age_hours=self.cache_max_age_spinbox.value(),
                 auto_refresh_interval_minutes=self.auto_refresh_spinbox.value(),
+                activity_analysis_enabled=self.activity_analysis_checkbox.isChecked(),
+                scan_in_separate_process=self.scan_process_checkbox.isChecked(),
+                scan_concurrency=self.scan_concurrency_spinbox.value(),
+                prefetch_segments=self.prefetch_segments_spinbox.value(),
+                prefetch_cache_mb=self.prefetch_cache_spinbox.value(),
                 theme=self.theme_combobox.currentData()
             )
             
@@ -304,26 +398,37 @@ class SettingsView(QWidget):
             self.camera_folder_edit.setText(default_settings.camera_default_folder)
             self.username_edit.setText(default_settings.username)
             self.password_edit.setText(default_settings.password)
+            self.storage_backend_combobox.setCurrentIndex(
+                max(0, self.storage_backend_combobox.findData(default_settings.storage_backend)))
             
             self.cache_enabled_checkbox.setChecked(default_settings.cache_enabled)
             self.cache_max_age_spinbox.setValue(default_settings.cache_max_age_hours)
             
             self.auto_refresh_spinbox.setValue(default_settings.auto_refresh_interval_minutes)
+            self.activity_analysis_checkbox.setChecked(default_settings.activity_analysis_enabled)
+            self.scan_process_checkbox.setChecked(default_settings.scan_in_separate_process)
+            self.scan_concurrency_spinbox.setValue(default_settings.scan_concurrency)
+            self.prefetch_segments_spinbox.setValue(default_settings.prefetch_segments)
+            self.prefetch_cache_spinbox.setValue(default_settings.prefetch_cache_mb)
             index = self.theme_combobox.findData(default_settings.theme)
             if index != -1:
                 self.theme_combobox.setCurrentIndex(index)
     
     def test_connection(self):
-        """Test the NAS connection with current settings."""
+        """Test and benchmark the NAS with the current form values, or cancel a running test."""
         if self.testing_connection:
+            self._test_cancel.set()
+            self.test_button.setEnabled(False)
             return
         
         self.testing_connection = True
-        self.test_button.setEnabled(False)
+        self._test_cancel = threading.Event()
+        self.recommendations = None
+        self.test_button.setText("Cancel Test")
+        self.apply_recommendations_button.hide()
         self.test_progress.show()
         self.test_results.show()
         self.test_results.clear()
-        self.test_results.append("Testing NAS connection...")
         
         # Create a temporary settings object
         from models import Settings
@@ -332,63 +437,70 @@ class SettingsView(QWidget):
             shared_folder=self.shared_folder_edit.text().strip(),
             camera_default_folder=self.camera_folder_edit.text().strip(),
             username=self.username_edit.text().strip(),
-            password=self.password_edit.text()
+            password=self.password_edit.text(),
+            storage_backend=self.storage_backend_combobox.currentData()
         )
+        self.test_results.append(f"Testing path: {test_settings.full_nas_path}")
         
-        # Test the connection (simplified version)
-        QTimer.singleShot(100, lambda: self.perform_connection_test(test_settings))
+        thread = threading.Thread(target=self.perform_connection_test, args=(test_settings, self._test_cancel),
+                                  name="connection-test", daemon=True)
+        thread.start()
     
-    def perform_connection_test(self, test_settings):
-        """Perform the actual connection test."""
+    def perform_connection_test(self, test_settings, cancel_event: threading.Event):
+        """Run the benchmark (on the test thread), reporting through signals."""
         try:
-            import os
-            
-            # Test basic path accessibility
-            full_path = test_settings.full_nas_path
-            self.test_results.append(f"Testing path: {full_path}")
-            
-            if os.path.exists(full_path):
-                self.test_results.append("✓ Path is accessible")
-                
-                # Try to list contents
-                try:
-                    contents = os.listdir(full_path)
-                    self.test_results.append(f"✓ Found {len(contents)} items in directory")
-                    
-                    # Look for camera folders
-                    camera_folders = [f for f in contents if os.path.isdir(os.path.join(full_path, f))]
-                    if camera_folders:
-                        self.test_results.append(f"✓ Found {len(camera_folders)} potential camera folders:")
-                        for folder in camera_folders[:5]:  # Show first 5
-                            self.test_results.append(f"  - {folder}")
-                        if len(camera_folders) > 5:
-                            self.test_results.append(f"  ... and {len(camera_folders) - 5} more")
-                    else:
-                        self.test_results.append("⚠ No camera folders found")
-                    
-                    self.test_results.append("✓ Connection test successful!")
-                    
-                except PermissionError:
-                    self.test_results.append("✗ Access denied - check credentials")
-                except Exception as e:
-                    self.test_results.append(f"✗ Error listing directory: {str(e)}")
-            else:
-                self.test_results.append("✗ Path is not accessible")
+            result = run_benchmark(test_settings, self.test_line.emit, cancel_event)
+            self.test_finished.emit(result, None)
+        except BenchmarkCancelled:
+            self.test_finished.emit(None, "Connection test cancelled")
+        except PermissionError:
+            self.test_finished.emit(None, "Access denied - check credentials")
+        except Exception as e:
+            self.test_finished.emit(None, f"Connection test failed: {str(e)}")
+    
+    def on_test_line(self, line: str):
+        self.test_results.append(line)
+    
+    def on_test_finished(self, result, error: Optional[str]):
+        """Show the outcome of a connection test and what it recommends."""
+        self.testing_connection = False
+        self.test_button.setText("Test NAS Connection")
+        self.test_button.setEnabled(True)
+        self.test_progress.hide()
+        
+        if error is not None:
+            self.test_results.append(f"✗ {error}")
+            if not self._test_cancel.is_set():
                 self.test_results.append("  Check that:")
                 self.test_results.append("  - NAS is powered on and connected")
                 self.test_results.append("  - Network path is correct")
                 self.test_results.append("  - Shared folder exists")
                 self.test_results.append("  - Credentials are correct (if required)")
-        
-        except Exception as e:
-            self.test_results.append(f"✗ Connection test failed: {str(e)}")
-        
-        finally:
-            self.testing_connection = False
-            self.test_button.setEnabled(True)
-            self.test_progress.hide()
-            
-            # Scroll to bottom
-            self.test_results.verticalScrollBar().setValue(
-                self.test_results.verticalScrollBar().maximum()
-            )
+        else:
+            self.test_results.append("✓ Connection test successful!")
+            if result.listing_ms:
+                self.recommendations = result.recommend()
+                self.test_results.append("Recommendations:")
+                for reason in self.recommendations.reasons:
+                    self.test_results.append(f"  - {reason}")
+                self.apply_recommendations_button.show()
+        
+        # Scroll to bottom
+        self.test_results.verticalScrollBar().setValue(
+            self.test_results.verticalScrollBar().maximum()
+        )
+    
+    def apply_recommendations(self):
+        """Save the settings the last connection test recommended."""
+        if self.recommendations is None:
+            return
+        values = self.recommendations.to_settings()
+        if not self.config_service.update_settings(**values):
+            QMessageBox.warning(self, "Save Error", "Failed to save settings. Please try again.")
+            return
+        self.scan_concurrency_spinbox.setValue(values['scan_concurrency'])
+        self.prefetch_segments_spinbox.setValue(values['prefetch_segments'])
+        self.prefetch_cache_spinbox.setValue(values['prefetch_cache_mb'])
+        self.apply_recommendations_button.hide()
+        self.test_results.append("✓ Recommendations applied")
+        self.settings_saved.emit()
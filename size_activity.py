@@ -0,0 +1,90 @@
+"""
+Activity estimates from segment file sizes, without opening any video file.
+
+The camera's encoder spends far more bytes on minutes with motion, so a
+segment's size relative to the camera's typical size is a cheap proxy for
+activity. Sizes come from the scanner's directory listing.
+"""
+from datetime import datetime
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+from models import Camera, RecordingDay, ACTIVITY_BIN_SECONDS, ACTIVITY_BINS, NOT_ANALYZED, MAX_SCORE
+
+
+BASELINE_SAMPLE_SIZE = 5000
+QUIET_RATIO = 1.1  # Segments up to 10% above the baseline score zero
+SCORE_PER_RATIO = 200
+
+
+class SizeActivityIndex:
+    """Per-camera size baselines and per-day activity strips derived from them."""
+
+    def __init__(self):
+        self._baselines: Dict[str, Optional[float]] = {}
+        self._strips: Dict[Tuple[str, object], bytearray] = {}
+
+    def clear(self):
+        self._baselines.clear()
+        self._strips.clear()
+
+    def invalidate(self, camera_id: str):
+        """Forget a camera's baseline and strips after its recordings changed."""
+        self._baselines.pop(camera_id, None)
+        for key in [key for key in self._strips if key[0] == camera_id]:
+            del self._strips[key]
+
+    def baseline(self, camera: Camera) -> Optional[float]:
+        """Median bytes per second of a camera's segments (sampled evenly across its history)."""
+        if camera.camera_id not in self._baselines:
+            columns = [(day.segment_sizes(), day.segment_durations()) for day in camera.recording_days]
+            step = max(1, sum(len(sizes) for sizes, _ in columns) // BASELINE_SAMPLE_SIZE)
+            rates = []
+            first = 0  # Index in the next day of the next sampled segment
+            for sizes, durations in columns:
+                for i in range(first, len(sizes), step):
+                    if sizes[i] > 0 and durations[i] > 0:
+                        rates.append(sizes[i] / durations[i])
+                first = (first - len(sizes)) % step
+            self._baselines[camera.camera_id] = median(rates) if rates else None
+        return self._baselines[camera.camera_id]
+
+    def ratio(self, camera: Camera, size: int, duration: int) -> Optional[float]:
+        """Segment size relative to the camera's baseline."""
+        baseline = self.baseline(camera)
+        if not baseline or size <= 0 or duration <= 0:
+            return None
+        return (size / duration) / baseline
+
+    def strip(self, camera: Camera, day: RecordingDay) -> Optional[bytearray]:
+        """Activity strip for a day in the same bin format as the frame-difference index."""
+        key = (camera.camera_id, day.date)
+        if key in self._strips:
+            return self._strips[key]
+        if self.baseline(camera) is None:
+            return None
+
+        strip = bytearray([NOT_ANALYZED] * ACTIVITY_BINS)
+        for segment in day.video_segments:
+            ratio = self.ratio(camera, segment.size, segment.duration)
+            if ratio is None:
+                continue
+            score = min(MAX_SCORE, max(0, int((ratio - QUIET_RATIO) * SCORE_PER_RATIO)))
+            first = segment.start_seconds // ACTIVITY_BIN_SECONDS
+            last = min(ACTIVITY_BINS, (segment.start_seconds + segment.duration - 1) // ACTIVITY_BIN_SECONDS + 1)
+            for index in range(first, last):
+                current = strip[index]
+                strip[index] = score if current == NOT_ANALYZED else max(current, score)
+
+        self._strips[key] = strip
+        return strip
+
+    def busiest_minutes(self, camera: Camera, day: RecordingDay, limit: int = 10) -> List[Tuple[datetime, float]]:
+        """The day's segments with the highest size ratio, busiest first."""
+        ranked = []
+        for segment in day.video_segments:
+            ratio = self.ratio(camera, segment.size, segment.duration)
+            if ratio is not None and ratio > QUIET_RATIO:
+                ranked.append((segment.start_time, ratio))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
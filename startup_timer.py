@@ -0,0 +1,67 @@
+"""
+Startup timing: milliseconds from process start to named milestones.
+
+The timer starts when this module is first imported, so `app.py` imports it
+before anything else. With `--profile-startup` the report also lists how
+long each measured import and view construction took.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+REPORT_MARKS = ('first_paint', 'interactive')  # The report waits for both
+
+
+class StartupTimer:
+    """Records the first time each startup milestone is reached."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.spans: List[Tuple[str, float, float]] = []  # Name, start ms, duration ms
+        self.profiling = False
+        self._reported = False
+
+    def mark(self, name: str) -> None:
+        """Record a milestone; later calls with the same name are ignored."""
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def elapsed_ms(self, name: str) -> Optional[float]:
+        return self.marks.get(name)
+
+    @contextmanager
+    def measure(self, name: str):
+        """Time a block (an import or a view construction) for the profile."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            span = (name, (started - self.start) * 1000, (finished - started) * 1000)
+            self.spans.append(span)
+            if self.profiling and self._reported:
+                # Work done after startup (first navigation, warm-up) is printed as it happens
+                print(f"{span[1]:8.1f} ms  {span[2]:8.1f} ms  {name}")
+
+    def report(self) -> None:
+        """Print time to first paint and time to interactive, once both are marked (either may come first)."""
+        if self._reported or any(name not in self.marks for name in REPORT_MARKS):
+            return
+        self._reported = True
+        parts = [f"{name.replace('_', ' ')} {ms:.0f} ms" for name, ms in self.marks.items()]
+        print("Startup: " + ", ".join(parts))
+        if self.profiling:
+            self.print_profile()
+
+    def print_profile(self) -> None:
+        """Print every measured block and milestone in the order they happened."""
+        rows = [(start, f"{duration:8.1f} ms  {name}") for name, start, duration in self.spans]
+        rows += [(ms, f"{'':8}     > {name.replace('_', ' ')}") for name, ms in self.marks.items()]
+        print(f"{'at':>8}     {'took':>8}")
+        for start, text in sorted(rows):
+            print(f"{start:8.1f} ms  {text}")
+
+
+startup_timer = StartupTimer()
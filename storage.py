@@ -0,0 +1,293 @@
+"""
+Storage backends: how the scanner and the player reach the camera folders.
+
+The default backend uses the local filesystem, which covers a NAS mounted by
+the operating system (a mapped drive, a UNC path on Windows, an SMB or NFS
+mount elsewhere). The SMB backend talks SMB2/3 itself through the optional
+`smbprotocol` package, using the username and password from the settings:
+
+    pip install smbprotocol
+
+It keeps a small pool of authenticated sessions. It allows several folder
+listings in flight at once, so their round trips overlap (the scanner's
+NASGuard runs them). It serves segments to the player
+through a local HTTP proxy that supports the range requests seeking needs.
+
+Both backends hand out directory entries with the `os.DirEntry` interface
+(`name`, `path`, `is_dir()`, `stat()`); SMB entries carry the size from the
+listing, so `stat()` costs no extra round trip.
+"""
+import itertools
+import ntpath
+import os
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from models import Settings
+
+
+BACKENDS = {
+    'local': "Operating system (mapped drive or mounted share)",
+    'smb': "Built-in SMB client",
+}
+
+SMB_SESSIONS = 4  # Authenticated connections kept open to the NAS
+SMB_LISTINGS_IN_FLIGHT = 8  # Folder listings requested at once
+SMB_PORT = 445
+EXISTS_CACHE_SECONDS = 10  # How long a folder listing answers `exists` for its files
+PROXY_CHUNK_BYTES = 256 * 1024
+
+
+class StorageError(Exception):
+    """A backend cannot be used (missing package, bad path)."""
+
+
+class LocalStorageBackend:
+    """The local filesystem, including shares mounted by the operating system."""
+
+    name = 'local'
+    listings_in_flight = 1  # Folder listings worth running at once
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def list_dirs(self, path: str) -> List[str]:
+        """Names of the subfolders of `path`, from a single listing."""
+        with os.scandir(path) as it:
+            return [entry.name for entry in it if entry.is_dir()]
+
+    def scandir(self, path: str) -> Dict[str, os.DirEntry]:
+        """Entries of `path` by name."""
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+
+    def size(self, path: str) -> int:
+        return os.path.getsize(path)
+
+    def open(self, path: str) -> BinaryIO:
+        return open(path, 'rb')
+
+    def playback_source(self, path: str) -> str:
+        """What the player should open for `path`: a local path or an http:// URL."""
+        return path
+
+    def close(self) -> None:
+        pass
+
+
+class SMBStorageBackend(LocalStorageBackend):
+    """SMB2/3 through `smbprotocol`, with pooled sessions and overlapped listings."""
+
+    name = 'smb'
+
+    def __init__(self, username: str = "", password: str = "", sessions: int = SMB_SESSIONS,
+                 listings_in_flight: int = SMB_LISTINGS_IN_FLIGHT):
+        try:
+            import smbclient
+        except ImportError:
+            raise StorageError("The built-in SMB client needs the smbprotocol package "
+                               "(pip install smbprotocol)")
+        self._smbclient = smbclient
+        self.username = username or None
+        self.password = password or None
+        # One connection cache per session; smbclient opens one authenticated connection per server in each
+        self._pool = [{} for _ in range(max(1, sessions))]
+        self._next_session = itertools.cycle(range(len(self._pool)))
+        self._pool_lock = threading.Lock()
+        self._registered = set()
+        self._ports: Dict[str, int] = {}  # Entry paths leave out the port, so remember it per server
+        self.listings_in_flight = max(1, listings_in_flight)
+        self._exists_cache: Dict[str, Tuple[float, set]] = {}
+        self._proxy: Optional[SegmentProxy] = None
+
+    def split_path(self, path: str) -> Tuple[str, int, str]:
+        """Server, port and smbclient path (\\\\server\\share\\...) of a UNC path.
+
+        The server may be given as host:port, for a NAS (or a test container)
+        listening on another port than 445.
+        """
+        parts = [part for part in re.split(r'[\\/]+', path) if part]
+        if len(parts) < 2:
+            raise StorageError(f"Not a \\\\server\\share path: {path}")
+        server, _, port = parts[0].partition(':')
+        if port:
+            self._ports[server] = int(port)
+        return server, self._ports.get(server, SMB_PORT), '\\\\' + '\\'.join([server] + parts[1:])
+
+    def _session(self, path: str) -> Tuple[str, dict]:
+        """The smbclient path and keyword arguments for the next pooled session."""
+        server, port, smb_path = self.split_path(path)
+        with self._pool_lock:
+            index = next(self._next_session)
+            cache = self._pool[index]
+            if (index, server, port) not in self._registered:
+                self._smbclient.register_session(server, username=self.username, password=self.password,
+                                                 port=port, connection_cache=cache)
+                self._registered.add((index, server, port))
+        return smb_path, {'port': port, 'username': self.username, 'password': self.password,
+                          'connection_cache': cache}
+
+    def exists(self, path: str) -> bool:
+        parent, name = ntpath.split(path.rstrip('\\/'))
+        cached = self._exists_cache.get(parent)
+        if cached is None or time.monotonic() - cached[0] > EXISTS_CACHE_SECONDS:
+            try:
+                cached = (time.monotonic(), set(self.scandir(parent)))
+            except (OSError, StorageError):
+                return False
+            self._exists_cache[parent] = cached
+        return name in cached[1]
+
+    def list_dirs(self, path: str) -> List[str]:
+        return [name for name, entry in self.scandir(path).items() if entry.is_dir()]
+
+    def scandir(self, path: str) -> dict:
+        smb_path, kwargs = self._session(path)
+        return {entry.name: entry for entry in self._smbclient.scandir(smb_path, **kwargs)}
+
+    def size(self, path: str) -> int:
+        smb_path, kwargs = self._session(path)
+        return self._smbclient.stat(smb_path, **kwargs).st_size
+
+    def open(self, path: str) -> BinaryIO:
+        smb_path, kwargs = self._session(path)
+        return self._smbclient.open_file(smb_path, mode='rb', **kwargs)
+
+    def playback_source(self, path: str) -> str:
+        if self._proxy is None:
+            self._proxy = SegmentProxy(self)
+        return self._proxy.url(path)
+
+    def close(self) -> None:
+        if self._proxy is not None:
+            self._proxy.stop()
+            self._proxy = None
+        for cache in self._pool:
+            try:
+                self._smbclient.reset_connection_cache(connection_cache=cache)
+            except Exception as e:
+                print(f"Error closing SMB session: {e}")
+
+
+class SegmentProxy:
+    """Serves files of a backend to the player over http://127.0.0.1, with range requests.
+
+    URLs carry a random token, so other local programs cannot read the NAS
+    through the proxy.
+    """
+
+    def __init__(self, backend: LocalStorageBackend):
+        self.backend = backend
+        self.token = secrets.token_urlsafe(16)
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                proxy.serve(self, send_body=False)
+
+            def do_GET(self):
+                proxy.serve(self, send_body=True)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="segment-proxy", daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/{self.token}/{quote(path, safe='')}.mp4"
+
+    def serve(self, request: BaseHTTPRequestHandler, send_body: bool) -> None:
+        prefix = f"/{self.token}/"
+        if not request.path.startswith(prefix) or not request.path.endswith('.mp4'):
+            request.send_error(404)
+            return
+        path = unquote(request.path[len(prefix):-len('.mp4')])
+        try:
+            size = self.backend.size(path)
+        except (OSError, StorageError) as e:
+            print(f"Error opening {path} for playback: {e}")
+            request.send_error(404)
+            return
+
+        start, end = 0, size - 1
+        match = re.match(r'bytes=(\d*)-(\d*)$', request.headers.get('Range', ''))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:  # A suffix: the last N bytes
+                start = max(0, size - int(match.group(2)))
+            if start > end:
+                request.send_response(416)
+                request.send_header('Content-Range', f"bytes */{size}")
+                request.end_headers()
+                return
+            request.send_response(206)
+            request.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        else:
+            request.send_response(200)
+        request.send_header('Content-Type', 'video/mp4')
+        request.send_header('Accept-Ranges', 'bytes')
+        request.send_header('Content-Length', str(end - start + 1))
+        request.end_headers()
+        if not send_body:
+            return
+
+        try:
+            with self.backend.open(path) as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(PROXY_CHUNK_BYTES, remaining))
+                    if not chunk:
+                        break
+                    request.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (ConnectionError, BrokenPipeError):
+            pass  # The player closed the connection (seek or stop)
+        except OSError as e:
+            print(f"Error streaming {path}: {e}")
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+_backend: Optional[LocalStorageBackend] = None
+_backend_key: Optional[tuple] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend(settings: Settings) -> LocalStorageBackend:
+    """The shared backend for `settings`, reused while the settings stay the same.
+
+    If the SMB backend cannot be used, the local filesystem is used instead.
+    """
+    global _backend, _backend_key
+    key = (settings.storage_backend, settings.nas_path, settings.username, settings.password)
+    with _backend_lock:
+        if _backend is not None and _backend_key == key:
+            return _backend
+        if _backend is not None:
+            _backend.close()
+        _backend, _backend_key = create_backend(settings), key
+        return _backend
+
+
+def create_backend(settings: Settings) -> LocalStorageBackend:
+    """A new backend for `settings`, which the caller closes (see `get_backend` for the shared one)."""
+    if settings.storage_backend == 'smb':
+        try:
+            return SMBStorageBackend(settings.username, settings.password)
+        except StorageError as e:
+            print(f"Error starting SMB backend, using the local filesystem: {e}")
+    return LocalStorageBackend()
@@ -0,0 +1,346 @@
+"""
+Timelapse builder sampling one frame every N seconds into an MJPEG AVI file.
+
+Frames are decoded in a process pool (one segment per task) and streamed to
+disk in order, so memory stays bounded by the number of tasks in flight.
+After every segment the output is flushed and a small state file is
+written, which lets an interrupted build resume from its last completed
+segment.
+"""
+import json
+import multiprocessing
+import os
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from models import Camera, VideoSegment
+
+
+AVIF_HASINDEX = 0x10
+AVIIF_KEYFRAME = 0x10
+MAX_RIFF_SIZE = 0xFFFFFFFF
+
+
+class TimelapseError(Exception):
+    """Raised when a timelapse cannot be built."""
+
+
+@dataclass
+class TimelapseJob:
+    """Parameters of a timelapse build."""
+    camera_id: str
+    start: datetime
+    end: datetime
+    interval_seconds: int
+    output_path: str
+    fps: int = 25
+    width: int = 1280
+    height: int = 720
+    quality: int = 80
+
+    @property
+    def state_path(self) -> str:
+        return self.output_path + ".timelapse.json"
+
+    @property
+    def index_path(self) -> str:
+        return self.output_path + ".timelapse.idx"
+
+    def key(self) -> dict:
+        """Parameters that must match for a partial build to be resumed."""
+        data = asdict(self)
+        data['start'] = self.start.isoformat()
+        data['end'] = self.end.isoformat()
+        return data
+
+
+def plan_samples(segments: List[VideoSegment], start: datetime, end: datetime,
+                 interval_seconds: int) -> List[Tuple[VideoSegment, List[int]]]:
+    """Map sample times (start + k * interval) to positions inside the segments covering them."""
+    plan = []
+    interval = timedelta(seconds=interval_seconds)
+    for segment in segments:
+        segment_start = segment.start_time
+        segment_end = segment_start + timedelta(seconds=segment.duration)
+        first = max(start, segment_start)
+        # First sample time at or after `first`
+        k = -(-(first - start) // interval)
+        sample = start + k * interval
+        positions = []
+        while sample < segment_end and sample < end:
+            positions.append(int((sample - segment_start).total_seconds() * 1000))
+            sample += interval
+        if positions:
+            plan.append((segment, positions))
+    return plan
+
+
+class MjpegAviWriter:
+    """Minimal streaming writer for Motion-JPEG AVI files.
+
+    The frame index is appended to a sidecar file while writing and turned
+    into the `idx1` chunk on `finalize`, so it never has to be held in memory.
+    """
+
+    def __init__(self, path: str, index_path: str, width: int, height: int, fps: int):
+        self.path = path
+        self.index_path = index_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = 0
+        self.max_frame_size = 0
+        self._file = None
+        self._index = None
+        self._movi_list_pos = 0
+        self._offsets = {}
+
+    def open(self, resume_position: Optional[int] = None, frame_count: int = 0, max_frame_size: int = 0):
+        """Create the file, or reopen it truncated to a previously committed position."""
+        if resume_position is None:
+            self._file = open(self.path, 'w+b')
+            self._index = open(self.index_path, 'w+b')
+            self._write_headers()
+        else:
+            self._file = open(self.path, 'r+b')
+            self._index = open(self.index_path, 'r+b')
+            self._write_headers(rewrite=True)
+            self._file.truncate(resume_position)
+            self._file.seek(resume_position)
+            self._index.truncate(frame_count * 8)
+            self._index.seek(frame_count * 8)
+            self.frame_count = frame_count
+            self.max_frame_size = max_frame_size
+
+    def _write_headers(self, rewrite: bool = False):
+        """Write the RIFF/hdrl/movi headers, recording where the counters live."""
+        f = self._file
+        f.seek(0)
+        strf = struct.pack('<IiiHH4sIiiII', 40, self.width, self.height, 1, 24, b'MJPG',
+                           self.width * self.height * 3, 0, 0, 0, 0)
+        strh = struct.pack('<4s4sIHHIIIIIIIIhhhh', b'vids', b'MJPG', 0, 0, 0, 0, 1, self.fps, 0,
+                           0, 0, 0xFFFFFFFF, 0, 0, 0, self.width, self.height)
+        avih = struct.pack('<IIIIIIIIII16x', 1_000_000 // self.fps, 0, 0, AVIF_HASINDEX, 0, 0, 1, 0,
+                           self.width, self.height)
+        strl = b'strl' + b'strh' + struct.pack('<I', len(strh)) + strh + b'strf' + struct.pack('<I', len(strf)) + strf
+        hdrl = b'hdrl' + b'avih' + struct.pack('<I', len(avih)) + avih + b'LIST' + struct.pack('<I', len(strl)) + strl
+
+        f.write(b'RIFF' + struct.pack('<I', 0) + b'AVI ')
+        hdrl_pos = f.tell()
+        f.write(b'LIST' + struct.pack('<I', len(hdrl)) + hdrl)
+
+        # Positions of fields patched on finalize
+        avih_data = hdrl_pos + 12 + 8
+        self._offsets = {
+            'total_frames': avih_data + 16,
+            'suggested_buffer': avih_data + 28,
+            'max_bytes_per_sec': avih_data + 4,
+            'stream_length': avih_data + len(avih) + 12 + 8 + 32,
+            'stream_buffer': avih_data + len(avih) + 12 + 8 + 36,
+        }
+
+        self._movi_list_pos = f.tell()
+        if not rewrite:
+            f.write(b'LIST' + struct.pack('<I', 0) + b'movi')
+
+    def write_frame(self, jpeg: bytes):
+        """Append one JPEG frame."""
+        f = self._file
+        position = f.tell()
+        padded = len(jpeg) + (len(jpeg) & 1)
+        if position + 8 + padded + (self.frame_count + 1) * 16 + 8 > MAX_RIFF_SIZE:
+            raise TimelapseError("Timelapse exceeds the 4 GB AVI limit; use a longer interval or smaller frames")
+        f.write(b'00dc' + struct.pack('<I', len(jpeg)) + jpeg)
+        if len(jpeg) & 1:
+            f.write(b'\0')
+        # idx1 offsets are relative to the 'movi' fourcc
+        self._index.write(struct.pack('<II', position - (self._movi_list_pos + 8), len(jpeg)))
+        self.frame_count += 1
+        self.max_frame_size = max(self.max_frame_size, len(jpeg))
+
+    def commit(self) -> int:
+        """Flush everything written so far to disk and return the committed file position."""
+        for f in (self._file, self._index):
+            f.flush()
+            os.fsync(f.fileno())
+        return self._file.tell()
+
+    def finalize(self):
+        """Write the idx1 index, patch the header counters and close the file."""
+        f = self._file
+        movi_end = f.tell()
+
+        f.write(b'idx1' + struct.pack('<I', self.frame_count * 16))
+        self._index.seek(0)
+        while True:
+            entries = self._index.read(8 * 4096)
+            if not entries:
+                break
+            for offset, size in struct.iter_unpack('<II', entries):
+                f.write(struct.pack('<4sIII', b'00dc', AVIIF_KEYFRAME, offset, size))
+        file_end = f.tell()
+
+        def patch(position: int, value: int):
+            f.seek(position)
+            f.write(struct.pack('<I', value))
+
+        patch(4, file_end - 8)
+        patch(self._movi_list_pos + 4, movi_end - self._movi_list_pos - 8)
+        patch(self._offsets['total_frames'], self.frame_count)
+        patch(self._offsets['stream_length'], self.frame_count)
+        patch(self._offsets['suggested_buffer'], self.max_frame_size + 8)
+        patch(self._offsets['stream_buffer'], self.max_frame_size + 8)
+        patch(self._offsets['max_bytes_per_sec'], self.max_frame_size * self.fps)
+        self.close()
+        os.remove(self.index_path)
+
+    def close(self):
+        for f in (self._file, self._index):
+            if f and not f.closed:
+                f.close()
+
+
+class TimelapseBuilder:
+    """Builds (or resumes) a timelapse using a pool of frame-decoding processes."""
+
+    def __init__(self, job: TimelapseJob, segments: List[VideoSegment], max_workers: Optional[int] = None):
+        self.job = job
+        self.plan = plan_samples(segments, job.start, job.end, job.interval_seconds)
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop after the segment being written; the build can be resumed later."""
+        self._cancel.set()
+
+    def _load_state(self) -> Optional[dict]:
+        try:
+            with open(self.job.state_path, 'r') as f:
+                state = json.load(f)
+            if state.get('job') != self.job.key():
+                return None
+            if not (os.path.exists(self.job.output_path) and os.path.exists(self.job.index_path)):
+                return None
+            return state
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, state: dict):
+        temp_path = self.job.state_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.job.state_path)
+
+    def build(self, progress_callback: Optional[Callable[[int, int, int], None]] = None) -> int:
+        """Build the timelapse and return the number of frames written.
+
+        Raises TimelapseError if cancelled; the partial output is kept for resuming.
+        """
+        if not self.plan:
+            raise TimelapseError("No recordings in the selected range")
+
+        from frame_grabber import init_worker, grab_jpeg_frames
+
+        job = self.job
+        writer = MjpegAviWriter(job.output_path, job.index_path, job.width, job.height, job.fps)
+        state = self._load_state()
+        if state:
+            writer.open(state['position'], state['frames'], state['max_frame_size'])
+            next_segment = state['next_segment']
+        else:
+            writer.open()
+            next_segment = 0
+
+        total = len(self.plan)
+        window = self.max_workers * 2
+        pending = deque()
+        submitted = next_segment
+
+        try:
+            # Spawn rather than fork, so workers start their own Qt instead of inheriting the GUI's
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                while next_segment < total:
+                    while submitted < total and len(pending) < window:
+                        segment, positions = self.plan[submitted]
+                        pending.append(pool.submit(grab_jpeg_frames, segment.path, positions,
+                                                   (job.width, job.height), job.quality))
+                        submitted += 1
+
+                    frames = pending.popleft().result()
+                    for jpeg in frames:
+                        if jpeg:
+                            writer.write_frame(jpeg)
+                    next_segment += 1
+
+                    self._save_state({
+                        'job': job.key(),
+                        'next_segment': next_segment,
+                        'position': writer.commit(),
+                        'frames': writer.frame_count,
+                        'max_frame_size': writer.max_frame_size,
+                    })
+                    if progress_callback:
+                        progress_callback(next_segment, total, writer.frame_count)
+
+                    if self._cancel.is_set() and next_segment < total:
+                        for future in pending:
+                            future.cancel()
+                        raise TimelapseError("Timelapse cancelled; it will resume from where it stopped")
+
+            if writer.frame_count == 0:
+                raise TimelapseError("No frames could be decoded in the selected range")
+            writer.finalize()
+            os.remove(job.state_path)
+            return writer.frame_count
+        finally:
+            writer.close()
+
+
+class TimelapseService:
+    """Runs timelapse builds on a background thread."""
+
+    def __init__(self):
+        self._builder: Optional[TimelapseBuilder] = None
+        self._thread = None
+
+    @property
+    def is_building(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @staticmethod
+    def has_partial_build(job: TimelapseJob) -> bool:
+        """Check whether an interrupted build of this job can be resumed."""
+        return os.path.exists(job.state_path)
+
+    def build_async(self, camera: Camera, job: TimelapseJob,
+                    progress_callback=None, complete_callback=None) -> None:
+        """Start building a timelapse of `camera` for `job`."""
+        if self.is_building:
+            return
+
+        def worker():
+            try:
+                self._builder = TimelapseBuilder(job, camera.get_segments_between(job.start, job.end))
+                frames = self._builder.build(progress_callback)
+                if complete_callback:
+                    complete_callback(frames, None)
+            except Exception as e:
+                if complete_callback:
+                    complete_callback(None, str(e))
+
+        self._thread = threading.Thread(target=worker)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def cancel(self):
+        """Cancel the running build, keeping its progress for a later resume."""
+        if self._builder:
+            self._builder.cancel()
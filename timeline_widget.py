@@ -1,6 +1,7 @@
 """
 Custom 24-hour timeline widget for video navigation.
 """
+import time as monotonic_time
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QLineEdit, QFrame, QSizePolicy, QToolTip)
 from PyQt6.QtCore import Qt, pyqtSignal, QRect, QTimer, QPointF
@@ -8,7 +9,8 @@ from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QFontMetrics, QMo
 from typing import List, Optional, Tuple
 from datetime import datetime, date, time, timedelta
 
-from models import RecordingDay, VideoSegment
+from models import RecordingDay, VideoSegment, ACTIVITY_BIN_SECONDS, ACTIVITY_BINS, NOT_ANALYZED
+from tracing import traced
 
 
 class TimelineWidget(QWidget):
@@ -18,18 +20,25 @@ class TimelineWidget(QWidget):
     time_clicked = pyqtSignal(float)  # Time in seconds from start of day
     playhead_moved = pyqtSignal(float)  # Playhead position in seconds
     
+    INTERACTION_SECONDS = 5  # How long after a click or zoom the user counts as still interacting
+    
     def __init__(self):
         super().__init__()
         
         # Timeline data
         self.recording_day: Optional[RecordingDay] = None
         self.video_segments: List[VideoSegment] = []
+        self.activity: Optional[bytes] = None  # One score per ACTIVITY_BIN_SECONDS bin
+        self.size_activity: Optional[bytes] = None  # Same format, estimated from file sizes
+        self.activity_threshold = 30
+        self.last_paint_ms = 0.0  # For the performance HUD
         
         # Timeline state
         self.playhead_position = 0.0  # Seconds from start of day
         self.total_seconds = 24 * 60 * 60  # 24 hours in seconds
         self.dragging_playhead = False
         self.hover_time = -1.0
+        self.last_interaction = 0.0  # monotonic_time of the last click, drag or zoom
         
         self.view_start_seconds = 0.0
         self.visible_duration_seconds = self.total_seconds
@@ -41,6 +50,7 @@ class TimelineWidget(QWidget):
         # Layout
         self.timeline_height = 40
         self.hour_label_height = 30
+        self.activity_strip_height = 6
         self.setMinimumHeight(100)
         self.setMaximumHeight(120)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
@@ -72,6 +82,45 @@ class TimelineWidget(QWidget):
         self.visible_duration_seconds = self.total_seconds
         self.update()
     
+    def refresh_recording_day(self, recording_day: Optional[RecordingDay] = None):
+        """Redraw after the day's segments changed, keeping the zoom and playhead."""
+        if recording_day is not None:
+            self.recording_day = recording_day
+        self.video_segments = self.recording_day.video_segments if self.recording_day else []
+        self.update()
+    
+    def set_activity(self, activity: Optional[bytes]):
+        """Set the per-day activity array rendered as a heat strip."""
+        self.activity = activity
+        self.update()
+    
+    def set_size_activity(self, size_activity: Optional[bytes]):
+        """Set the activity-by-size array rendered as a second heat strip."""
+        self.size_activity = size_activity
+        self.update()
+    
+    def next_activity_time(self, after_seconds: float) -> Optional[float]:
+        """Start time of the next activity burst after the given time, if any.
+        
+        Uses the frame-difference index when available, file sizes otherwise.
+        """
+        activity = self.activity or self.size_activity
+        if not activity:
+            return None
+        index = int(after_seconds // ACTIVITY_BIN_SECONDS)
+        # Skip the burst we are currently in
+        while index < ACTIVITY_BINS and self._is_active_bin(activity, index):
+            index += 1
+        while index < ACTIVITY_BINS:
+            if self._is_active_bin(activity, index):
+                return float(index * ACTIVITY_BIN_SECONDS)
+            index += 1
+        return None
+    
+    def _is_active_bin(self, activity: bytes, index: int) -> bool:
+        score = activity[index]
+        return score != NOT_ANALYZED and score >= self.activity_threshold
+    
     def set_playhead_position(self, seconds: float):
         """Set the playhead position in seconds from start of day."""
         self.playhead_position = max(0, min(seconds, self.total_seconds))
@@ -90,8 +139,10 @@ class TimelineWidget(QWidget):
                 return True
         return False
     
+    @traced("paint.timeline", "ui")
     def paintEvent(self, event):
         """Paint the timeline widget."""
+        started = monotonic_time.perf_counter()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
@@ -119,6 +170,16 @@ class TimelineWidget(QWidget):
         # Draw video segments
         self.draw_video_segments(painter, timeline_x, timeline_y, timeline_width)
         
+        # Draw activity heat strips
+        strip_y = timeline_y + self.timeline_height + 1
+        if self.activity:
+            self.draw_activity_strip(painter, self.activity, self._get_color("warning"),
+                                     timeline_x, strip_y, timeline_width)
+            strip_y += self.activity_strip_height
+        if self.size_activity:
+            self.draw_activity_strip(painter, self.size_activity, self._get_color("primary"),
+                                     timeline_x, strip_y, timeline_width)
+        
         # Draw hover indicator
         if self.hover_time >= 0:
             self.draw_hover_indicator(painter, timeline_x, timeline_y, timeline_width)
@@ -129,6 +190,8 @@ class TimelineWidget(QWidget):
         # Draw time tooltip
         if self.hover_time >= 0:
             self.draw_time_tooltip(painter, timeline_x, timeline_y, timeline_width)
+        
+        self.last_paint_ms = (monotonic_time.perf_counter() - started) * 1000
     
     def draw_hour_markers(self, painter: QPainter, x: int, y: int, width: int):
         """Draw hour markers and labels."""
@@ -226,6 +289,23 @@ class TimelineWidget(QWidget):
             painter.setPen(QPen(self._get_color("success").darker(120), 1))
             painter.drawRect(segment_rect)
     
+    def draw_activity_strip(self, painter: QPainter, activity: bytes, heat: QColor, x: int, y: int, width: int):
+        """Draw an activity heat strip, one column per pixel using the busiest bin under it."""
+        seconds_per_pixel = self.visible_duration_seconds / max(1, width)
+        for px in range(width):
+            start = self.view_start_seconds + px * seconds_per_pixel
+            first = int(start // ACTIVITY_BIN_SECONDS)
+            last = int((start + seconds_per_pixel) // ACTIVITY_BIN_SECONDS) + 1
+            scores = [v for v in activity[first:min(last, ACTIVITY_BINS)] if v != NOT_ANALYZED]
+            if not scores:
+                continue
+            score = max(scores)
+            if score < self.activity_threshold // 2:
+                continue
+            color = QColor(heat)
+            color.setAlpha(min(255, 60 + score))
+            painter.fillRect(x + px, y, 1, self.activity_strip_height, color)
+    
     def draw_playhead(self, painter: QPainter, x: int, y: int, width: int):
         """Draw the playhead indicator."""
         playhead_x = self.get_position_for_time(self.playhead_position)
@@ -279,7 +359,7 @@ class TimelineWidget(QWidget):
         tooltip_width = text_width + 8
         tooltip_height = text_height + 4
         tooltip_x = hover_x - tooltip_width // 2
-        tooltip_y = y + self.timeline_height + 5
+        tooltip_y = y + self.timeline_height + 2 * self.activity_strip_height + 3
         
         # Ensure tooltip stays within widget bounds
         tooltip_x = max(5, min(tooltip_x, self.width() - tooltip_width - 5))
@@ -291,8 +371,15 @@ class TimelineWidget(QWidget):
         painter.setPen(QPen(self._get_color("text-primary"), 1))
         painter.drawText(tooltip_rect, Qt.AlignmentFlag.AlignCenter, time_text)
     
+    @property
+    def is_interacting(self) -> bool:
+        """Whether the user is dragging, or clicked or zoomed in the last few seconds."""
+        return (self.dragging_playhead
+                or monotonic_time.monotonic() - self.last_interaction < self.INTERACTION_SECONDS)
+    
     def mousePressEvent(self, event: QMouseEvent):
         """Handle mouse press events."""
+        self.last_interaction = monotonic_time.monotonic()
         if event.button() == Qt.MouseButton.LeftButton:
             timeline_x = 10
             timeline_width = self.width() - 20
@@ -354,6 +441,7 @@ class TimelineWidget(QWidget):
         
         # Handle playhead dragging
         if self.dragging_playhead:
+            self.last_interaction = monotonic_time.monotonic()
             new_time = self.get_time_at_position(event.position().x())
             self.set_playhead_position(new_time)
             self.playhead_moved.emit(new_time)
@@ -375,6 +463,7 @@ class TimelineWidget(QWidget):
         delta = event.angleDelta().y()
         if delta == 0:
             return
+        self.last_interaction = monotonic_time.monotonic()
 
         zoom_factor = 1.2 if delta > 0 else 1 / 1.2
         
@@ -449,6 +538,8 @@ class TimelineWidget(QWidget):
         """Clear the timeline data."""
         self.recording_day = None
         self.video_segments = []
+        self.activity = None
+        self.size_activity = None
         self.playhead_position = 0.0
         self.hover_time = -1
         self.view_start_seconds = 0.0
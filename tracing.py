@@ -0,0 +1,144 @@
+"""
+Tracing of scans, cache I/O, playback and painting, saved as Chrome trace events.
+
+Tracing is off until `tracer.enable()` (Help > Diagnostics > Record Trace, or
+`--trace` on the command line). While it is off, `tracer.span` returns a
+shared do-nothing context manager and `tracer.counter` returns at once, so
+instrumented code pays for one attribute check.
+
+    with tracer.span("camera", "scan", camera_id=camera_id):
+        ...
+    tracer.counter("scan.progress", files=1200, folders=24)
+
+`tracer.dump(path)` writes the recorded events as Chrome trace-event JSON,
+which chrome://tracing and https://ui.perfetto.dev open directly.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+
+MAX_EVENTS = 200_000  # About 40 MB; the oldest events are dropped first
+
+
+class _NullSpan:
+    """What `span` returns while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """A timed block, recorded as a complete ('X') event when it ends."""
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        finished = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record({
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': self.tracer._us(self.started),
+            'dur': round((finished - self.started) * 1_000_000, 1),
+            'args': self.args,
+        })
+        return False
+
+
+class Tracer:
+    """Records spans, counters and instant events while enabled."""
+
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+        self._thread_names = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.events.clear()
+        self._thread_names.clear()
+
+    def span(self, name: str, category: str = 'app', **args):
+        """Context manager timing a block (a no-op while tracing is off)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def counter(self, name: str, **values) -> None:
+        """Record the current value of one or more counters, drawn as a graph."""
+        if self.enabled:
+            self._record({'name': name, 'cat': 'counter', 'ph': 'C',
+                          'ts': self._us(time.perf_counter()), 'args': values})
+
+    def instant(self, name: str, category: str = 'app', **args) -> None:
+        """Record a point in time (a marker in the trace)."""
+        if self.enabled:
+            self._record({'name': name, 'cat': category, 'ph': 'i', 's': 't',
+                          'ts': self._us(time.perf_counter()), 'args': args})
+
+    def _us(self, seconds: float) -> float:
+        return round((seconds - self.origin) * 1_000_000, 1)
+
+    def _record(self, event: dict) -> None:
+        thread = threading.current_thread()
+        event['pid'] = os.getpid()
+        event['tid'] = thread.ident
+        self._thread_names[thread.ident] = thread.name
+        self.events.append(event)  # deque.append is atomic, so threads need no lock
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                     'args': {'name': 'NAS Camera Viewer'}}]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                     for tid, name in list(self._thread_names.items())]
+        return {'traceEvents': metadata + list(self.events), 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: str) -> int:
+        """Write the recorded events as Chrome trace JSON; returns how many were written."""
+        trace = self.to_chrome_trace()
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+        return len(trace['traceEvents'])
+
+
+def traced(name: str, category: str = 'app'):
+    """Decorator running a method inside a span, e.g. a paintEvent."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+tracer = Tracer()
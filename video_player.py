@@ -6,13 +6,24 @@ from datetime import timedelta
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QSlider, QLabel, QSizePolicy, QFrame)
 from PyQt6.QtCore import Qt, pyqtSignal, QUrl
-from PyQt6.QtGui import QIcon
+from PyQt6.QtGui import QIcon, QFont
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from typing import List, Optional
 import os
 
 from models import VideoSegment
+from playback_metrics import PlaybackMetrics
+from services import ConfigService
+from storage import LocalStorageBackend, get_backend
+from tracing import tracer
+
+
+def warm_up_backend():
+    """Initialize the Qt Multimedia backend (codec plugins, audio devices) ahead of first use."""
+    player = QMediaPlayer()
+    player.setAudioOutput(QAudioOutput(player))
+    player.deleteLater()
 
 
 class VideoPlayerWidget(QWidget):
@@ -34,9 +45,15 @@ class VideoPlayerWidget(QWidget):
         
         # Playback state
         self.current_playlist: List[VideoSegment] = []
+        self.current_segment_index = -1
         self.is_playing = False
         self.total_duration = 0.0
         self.pending_seek_ms = -1
+        self._held_statuses: Optional[List[QMediaPlayer.MediaStatus]] = None  # Reported while setSource runs
+        
+        # Stage timings of seeks, loads and segment boundaries
+        self.metrics = PlaybackMetrics()
+        self.frames_decoded = 0  # Frames delivered to the video sink, for the performance HUD
         
         # UI setup
         self.setup_ui()
@@ -54,6 +71,13 @@ class VideoPlayerWidget(QWidget):
         self.video_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         layout.addWidget(self.video_widget)
         
+        # Debug overlay with the playback latencies, hidden unless asked for
+        self.metrics_overlay = QLabel(self)
+        self.metrics_overlay.setFont(QFont("Consolas", 9))
+        self.metrics_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: #7CFC00; padding: 4px;")
+        self.metrics_overlay.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.metrics_overlay.hide()
+        
         self.seeking = False # This is now unused but kept for minimal diff
     
     def setup_player(self):
@@ -63,34 +87,85 @@ class VideoPlayerWidget(QWidget):
         self.player.playbackStateChanged.connect(self.on_playback_state_changed)
         self.player.mediaStatusChanged.connect(self.on_media_status_changed)
         self.player.errorOccurred.connect(self.on_player_error)
+        self.video_widget.videoSink().videoFrameChanged.connect(self._on_video_frame)
         self.set_volume(80)
     
     def load_playlist(self, video_segments: List[VideoSegment]):
         """Load a playlist of video segments."""
         self.player.stop()
-        self.current_playlist = video_segments
+        self.current_playlist = list(video_segments)
         self.current_segment_index = -1
-        self.total_duration = sum(seg.duration for seg in video_segments if os.path.exists(seg.path))
+        self.total_duration = sum(seg.duration for seg in video_segments)
         self.pending_seek_ms = -1
 
         if self.current_playlist:
+            self.metrics.begin('load')
             self.play_segment(0)
             self.pause()  # Start paused
         else:
             self.player.setSource(QUrl())  # Clear source
 
+    def append_to_playlist(self, video_segments: List[VideoSegment]):
+        """Add segments recorded since the playlist was loaded, without interrupting playback."""
+        self.current_playlist.extend(video_segments)
+        self.total_duration += sum(seg.duration for seg in video_segments)
+    
+    def update_playlist(self, video_segments: List[VideoSegment]):
+        """Replace the playlist with a rescanned one, keeping the current segment playing.
+        
+        If the current segment is no longer listed, playback continues with
+        the first segment that starts after it.
+        """
+        current = None
+        if 0 <= self.current_segment_index < len(self.current_playlist):
+            current = self.current_playlist[self.current_segment_index]
+        self.current_playlist = list(video_segments)
+        self.total_duration = sum(seg.duration for seg in self.current_playlist)
+        if current is not None:
+            paths = [seg.path for seg in self.current_playlist]
+            if current.path in paths:
+                self.current_segment_index = paths.index(current.path)
+            else:
+                self.current_segment_index = sum(1 for seg in self.current_playlist
+                                                 if seg.start_time < current.start_time) - 1
+    
     def play_segment(self, index: int):
-        """Play a specific segment from the playlist."""
+        """Play a specific segment from the playlist.
+        
+        The file is not checked for first (on the SMB backend that is a
+        listing on the GUI thread); a segment deleted since the scan fails to
+        load and on_media_status_changed skips it.
+        """
         if 0 <= index < len(self.current_playlist):
             self.current_segment_index = index
             segment = self.current_playlist[index]
-            if os.path.exists(segment.path):
-                self.player.setSource(QUrl.fromLocalFile(segment.path))
-                if self.is_playing:
-                    self.player.play()
-            else:
-                # Skip to next segment if file doesn't exist
-                self.on_media_status_changed(QMediaPlayer.MediaStatus.EndOfMedia)
+            source = self.storage.playback_source(segment.path)
+            url = QUrl(source) if source.startswith('http://') else QUrl.fromLocalFile(source)
+            # Backends report LoadingMedia (even LoadedMedia) from inside setSource; hold those
+            # until it returns, so the set_source stage times the call and the others follow it
+            self._held_statuses = []
+            try:
+                with tracer.span("player.set_source", "player", path=segment.path):
+                    self.player.setSource(url)
+            finally:
+                held, self._held_statuses = self._held_statuses, None
+            self.metrics.stage('set_source')
+            if self.is_playing:
+                self.player.play()
+            for status in held:
+                self.on_media_status_changed(status)
+    
+    @property
+    def storage(self) -> LocalStorageBackend:
+        """The configured storage backend (the local filesystem unless set up otherwise)."""
+        return get_backend(ConfigService().settings)
+    
+    @property
+    def current_segment(self) -> Optional[VideoSegment]:
+        """The segment loaded in the player, if any."""
+        if 0 <= self.current_segment_index < len(self.current_playlist):
+            return self.current_playlist[self.current_segment_index]
+        return None
     
     def play(self):
         """Start playback."""
@@ -133,11 +208,14 @@ class VideoPlayerWidget(QWidget):
                 break
         
         if target_segment_index != -1:
-            if self.current_segment_index != target_segment_index:
-                self.pending_seek_ms = time_in_segment_ms
-                self.play_segment(target_segment_index)
-            else:
-                self.player.setPosition(time_in_segment_ms)
+            self.metrics.begin('seek')
+            with tracer.span("player.seek", "player", seconds=seconds,
+                             same_segment=self.current_segment_index == target_segment_index):
+                if self.current_segment_index != target_segment_index:
+                    self.pending_seek_ms = time_in_segment_ms
+                    self.play_segment(target_segment_index)
+                else:
+                    self.player.setPosition(time_in_segment_ms)
             if not self.is_playing:
                 self.pause()
     
@@ -167,6 +245,8 @@ class VideoPlayerWidget(QWidget):
         return total_seconds
     
     def _emit_position_changed(self, position_ms):
+        if self.metrics.pending:
+            self.metrics.stage('first_position')
         current_total_seconds = self.get_current_time_seconds()
         self.position_changed.emit(current_total_seconds)
 
@@ -182,16 +262,51 @@ class VideoPlayerWidget(QWidget):
 
     def on_media_status_changed(self, status: QMediaPlayer.MediaStatus):
         """Handle media status changes, e.g., for playlists."""
-        if status == QMediaPlayer.MediaStatus.LoadedMedia:
+        if self._held_statuses is not None:
+            self._held_statuses.append(status)  # Handled once setSource returns (see play_segment)
+            return
+        if status == QMediaPlayer.MediaStatus.LoadingMedia:
+            self.metrics.stage('loading')
+        elif status == QMediaPlayer.MediaStatus.LoadedMedia:
+            self.metrics.stage('loaded')
             if self.pending_seek_ms >= 0:
                 self.player.setPosition(self.pending_seek_ms)
                 self.pending_seek_ms = -1
+        elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+            # Gone since the scan (retention) or unreadable: skip to the next segment
+            if self.current_segment_index < len(self.current_playlist) - 1:
+                self.pending_seek_ms = -1
+                self.play_segment(self.current_segment_index + 1)
+            else:
+                self.stop()
         elif status == QMediaPlayer.MediaStatus.EndOfMedia:
             if self.is_playing and self.current_segment_index < len(self.current_playlist) - 1:
+                self.metrics.begin('boundary')
                 self.play_segment(self.current_segment_index + 1)
             else:
                 self.stop()
 
+    def _on_video_frame(self, frame):
+        """Count the frame, and complete the pending request's timing if it is the first."""
+        self.frames_decoded += 1
+        if self.metrics.pending and self.metrics.stage('first_frame'):
+            tracer.instant("player.first_frame", "player", **self.metrics.last)
+            if self.metrics_overlay.isVisible():
+                self.update_metrics_overlay()
+    
+    def set_metrics_overlay_visible(self, visible: bool):
+        """Show or hide the playback latency overlay."""
+        self.metrics_overlay.setVisible(visible)
+        if visible:
+            self.update_metrics_overlay()
+            self.metrics_overlay.raise_()
+    
+    def update_metrics_overlay(self):
+        """Refresh the overlay text from the latest timings."""
+        self.metrics_overlay.setText("\n".join(self.metrics.summary_lines()))
+        self.metrics_overlay.adjustSize()
+        self.metrics_overlay.move(8, 8)
+    
     def on_player_error(self, error, error_string):
         """Handle player errors."""
         print(f"Player Error: {error_string}")